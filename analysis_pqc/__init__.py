@@ -1,15 +1,16 @@
 """Set of analysis function for PQC measurements."""
 
-import warnings
+import contextlib
+import functools
+import hashlib
+import threading
 import traceback
 from collections import namedtuple
 
 import numpy as np
 
-from scipy.interpolate import CubicSpline
-from scipy.interpolate import interp1d
-from scipy.stats import linregress
-import scipy.signal
+# SciPy submodules are imported by the functions using them, importing them
+# here would dominate the import time of the package.
 
 __version__ = '0.8.2'
 
@@ -20,21 +21,40 @@ __all__ = [
     'CARRIER_ELECTRONS',
     'CARRIER_HOLES',
     'analyse_iv',
+    'analyse_iv_many',
     'analyse_cv',
+    'analyse_cv_many',
     'analyse_mos',
+    'analyse_mos_many',
     'analyse_gcd',
     'analyse_gcd_num',
     'analyse_gcd_legacy',
     'analyse_gcd_sym',
+    'analyse_gcd_many',
     'analyse_fet',
+    'analyse_fet_many',
     'analyse_van_der_pauw',
+    'analyse_van_der_pauw_many',
     'analyse_cross',
+    'analyse_cross_many',
     'analyse_linewidth',
+    'analyse_linewidth_many',
     'analyse_cbkr',
+    'analyse_cbkr_many',
     'analyse_contact',
+    'analyse_contact_many',
     'analyse_meander',
+    'analyse_meander_many',
     'analyse_breakdown',
-    'analyse_capacitor'
+    'analyse_breakdown_many',
+    'analyse_capacitor',
+    'StreamingLinearFit',
+    'StreamingVanDerPauw',
+    'StreamingCBKR',
+    'StreamingMeander',
+    'StreamingIV',
+    'StreamingBreakdown',
+    'ResultCache'
 ]
 
 ## Constants
@@ -51,16 +71,134 @@ CARRIER_HOLES = 'holes'
 ## ------------------------------------
 
 def params(names):
-    """Function decorator returning namedtuples."""
+    """Function decorator returning namedtuples.
+
+    The result type is created once at decoration time and is available as
+    attribute `result_type` of the decorated function, the undecorated
+    function returning plain tuples is available as `__wrapped__`.
+    """
     def params(f):
+        result_type = namedtuple(f.__name__, names)
+        @functools.wraps(f)
         def params(*args, **kwargs):
-           return namedtuple(f.__name__, names)(*f(*args, **kwargs))
+            return result_type(*f(*args, **kwargs))
+        params.result_type = result_type
         return params
     return params
 
 
+def to_records(results, fields=None):
+    """Return sequence of analysis results as compact structured array.
+
+    Scalar fields are stored as float, `status` as string and all other
+    fields (eg. fit regions) as objects.
+
+    >>> r = to_records([analyse_iv(v, i) for v, i in curves])
+    >>> r['i_600']
+    array([1.2e-07, 1.5e-07])
+    """
+    results = list(results)
+    if fields is None:
+        fields = results[0]._fields if results else ()
+    dtype = []
+    for index, name in enumerate(fields):
+        values = [r[index] for r in results]
+        if name == 'status':
+            dtype.append((name, 'U6'))
+        elif all(np.ndim(value) == 0 and not isinstance(value, str) for value in values):
+            dtype.append((name, float))
+        else:
+            dtype.append((name, object))
+    records = np.empty(len(results), dtype=dtype)
+    for index, (name, _) in enumerate(dtype):
+        column = records[name]
+        for row, r in enumerate(results):
+            column[row] = r[index]
+    return records
+
+
+def stack_curves(*arrays, offsets=None, fill=np.nan):
+    """Stack curves of one or more series into padded 2D arrays.
+
+    Parameters:
+    arrays ... 2D arrays (one curve per row) or 1D ragged value arrays
+    offsets ... start offsets of the curves in ragged value arrays, with the
+                total length as last element (eg. [0, 12, 30, 41])
+    fill ... value used to pad rows of shorter curves
+
+    Returns:
+    list of padded 2D arrays followed by an array of curve lengths
+    """
+    if offsets is None:
+        stacked = [np.atleast_2d(np.asarray(a, dtype=float)) for a in arrays]
+        shape = stacked[0].shape
+        for a in stacked:
+            if a.shape != shape:
+                raise ValueError("All series must have the same shape.")
+        lengths = np.full(shape[0], shape[1], dtype=int)
+        return stacked + [lengths]
+
+    offsets = np.asarray(offsets, dtype=int)
+    lengths = np.diff(offsets)
+    if len(lengths) and lengths.min() < 0:
+        raise ValueError("Offsets must be increasing.")
+    width = lengths.max() if len(lengths) else 0
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    cols = np.arange(offsets[-1] - offsets[0]) - np.repeat(offsets[:-1] - offsets[0], lengths)
+    stacked = []
+    for a in arrays:
+        a = np.asarray(a, dtype=float)[offsets[0]:offsets[-1]]
+        padded = np.full((len(lengths), width), fill, dtype=float)
+        padded[rows, cols] = a
+        stacked.append(padded)
+    return stacked + [lengths]
+
+
+def result_array(names, size, **columns):
+    """Return structured array with float fields `names` and a `status` field.
+
+    Fields not given in `columns` are initialized with NaN, `status` defaults
+    to STATUS_NONE.
+    """
+    names = [name.strip() for name in names.split(',')]
+    dtype = [(name, 'U6' if name == 'status' else float) for name in names]
+    result = np.empty(size, dtype=dtype)
+    for name in names:
+        result[name] = STATUS_NONE if name == 'status' else np.nan
+    for name, value in columns.items():
+        result[name] = value
+    return result
+
+
+def line_fit(x, y, fit='ols'):
+    """
+    Line fit y = a * x + b.
+
+    Parameters:
+    fit ... 'ols' (least squares), 'theil-sen' or 'huber' (see line_fit_many)
+
+    Returns:
+    a, b, r_value ... or None if the points do not define a line (less than
+    two distinct x values or non-finite values)
+    """
+    if fit not in FIT_METHODS:
+        raise ValueError("Invalid fit: {!r}".format(fit))
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 2 or len(x) != len(y):
+        return None
+    if not (np.isfinite(x).all() and np.isfinite(y).all()) or x.min() == x.max():
+        return None
+    if fit != 'ols':
+        a, b, r_value, ok = line_fit_many(x[None, :], y[None, :], np.ones((1, len(x)), dtype=bool), fit)
+        return a[0], b[0], r_value[0]
+    from scipy.stats import linregress
+    a, b, r_value, p_value, std_err = linregress(x, y)
+    return a, b, r_value
+
+
 @params('a, b, x_fit, spl_dev, status, r_value')
-def line_regr_with_cuts(x, y, cut_param, debug=False):
+def line_regr_with_cuts(x, y, cut_param, debug=False, fit='ols'):
     """
     Linear Regression with Cuts:
     - Normalise data set
@@ -71,6 +209,7 @@ def line_regr_with_cuts(x, y, cut_param, debug=False):
     x ... x
     y ... y
     cut_param ... used to cut on 1st derivative of x axis
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     i_max ... max. current
@@ -78,36 +217,679 @@ def line_regr_with_cuts(x, y, cut_param, debug=False):
     i_600 ... current @ 600V
     """
 
+    if fit not in FIT_METHODS:
+        raise ValueError("Invalid fit: {!r}".format(fit))
+
     # init
     r_value = a = b = x_fit = spl_dev = -1
     status = STATUS_NONE
 
     # get spline fit, requires strictlty increasing array
     y_norm = y / np.max(y)
-    x_norm = np.arange(len(y_norm))
-    spl = CubicSpline(x_norm, y_norm)
-    spl_dev = spl(x_norm, 1)
+    spl_dev = spline_dev(y_norm)
 
     # only use data points if local slope is above cut_param
-    idx_fit = [i for i in range(len(spl_dev)) if (abs(spl_dev[i]) > cut_param)]
-
-    with warnings.catch_warnings():
-        warnings.filterwarnings('error')
-        try:
-            x_fit = x[idx_fit[0]:idx_fit[-1] + 1]
-            y_fit = y[idx_fit[0]:idx_fit[-1] + 1]
-            a, b, r_value, p_value, std_err = scipy.stats.linregress(x_fit, y_fit)
-            status = STATUS_PASSED
-        except np.RankWarning:
+    idx_fit = np.flatnonzero(np.abs(spl_dev) > cut_param)
+
+    if not len(idx_fit):
+        print("The array seems empty. Try changing the cut_param parameter.")
+        status = STATUS_FAILED
+    else:
+        x_fit = x[idx_fit[0]:idx_fit[-1] + 1]
+        y_fit = y[idx_fit[0]:idx_fit[-1] + 1]
+        line = line_fit(x_fit, y_fit, fit)
+        if line is None:
             print("The array has too few data points. Try changing the cut_param parameter.")
             status = STATUS_FAILED
-        except (ValueError, TypeError, IndexError):
-            print("The array seems empty. Try changing the cut_param parameter.")
-            status = STATUS_FAILED
+        else:
+            a, b, r_value = line
+            status = STATUS_PASSED
 
     return a, b, x_fit, spl_dev, status, r_value
 
 
+_preprocessing = threading.local()
+
+
+@contextlib.contextmanager
+def reuse_preprocessing():
+    """
+    Context in which batch analyses of the current thread reuse preprocessing
+    (derivatives of the normalised curves) of identical inputs, eg. when the
+    same curves are analysed with different parameters.
+
+    >>> with reuse_preprocessing():
+    ...     for cut_param in (1e-5, 1e-4):
+    ...         analyse_van_der_pauw_many(i, v, cut_param=cut_param)
+    """
+    previous = getattr(_preprocessing, 'cache', None)
+    if previous is None:
+        _preprocessing.cache = {}
+    try:
+        yield
+    finally:
+        _preprocessing.cache = previous
+
+
+def _preprocessed(name, compute, *inputs):
+    """Return compute(), reused for identical inputs within reuse_preprocessing."""
+    cache = getattr(_preprocessing, 'cache', None)
+    if cache is None:
+        return compute()
+    h = hashlib.sha1(name.encode())
+    for value in inputs:
+        if isinstance(value, np.ndarray):
+            h.update(value.dtype.str.encode())
+            h.update(repr(value.shape).encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            h.update(repr(value).encode())
+    key = h.hexdigest()
+    if key not in cache:
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        cache[key] = value
+    return cache[key]
+
+
+def valid_mask(lengths, width):
+    """Return boolean mask of valid (non padded) points of stacked curves."""
+    return np.arange(width) < np.asarray(lengths)[:, None]
+
+
+def span_mask(mask):
+    """Return mask covering the first to the last selected point of each row."""
+    index = np.arange(mask.shape[1])
+    first = np.argmax(mask, axis=1)
+    last = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    return mask.any(axis=1)[:, None] & (index >= first[:, None]) & (index <= last[:, None])
+
+
+@functools.lru_cache(maxsize=32)
+def derivative_operator(n):
+    """
+    Return the tridiagonal system of the 1st derivative at the knots of the
+    not-a-knot cubic spline on x = 0 .. n-1 (see CubicSpline) as (3, n)
+    banded matrix (see scipy.linalg.solve_banded), the right hand side is
+    given by spline_rhs. The matrix is computed once per n and is read only.
+    """
+    banded = np.zeros((3, n))
+    banded[1] = 1.
+    if n > 3:
+        banded[0, 2:] = 1.
+        banded[1, 1:-1] = 4.
+        banded[2, :-2] = 1.
+        # not-a-knot conditions at both ends
+        banded[0, 1] = 2.
+        banded[2, -2] = 2.
+    banded.setflags(write=False)
+    return banded
+
+
+def spline_rhs(y):
+    """
+    Return right hand side of the derivative system (see derivative_operator)
+    of y, or of each row of stacked curves. Two points give a line and three
+    points a parabola, which are solved by the right hand side directly.
+    """
+    slope = np.diff(y, axis=-1)
+    rhs = np.empty(y.shape)
+    if y.shape[-1] == 2:
+        rhs[...] = slope
+    elif y.shape[-1] == 3:
+        rhs[..., 0] = (3 * slope[..., 0] - slope[..., 1]) / 2
+        rhs[..., 1] = (slope[..., 0] + slope[..., 1]) / 2
+        rhs[..., 2] = (3 * slope[..., 1] - slope[..., 0]) / 2
+    else:
+        rhs[..., 0] = (5 * slope[..., 0] + slope[..., 1]) / 2
+        rhs[..., 1:-1] = 3 * (slope[..., :-1] + slope[..., 1:])
+        rhs[..., -1] = (slope[..., -2] + 5 * slope[..., -1]) / 2
+    return rhs
+
+
+def spline_dev(y):
+    """
+    1st derivative of the cubic spline through y on the normalised x axis
+    x = 0 .. n-1, evaluated at the knots. Stacked curves are given as rows.
+    """
+    y = np.asarray(y, dtype=float)
+    if y.shape[-1] < 2:
+        raise ValueError("`x` must contain at least 2 elements.")
+    if not np.isfinite(y).all():
+        raise ValueError("`y` must contain only finite values.")
+    return solve_derivative(y)
+
+
+def solve_derivative(y):
+    """
+    Return 1st derivative at the knots of y, or of each row of stacked curves
+    with at least two points, solving the banded derivative system in O(n).
+
+    The tridiagonal solver eliminates each right hand side column in the same
+    order regardless of the number of rows, so single curves and batches give
+    identical results.
+    """
+    from scipy.linalg import solve_banded
+    y = np.asarray(y, dtype=float)
+    operator = derivative_operator(y.shape[-1])
+    return solve_banded((1, 1), operator, spline_rhs(y).T, check_finite=False).T
+
+
+def spline_dev_many(y, lengths):
+    """
+    1st derivative of cubic splines through stacked curves, evaluated at the
+    knots of the normalised x axis (see line_regr_with_cuts).
+
+    Parameters:
+    y ... padded 2D array, one curve per row
+    lengths ... number of valid points per row
+
+    Returns:
+    padded 2D array of derivatives, NaN for padding, curves with less than
+    two points and curves containing non-finite values
+    """
+    return _preprocessed('spline_dev', lambda: _spline_dev_many(y, lengths), y, np.asarray(lengths))
+
+
+def _spline_dev_many(y, lengths):
+    spl_dev = np.full(y.shape, np.nan)
+    finite = np.isfinite(np.where(valid_mask(lengths, y.shape[1]), y, 0.)).all(axis=1)
+    for length in np.unique(lengths):
+        if length < 2:
+            continue
+        rows = (lengths == length) & finite
+        if not rows.any():
+            continue
+        spl_dev[rows, :length] = solve_derivative(y[rows, :length])
+    return spl_dev
+
+
+def linregress_many(x, y, mask):
+    """
+    Closed-form least squares line fits for each row of x and y, only using
+    points selected by mask.
+
+    Returns:
+    slope, intercept, r_value ... arrays with one value per row
+    ok ... rows with at least two distinct x values
+    """
+    n = np.count_nonzero(mask, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(mask, x, 0.).sum(axis=1) / n
+        y_mean = np.where(mask, y, 0.).sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0.)
+        dy = np.where(mask, y - y_mean[:, None], 0.)
+        ssxm = np.einsum('ij,ij->i', dx, dx)
+        ssym = np.einsum('ij,ij->i', dy, dy)
+        ssxym = np.einsum('ij,ij->i', dx, dy)
+        slope = ssxym / ssxm
+        intercept = y_mean - slope * x_mean
+        r_value = np.clip(ssxym / np.sqrt(ssxm * ssym), -1., 1.)
+    r_value = np.where(ssym == 0, 0., r_value)
+    x_max = np.where(mask, x, -np.inf).max(axis=1, initial=-np.inf)
+    x_min = np.where(mask, x, np.inf).min(axis=1, initial=np.inf)
+    ok = (n >= 2) & (x_max != x_min)
+    return slope, intercept, r_value, ok
+
+
+FIT_METHODS = ('ols', 'theil-sen', 'huber')
+
+HUBER_K = 1.345
+
+
+def _masked_median(values, mask):
+    """Median along axis 1 of values selected by mask, NaN for empty rows."""
+    values = np.sort(np.where(mask, values, np.inf), axis=1)
+    n = np.count_nonzero(mask, axis=1)
+    low = np.maximum((n - 1) // 2, 0)[:, None]
+    high = np.maximum(n // 2, 0)[:, None]
+    median = (np.take_along_axis(values, low, axis=1) + np.take_along_axis(values, high, axis=1))[:, 0] / 2
+    return np.where(n > 0, median, np.nan)
+
+
+def _huber_weights(residuals, mask, k=HUBER_K):
+    """Huber weights of residuals scaled by their median absolute deviation."""
+    scale = 1.4826 * _masked_median(np.abs(residuals), mask)
+    scale = np.where(scale > 0, scale, np.finfo(float).tiny)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        u = np.abs(residuals) / scale
+        weights = np.where(u <= k, 1., k / u)
+    return np.where(mask, weights, 0.)
+
+
+def _weighted_linregress(x, y, weights):
+    """Weighted least squares line fits along axis 1, see linregress_many."""
+    w = weights.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.einsum('ij,ij->i', weights, np.where(weights > 0, x, 0.)) / w
+        y_mean = np.einsum('ij,ij->i', weights, np.where(weights > 0, y, 0.)) / w
+        dx = np.where(weights > 0, x - x_mean[:, None], 0.)
+        dy = np.where(weights > 0, y - y_mean[:, None], 0.)
+        ssxm = np.einsum('ij,ij,ij->i', weights, dx, dx)
+        ssym = np.einsum('ij,ij,ij->i', weights, dy, dy)
+        ssxym = np.einsum('ij,ij,ij->i', weights, dx, dy)
+        slope = ssxym / ssxm
+        intercept = y_mean - slope * x_mean
+        r_value = np.clip(ssxym / np.sqrt(ssxm * ssym), -1., 1.)
+    return slope, intercept, np.where(ssym == 0, 0., r_value)
+
+
+def theil_sen_many(x, y, mask, chunksize=4000000):
+    """
+    Theil-Sen line fits for each row of x and y, only using points selected
+    by mask. The slope is the median of all pairwise slopes, the intercept
+    the median of y - slope * x.
+
+    Returns:
+    slope, intercept ... arrays with one value per row
+    r_value ... correlation coefficient weighted by Huber weights of the residuals
+    ok ... rows with at least two distinct x values
+    """
+    size, width = x.shape
+    first, second = np.triu_indices(width, 1)
+    slope = np.full(size, np.nan)
+    step = max(1, chunksize // max(len(first), 1))
+    for start in range(0, size, step):
+        part = slice(start, start + step)
+        dx = x[part, second] - x[part, first]
+        dy = y[part, second] - y[part, first]
+        pairs = mask[part, first] & mask[part, second] & (dx != 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope[part] = _masked_median(dy / dx, pairs)
+    with np.errstate(invalid='ignore'):
+        intercept = _masked_median(y - slope[:, None] * x, mask)
+        residuals = y - (slope[:, None] * x + intercept[:, None])
+    ok = linregress_many(x, y, mask)[3]
+    _, _, r_value = _weighted_linregress(x, y, _huber_weights(residuals, mask))
+    return slope, intercept, r_value, ok
+
+
+def huber_many(x, y, mask, k=HUBER_K, max_iter=50, tol=1e-10):
+    """
+    Huber line fits for each row of x and y by iteratively reweighted least
+    squares, only using points selected by mask. Residuals are scaled by
+    their median absolute deviation in each iteration.
+
+    Returns:
+    slope, intercept ... arrays with one value per row
+    r_value ... correlation coefficient weighted by the final Huber weights
+    ok ... rows with at least two distinct x values
+    """
+    slope, intercept, r_value, ok = linregress_many(x, y, mask)
+    mask = mask & ok[:, None]
+    active = ok.copy()
+    weights = mask.astype(float)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        residuals = y[active] - (slope[active, None] * x[active] + intercept[active, None])
+        weights[active] = _huber_weights(residuals, mask[active], k)
+        new_slope, new_intercept, _ = _weighted_linregress(x[active], y[active], weights[active])
+        with np.errstate(invalid='ignore'):
+            change = np.abs(new_slope - slope[active]) <= tol * np.abs(new_slope)
+        slope[active] = new_slope
+        intercept[active] = new_intercept
+        active[np.flatnonzero(active)[change]] = False
+    _, _, r_value = _weighted_linregress(x, y, weights)
+    return slope, intercept, r_value, ok
+
+
+def line_fit_many(x, y, mask, fit='ols'):
+    """
+    Line fits for each row of x and y using points selected by mask.
+
+    Parameters:
+    fit ... 'ols' (least squares), 'theil-sen' or 'huber' (robust against outliers)
+
+    Returns:
+    slope, intercept, r_value, ok ... see linregress_many
+    """
+    if fit == 'ols':
+        return linregress_many(x, y, mask)
+    if fit == 'theil-sen':
+        return theil_sen_many(x, y, mask)
+    if fit == 'huber':
+        return huber_many(x, y, mask)
+    raise ValueError("Invalid fit: {!r}".format(fit))
+
+
+class ChebyshevGrid:
+    """
+    Least squares polynomial fits on a fixed grid of x values, using a
+    Chebyshev basis on the scaled grid and a QR factorization. Curves sharing
+    the grid are fitted with one matrix product.
+
+    Parameters:
+    x ... grid of x values
+    degree ... degree of the polynomial
+    """
+
+    def __init__(self, x, degree):
+        x = np.asarray(x, dtype=float)
+        low, high = x.min(), x.max()
+        self.scale = 2. / (high - low) if high > low else 1.
+        self.t = (x - low) * self.scale - 1.
+        self.degree = degree
+        vander = np.polynomial.chebyshev.chebvander(self.t, degree)
+        q, r = np.linalg.qr(vander)
+        diag = np.abs(np.diag(r))
+        if len(x) > degree and diag.min() > diag.max() * len(x) * np.finfo(float).eps:
+            self._fit = np.linalg.solve(r, q.T)
+        else:
+            # rank deficient grid, use minimum norm solution
+            self._fit = np.linalg.pinv(vander)
+        self._derivatives = {0: vander}
+
+    def fit(self, y):
+        """Return Chebyshev coefficients of the fits, one column per curve in y."""
+        return self._fit @ np.asarray(y, dtype=float)
+
+    def evaluate(self, coef, deriv=0):
+        """Return the deriv-th derivative of fitted polynomials at the grid."""
+        matrix = self._derivatives.get(deriv)
+        if matrix is None:
+            der = np.polynomial.chebyshev.chebder(np.eye(self.degree + 1), deriv, scl=self.scale)
+            matrix = np.polynomial.chebyshev.chebvander(self.t, max(self.degree - deriv, 0)) @ der
+            self._derivatives[deriv] = matrix
+        return matrix @ coef
+
+
+@functools.lru_cache(maxsize=32)
+def _chebyshev_grid(key, degree):
+    return ChebyshevGrid(np.frombuffer(key), degree)
+
+
+def chebyshev_grid(x, degree):
+    """Return ChebyshevGrid for x, factorizations are cached per distinct grid."""
+    return _chebyshev_grid(np.ascontiguousarray(x, dtype=float).tobytes(), degree)
+
+
+def breakpoint_split(x, y, start, stop, min_points=3):
+    """
+    Split stacked curves into two line segments [start, k) and [k, stop)
+    minimizing the total squared residuals. All candidates k are evaluated
+    using prefix sums, at O(1) cost each.
+
+    Parameters:
+    x, y ... padded 2D arrays, one curve per row
+    start, stop ... first and end (exclusive) index of the fit region, scalar or per row
+    min_points ... min. number of points of each segment
+
+    Returns:
+    split ... index of the first point of the 2nd segment per row
+    ok ... rows with a valid split
+    """
+    size, width = x.shape
+    index = np.arange(width)
+    start = np.broadcast_to(np.asarray(start), (size,))[:, None]
+    stop = np.broadcast_to(np.asarray(stop), (size,))[:, None]
+    region = (index >= start) & (index < stop)
+
+    # scale to unit range for well conditioned sums
+    with np.errstate(invalid='ignore'):
+        region &= np.isfinite(x) & np.isfinite(y)
+    x_low = np.where(region, x, np.inf).min(axis=1, initial=np.inf)[:, None]
+    x_high = np.where(region, x, -np.inf).max(axis=1, initial=-np.inf)[:, None]
+    x_span = np.where(x_high > x_low, x_high - x_low, 1.)
+    x_low = np.where(np.isfinite(x_low), x_low, 0.)
+    y_scale = np.where(region, np.abs(y), 0.).max(axis=1, initial=0.)[:, None]
+    y_scale = np.where(y_scale > 0, y_scale, 1.)
+    xs = np.where(region, (x - x_low) / x_span, 0.)
+    ys = np.where(region, y / y_scale, 0.)
+
+    # prefix sums, column k holds the sums of the first k points
+    left = np.zeros((6, size, width + 1))
+    for row, values in enumerate((region.astype(float), xs, ys, xs * xs, ys * ys, xs * ys)):
+        np.cumsum(values, axis=1, out=left[row, :, 1:])
+    right = left[:, :, -1:] - left
+
+    def residuals(sums):
+        n, sx, sy, sxx, syy, sxy = sums
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ssxm = sxx - sx * sx / n
+            ssym = syy - sy * sy / n
+            ssxym = sxy - sx * sy / n
+            sse = np.maximum(ssym - ssxym**2 / ssxm, 0.)
+        return np.where((n >= min_points) & (ssxm > 0), sse, np.inf)
+
+    total = residuals(left) + residuals(right)
+    split = np.argmin(total, axis=1)
+    ok = np.isfinite(total[np.arange(size), split])
+    return split, ok
+
+
+def _segments_sse(sums, totals, t1, n1, t2, n2):
+    """Residuals and coefficients of continuous three segment fits (see segments_fit)."""
+    def take(q, k):
+        return np.take_along_axis(sums[q], k, axis=1)
+    c1, x1, xx1, y1, xy1 = (take(q, n1) for q in range(5))
+    c2, x2, xx2, y2, xy2 = (take(q, n2) for q in range(5))
+    n, sx, sxx, sy, sxy, syy = (value[:, None] for value in totals)
+
+    # sums of hinge functions h = (x - t)_+ from suffix sums of points beyond t
+    h1 = x1 - t1 * c1
+    h2 = x2 - t2 * c2
+    xh1 = xx1 - t1 * x1
+    xh2 = xx2 - t2 * x2
+    h1h1 = xx1 - 2 * t1 * x1 + t1**2 * c1
+    h2h2 = xx2 - 2 * t2 * x2 + t2**2 * c2
+    h1h2 = xx2 - (t1 + t2) * x2 + t1 * t2 * c2
+    yh1 = xy1 - t1 * y1
+    yh2 = xy2 - t2 * y2
+
+    # eliminate the common line (normal equations of 1, x) in closed form,
+    # leaving a 2x2 system for the hinge coefficients per candidate
+    det_a = n * sxx - sx**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = np.stack([sxx, -sx, n]) / det_a
+
+        def solve_a(u, v):
+            return inv[0] * u + inv[1] * v, inv[1] * u + inv[2] * v
+
+        p1, q1 = solve_a(h1, xh1)
+        p2, q2 = solve_a(h2, xh2)
+        py, qy = solve_a(sy, sxy)
+        s11 = h1h1 - (h1 * p1 + xh1 * q1)
+        s12 = h1h2 - (h1 * p2 + xh1 * q2)
+        s22 = h2h2 - (h2 * p2 + xh2 * q2)
+        r1 = yh1 - (h1 * py + xh1 * qy)
+        r2 = yh2 - (h2 * py + xh2 * qy)
+        det_s = s11 * s22 - s12**2
+        # singular systems (eg. repeated x values) are not solved
+        regular = (det_s > 1e-12 * s11 * s22) & (det_a > 0)
+        b2 = (s22 * r1 - s12 * r2) / det_s
+        b3 = (s11 * r2 - s12 * r1) / det_s
+        b0 = py - p1 * b2 - p2 * b3
+        b1 = qy - q1 * b2 - q2 * b3
+        sse = syy - (sy * py + sxy * qy) - (r1 * b2 + r2 * b3)
+    coef = np.stack([b0, b1, b2, b3], axis=-1)
+    return np.where(regular, np.maximum(sse, 0.), np.inf), coef
+
+
+def segments_fit(x, y, lengths, min_points=3, refine=8, refine_rounds=3, chunksize=2000000):
+    """
+    Continuous three segment line fits y = b0 + b1 x + b2 (x - t1)_+ +
+    b3 (x - t2)_+ of stacked curves. Breakpoints are searched exhaustively
+    on all pairs of data points and refined between neighbouring points,
+    each candidate costs O(1) using suffix sums.
+
+    Parameters:
+    x, y ... padded 2D arrays, one curve per row
+    lengths ... number of valid points per row
+    min_points ... min. number of points of the outer segments
+    refine ... number of sub steps between data points for the refinement
+    refine_rounds ... number of refinements, each shrinks the step by 1 / refine
+    chunksize ... max. number of candidates (times points per row for the
+    refinement) evaluated at once, bounds the size of temporary arrays
+
+    Returns:
+    t1, t2 ... breakpoints per row
+    a, b ... slopes and intercepts of the lower, middle and upper segment, shape (3, rows)
+    r_value ... correlation coefficient of the model
+    ok ... rows with a valid fit
+    """
+    size, width = x.shape
+    valid = valid_mask(lengths, width)
+    with np.errstate(invalid='ignore'):
+        valid &= np.isfinite(x) & np.isfinite(y)
+    count = np.count_nonzero(valid, axis=1)
+
+    # sort points by x, invalid points last
+    order = np.argsort(np.where(valid, x, np.inf), axis=1, kind='stable')
+    x = np.take_along_axis(x, order, axis=1)
+    y = np.take_along_axis(y, order, axis=1)
+    valid = np.arange(width) < count[:, None]
+
+    # scale to unit range for well conditioned sums
+    x_low = np.where(valid, x, np.inf).min(axis=1, initial=np.inf)
+    x_high = np.where(valid, x, -np.inf).max(axis=1, initial=-np.inf)
+    x_low = np.where(count > 0, x_low, 0.)
+    x_span = np.where(x_high > x_low, x_high - x_low, 1.)
+    y_scale = np.where(valid, np.abs(y), 0.).max(axis=1, initial=0.)
+    y_scale = np.where(y_scale > 0, y_scale, 1.)
+    xs = np.where(valid, (x - x_low[:, None]) / x_span[:, None], 0.)
+    ys = np.where(valid, y / y_scale[:, None], 0.)
+    ones = valid.astype(float)
+
+    # suffix sums, column k holds the sums of the points from index k on
+    sums = np.zeros((5, size, width + 1))
+    for q, values in enumerate((ones, xs, xs * xs, ys, xs * ys)):
+        sums[q, :, :width] = np.cumsum(values[:, ::-1], axis=1)[:, ::-1]
+    totals = [sums[q, :, 0] for q in range(5)] + [np.sum(ys * ys, axis=1)]
+
+    rows = np.arange(size)
+    best_sse = np.full(size, np.inf)
+    best = np.zeros((2, size))
+    best_index = np.zeros((2, size), dtype=int)
+    best_coef = np.zeros((size, 4))
+
+    def search(cost, candidates):
+        """Evaluate candidates in chunks of rows and keep the best per row,
+        candidates(part) returns t1, n1, t2, n2, keep and the data point
+        index pair (or None) of the rows in slice part.
+        """
+        step = max(1, chunksize // max(cost, 1))
+        for start in range(0, size, step):
+            part = slice(start, start + step)
+            t1, n1, t2, n2, keep, index = candidates(part)
+            part_totals = [total[part] for total in totals]
+            sse, coef = _segments_sse(sums[:, part], part_totals, t1, n1, t2, n2)
+            sse = np.where(keep, sse, np.inf)
+            k = np.argmin(sse, axis=1)
+            r = np.arange(len(k))
+            better = sse[r, k] < best_sse[part]
+            sel = rows[part][better]
+            best_sse[sel] = sse[r, k][better]
+            best[0, sel] = t1[r, k][better]
+            best[1, sel] = t2[r, k][better]
+            best_coef[sel] = coef[r, k][better]
+            if index is not None:
+                best_index[0, sel] = index[0][k[better]]
+                best_index[1, sel] = index[1][k[better]]
+
+    # grid search on pairs of data points, points beyond t = x[k] start at k + 1
+    k1, k2 = np.triu_indices(width, 1)
+
+    def pairs(part):
+        shape = (len(rows[part]), len(k1))
+        t1 = np.take_along_axis(xs[part], np.broadcast_to(k1, shape), axis=1)
+        t2 = np.take_along_axis(xs[part], np.broadcast_to(k2, shape), axis=1)
+        keep = (k1 + 1 >= min_points) & (k2 - k1 >= 1) & (count[part, None] - k2 >= min_points)
+        return t1, np.broadcast_to(k1 + 1, shape), t2, np.broadcast_to(k2 + 1, shape), keep, (k1, k2)
+
+    search(len(k1), pairs)
+
+    # refine between the neighbouring data points of the best pair,
+    # then repeatedly around the best candidate with shrinking steps
+    if refine > 0:
+        last = np.maximum(count - 1, 0)[:, None]
+        windows = []
+        for q in range(2):
+            index = best_index[q][:, None]
+            low = np.take_along_axis(xs, np.clip(index - 1, 0, last), axis=1)[:, 0]
+            high = np.take_along_axis(xs, np.clip(index + 1, 0, last), axis=1)[:, 0]
+            windows.append((low, high))
+        masked = np.where(valid, xs, np.inf)
+        fraction = np.linspace(0., 1., 2 * refine + 1)
+
+        def grid(part):
+            t_sub = [low[part, None] + (high - low)[part, None] * fraction for low, high in windows]
+            t1 = np.repeat(t_sub[0], len(fraction), axis=1)
+            t2 = np.tile(t_sub[1], (1, len(fraction)))
+            points = masked[part, None, :]
+            n_le1 = np.count_nonzero(points <= t1[:, :, None], axis=2)
+            n_le2 = np.count_nonzero(points <= t2[:, :, None], axis=2)
+            n_lt2 = np.count_nonzero(points < t2[:, :, None], axis=2)
+            keep = (t1 < t2) & (n_le1 >= min_points) & (count[part, None] - n_lt2 >= min_points)
+            keep &= np.isfinite(best_sse[part])[:, None]
+            return t1, n_le1, t2, n_le2, keep, None
+
+        for _ in range(refine_rounds):
+            # counting points below the candidates compares each with all points of the row
+            search(len(fraction)**2 * width, grid)
+            windows = [(best[q] - (high - low) / (2 * refine), best[q] + (high - low) / (2 * refine))
+                       for q, (low, high) in enumerate(windows)]
+
+    ok = np.isfinite(best_sse)
+    b0, b1, b2, b3 = best_coef.T
+    slopes = np.stack([b1, b1 + b2, b1 + b2 + b3])
+    intercepts = np.stack([b0, b0 - b2 * best[0], b0 - b2 * best[0] - b3 * best[1]])
+
+    # back to original units
+    a = slopes * y_scale / x_span
+    b = intercepts * y_scale - a * x_low
+    t1 = x_low + best[0] * x_span
+    t2 = x_low + best[1] * x_span
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ss_y = totals[5] - totals[3]**2 / totals[0]
+        r_value = np.sqrt(np.clip(1 - best_sse / ss_y, 0., 1.))
+    nan = np.where(ok, 1., np.nan)
+    return t1 * nan, t2 * nan, a * nan, b * nan, np.where(ok, r_value, np.nan), ok
+
+
+def line_regr_with_cuts_many(x, y, cut_param, fit='ols', offsets=None, debug=False):
+    """
+    Linear Regression with Cuts for many curves at once (see
+    line_regr_with_cuts).
+
+    Parameters:
+    x ... x, 2D array (one curve per row) or 1D ragged values
+    y ... y, same layout as x
+    cut_param ... used to cut on 1st derivative of x axis
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields a, b, status, r_value
+    """
+
+    if fit not in FIT_METHODS:
+        raise ValueError("Invalid fit: {!r}".format(fit))
+
+    x, y, lengths = stack_curves(x, y, offsets=offsets)
+    result = result_array('a, b, status, r_value', len(lengths), a=-1, b=-1, r_value=-1)
+    result['status'] = STATUS_FAILED
+    if not len(lengths) or not x.shape[1]:
+        return result
+
+    valid = valid_mask(lengths, x.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y_norm = y / np.where(valid, y, -np.inf).max(axis=1)[:, None]
+    spl_dev = spline_dev_many(y_norm, lengths)
+
+    # only use data points if local slope is above cut_param
+    idx_fit = span_mask(valid & (np.abs(spl_dev) > cut_param))
+
+    a, b, r_value, ok = line_fit_many(x, y, idx_fit, fit)
+    result['a'] = np.where(ok, a, -1)
+    result['b'] = np.where(ok, b, -1)
+    result['r_value'] = np.where(ok, r_value, -1)
+    result['status'] = np.where(ok, STATUS_PASSED, STATUS_FAILED)
+
+    return result
+
+
 ## Main Analysis Functions
 ## ------------------------------------
 
@@ -136,9 +918,9 @@ def analyse_iv(v, i, debug=False):
     idx_maxi = np.argmax(np.abs(i))
     v_max = v[idx_maxv]
     i_max = i[idx_maxv]
-    i_800 = np.array([i[k] for k in range(len(v)) if np.abs(v[k]) == 800])
-    i_600 = np.array([i[k] for k in range(len(v)) if np.abs(v[k]) == 600])
-    i_300 = np.array([i[k] for k in range(len(v)) if np.abs(v[k]) == 300])
+    i_800 = i[np.abs(v) == 800]
+    i_600 = i[np.abs(v) == 600]
+    i_300 = i[np.abs(v) == 300]
 
     if len(i_800) != 1:
         i_800 = np.nan
@@ -158,8 +940,46 @@ def analyse_iv(v, i, debug=False):
     return v_max, i_max, i_800, i_600, i_300, status
 
 
+def analyse_iv_many(v, i, offsets=None, debug=False):
+    """
+    Diode IV: Extract current in standard situation for many curves at once.
+
+    Parameters:
+    v ... voltages, 2D array (one curve per row) or 1D ragged values
+    i ... currents, same layout as v
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields v_max, i_max, i_800, i_600, i300, status
+    """
+
+    v, i, lengths = stack_curves(v, i, offsets=offsets)
+    size = len(lengths)
+    result = result_array('v_max, i_max, i_800, i_600, i300, status', size)
+    if not size or not v.shape[1]:
+        result['status'] = STATUS_FAILED
+        return result
+
+    rows = np.arange(size)
+    valid = valid_mask(lengths, v.shape[1])
+    abs_v = np.abs(v)
+
+    idx_maxv = np.argmax(np.where(valid, abs_v, -np.inf), axis=1)
+    result['v_max'] = v[rows, idx_maxv]
+    result['i_max'] = i[rows, idx_maxv]
+
+    for name, voltage in (('i_800', 800), ('i_600', 600), ('i300', 300)):
+        match = abs_v == voltage
+        unique = np.count_nonzero(match, axis=1) == 1
+        result[name] = np.where(unique, i[rows, np.argmax(match, axis=1)], np.nan)
+
+    result['status'] = np.where(lengths > 0, STATUS_PASSED, STATUS_FAILED)
+
+    return result
+
+
 @params('v_dep1, v_dep2, rho, conc, a_rise, b_rise, v_rise, a_const, b_const, v_const, spl_dev, status')
-def analyse_cv(v, c, area=1.56e-6, carrier='electrons', cut_param=0.008, max_v=500, savgol_windowsize=None, min_correl=0.1, debug=False):
+def analyse_cv(v, c, area=1.56e-6, carrier='electrons', cut_param=0.008, max_v=500, savgol_windowsize=None, min_correl=0.1, method='derivative', debug=False):
     """
     Diode CV: Extract depletion voltage and resistivity.
 
@@ -172,14 +992,20 @@ def analyse_cv(v, c, area=1.56e-6, carrier='electrons', cut_param=0.008, max_v=5
     max_v ... for definition of fit region, only consider voltages < max_v
     savgol_windowsize ... number of points to calculate the derivative, needs to be odd
     min_correl ... minimum correlation coefficient to say that it worked
+    method ... 'derivative' to id regions by cuts on the 1st derivative,
+               'breakpoint' for the best split into a rise and a constant
+               line (cut_param and savgol_windowsize are not used)
 
     Returns:
-    v_dep1 ... full depletion voltage via inflection
+    v_dep1 ... full depletion voltage via inflection (breakpoint for method 'breakpoint')
     v_dep2 ... full depletion voltage via intersection
     rho ... resistivity
     conc ... bulk doping concentration
     """
 
+    if method not in ('derivative', 'breakpoint'):
+        raise ValueError("Invalid CV method: {!r}".format(method))
+
     # init
     v_dep1 = v_dep2 = rho = conc = np.nan
     a_rise = b_rise = a_const = b_const = np.nan
@@ -195,47 +1021,66 @@ def analyse_cv(v, c, area=1.56e-6, carrier='electrons', cut_param=0.008, max_v=5
     # invert and square
     c = 1. / c**2
 
-    # get spline fit, requires strictlty increasing array
-    y_norm = c / np.max(c)
-    x_norm = np.arange(len(y_norm))
-    # spl = CubicSpline(x_norm, y_norm)
-    # spl_dev = spl(x_norm, 1)
-    spl_dev = scipy.signal.savgol_filter(y_norm, window_length=savgol_windowsize, polyorder=1, deriv=1)
-
     # for definition of fit region, only consider voltages < max_v
     idv_max = max([i for i,a in enumerate(v) if abs(a) < max_v])
-    spl_dev = spl_dev[:idv_max]
-
-    idx_rise = []
-    idx_const = []
-
-    with warnings.catch_warnings():
-        warnings.filterwarnings('error')
-
-        try:
-            # get regions for indexing
-            idx_rise = [i for i in range(2, len(spl_dev-1)) if ((spl_dev[i]) > cut_param)]  # the first and last value seems to be off sometimes
-            idx_const = [i for i in range(2, len(spl_dev-1)) if ((spl_dev[i]) < cut_param) and i > idx_rise[-1]]
 
-            v_rise = v[idx_rise[0]:idx_rise[-1] + 1]
-            v_const = v[idx_const[0]:idx_const[-1] + 1]
-            c_rise = c[idx_rise[0]:idx_rise[-1] + 1]
-            c_const = c[idx_const[0]:idx_const[-1] + 1]
-
-            # line fits to each region
-            a_rise, b_rise, r_value_rise, p_value_rise, std_err_rise = scipy.stats.linregress(v_rise, c_rise)
-            a_const, b_const, r_value_const, p_value_const, std_err_const = scipy.stats.linregress(v_const, c_const)
-            #print("c raise {:5.3f}, const {:5.3f}".format(r_value_rise,r_value_const))
-
-            if carrier == CARRIER_HOLES:
-                mu = 450 * 1e-4
-            elif carrier == CARRIER_ELECTRONS:
-                mu = 1350 * 1e-4
-            else:
-                raise ValueError('Not a valid type of majority carrier.')
+    if method == 'breakpoint':
+        spl_dev = np.nan
+    else:
+        # get spline fit, requires strictlty increasing array
+        y_norm = c / np.max(c)
+        # spl = CubicSpline(x_norm, y_norm)
+        # spl_dev = spl(x_norm, 1)
+        import scipy.signal
+        spl_dev = scipy.signal.savgol_filter(y_norm, window_length=savgol_windowsize, polyorder=1, deriv=1)
+        spl_dev = spl_dev[:idv_max]
+
+    if carrier == CARRIER_HOLES:
+        mu = 450 * 1e-4
+    elif carrier == CARRIER_ELECTRONS:
+        mu = 1350 * 1e-4
+    else:
+        mu = None  # not a valid type of majority carrier
+
+    # get regions for indexing, the first and last value seems to be off sometimes
+    if method == 'breakpoint':
+        split, ok = breakpoint_split(np.asarray(v, dtype=float)[None, :], np.asarray(c, dtype=float)[None, :], 2, idv_max)
+        idx_rise = np.arange(2, split[0]) if ok[0] else []
+        idx_const = np.arange(split[0], idv_max) if ok[0] else []
+        idx_dep1 = split[0]
+    else:
+        index = np.arange(len(spl_dev))
+        idx_rise = np.flatnonzero((index >= 2) & (spl_dev > cut_param))
+        idx_const = []
+        if len(idx_rise):
+            idx_const = np.flatnonzero((index >= 2) & (spl_dev < cut_param) & (index > idx_rise[-1]))
+        idx_dep1 = np.argmax(spl_dev)
+
+    fit_rise = fit_const = None
+    if len(idx_rise) and len(idx_const):
+        v_rise = v[idx_rise[0]:idx_rise[-1] + 1]
+        v_const = v[idx_const[0]:idx_const[-1] + 1]
+        c_rise = c[idx_rise[0]:idx_rise[-1] + 1]
+        c_const = c[idx_const[0]:idx_const[-1] + 1]
+
+        # line fits to each region
+        fit_rise = line_fit(v_rise, c_rise)
+        fit_const = line_fit(v_const, c_const)
+
+    if mu is None or fit_rise is None or fit_const is None:
+        status = STATUS_FAILED
+    else:
+        a_rise, b_rise, r_value_rise = fit_rise
+        a_const, b_const, r_value_const = fit_const
 
+        # intersection and concentration require a rising, non parallel region
+        if a_rise == 0 or a_rise == a_const:
+            status = STATUS_FAILED
+        elif abs(r_value_rise) < min_correl or abs(r_value_const) < min_correl:
+            status = STATUS_FAILED
+        else:
             # full depletion voltage via max. 1st derivative
-            v_dep1 = v[np.argmax(spl_dev)]
+            v_dep1 = v[idx_dep1]
 
             # full depletion via intersection
             v_dep2 = (b_const - b_rise) / (a_rise - a_const)
@@ -245,31 +1090,125 @@ def analyse_cv(v, c, area=1.56e-6, carrier='electrons', cut_param=0.008, max_v=5
             rho = 1. / (mu * 1.6e-19 * conc)
             status = STATUS_PASSED
 
-            if abs(r_value_rise) < min_correl or abs(r_value_const) < min_correl or status == STATUS_FAILED:
-                status = STATUS_FAILED
+    if status == STATUS_FAILED:
+        #print("The fit didn't work as expected, returning nan")
+        return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, STATUS_FAILED
+    return v_dep1, v_dep2, rho, conc, a_rise, b_rise, v_rise, a_const, b_const, v_const, spl_dev, status
 
-            #print("v_rise: "+str(v_rise))
-            #print("r rise: "+str(r_value_rise))
-            #print("r const: "+str(r_value_const))
-            #print("v_const: "+str(v_const))
 
+def analyse_cv_many(v, c, area=1.56e-6, carrier='electrons', cut_param=0.008, max_v=500, savgol_windowsize=None, min_correl=0.1, method='derivative', offsets=None, debug=False):
+    """
+    Diode CV: Extract depletion voltage and resistivity for many curves at
+    once (see analyse_cv).
 
-        except np.RankWarning:
-            status = STATUS_FAILED
-            print("The array has too few data points. Try changing the cut_param parameter.")
+    Parameters:
+    v ... voltages, 2D array (one curve per row) or 1D ragged values
+    c ... capacitances, same layout as v
+    area ... implant size in [m^2], scalar or one value per curve
+    carrier ... majority charge carriers ['holes', 'electrons']
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    max_v ... for definition of fit region, only consider voltages < max_v
+    savgol_windowsize ... number of points to calculate the derivative, needs to be odd
+    min_correl ... minimum correlation coefficient to say that it worked
+    method ... 'derivative' or 'breakpoint' (see analyse_cv)
+    offsets ... curve offsets for ragged values (see stack_curves)
 
-        except (ValueError, TypeError, IndexError):
-            status = STATUS_FAILED
-            #print("The array seems empty. Try changing the cut_param parameter.")
+    Returns:
+    structured array with fields v_dep1, v_dep2, rho, conc, a_rise, b_rise,
+    a_const, b_const, status
+    """
 
-        if status == STATUS_FAILED:
-            #print("The fit didn't work as expected, returning nan")
-            return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, STATUS_FAILED
-    return v_dep1, v_dep2, rho, conc, a_rise, b_rise, v_rise, a_const, b_const, v_const, spl_dev, status
+    if method not in ('derivative', 'breakpoint'):
+        raise ValueError("Invalid CV method: {!r}".format(method))
+
+    v, c, lengths = stack_curves(v, c, offsets=offsets)
+    size, width = v.shape
+    result = result_array('v_dep1, v_dep2, rho, conc, a_rise, b_rise, a_const, b_const, status', size)
+    result['status'] = STATUS_FAILED
+
+    if carrier == CARRIER_HOLES:
+        mu = 450 * 1e-4
+    elif carrier == CARRIER_ELECTRONS:
+        mu = 1350 * 1e-4
+    else:
+        return result
+    if not size or not width:
+        return result
+
+    valid = valid_mask(lengths, width)
+
+    # invert and square
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = 1. / c**2
+        y_norm = c / np.where(valid, c, -np.inf).max(axis=1)[:, None]
+
+    # for definition of fit region, only consider voltages < max_v
+    index = np.arange(width)
+    rows = np.arange(size)
+    below = valid & (np.abs(v) < max_v)
+    idv_max = np.where(below.any(axis=1), width - 1 - np.argmax(below[:, ::-1], axis=1), 0)
+    in_range = index < idv_max[:, None]
+    region = in_range & (index >= 2)
+
+    if method == 'breakpoint':
+        # best split into rise and constant line
+        split, ok_split = breakpoint_split(v, c, 2, idv_max)
+        rise = region & (index < split[:, None]) & ok_split[:, None]
+        const = region & (index >= split[:, None]) & ok_split[:, None]
+        idx_dep1 = split
+    else:
+        # filter curves of equal length along axis 1
+        def savgol_dev():
+            import scipy.signal
+            spl_dev = np.full((size, width), np.nan)
+            for length in np.unique(lengths):
+                windowsize = savgol_windowsize
+                if windowsize is None:
+                    windowsize = int(length / 30 + 1) * 2 + 1
+                if windowsize > length:
+                    continue
+                group = lengths == length
+                spl_dev[group, :length] = scipy.signal.savgol_filter(y_norm[group, :length], window_length=windowsize, polyorder=1, deriv=1, axis=1)
+            return spl_dev
+
+        spl_dev = _preprocessed('savgol_dev', savgol_dev, y_norm, lengths, savgol_windowsize)
+
+        # get regions for indexing, the first and last value seems to be off sometimes
+        rise = region & (spl_dev > cut_param)
+        last_rise = width - 1 - np.argmax(rise[:, ::-1], axis=1)
+        const = region & (spl_dev < cut_param) & (index > last_rise[:, None])
+        idx_dep1 = np.argmax(np.where(in_range, spl_dev, -np.inf), axis=1)
+
+    # line fits to each region
+    a_rise, b_rise, r_value_rise, ok_rise = linregress_many(v, c, span_mask(rise))
+    a_const, b_const, r_value_const, ok_const = linregress_many(v, c, span_mask(const))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # full depletion voltage via max. 1st derivative
+        v_dep1 = v[rows, idx_dep1]
+
+        # full depletion via intersection
+        v_dep2 = (b_const - b_rise) / (a_rise - a_const)
+
+        # rest
+        conc = 2. / (1.6e-19 * 11.9 * 8.854e-12 * a_rise * np.asarray(area)**2)
+        rho = 1. / (mu * 1.6e-19 * conc)
+
+    passed = ok_rise & ok_const & (a_rise != 0) & (a_rise != a_const)
+    passed &= ~(np.abs(r_value_rise) < min_correl) & ~(np.abs(r_value_const) < min_correl)
+    columns = {
+        'v_dep1': v_dep1, 'v_dep2': v_dep2, 'rho': rho, 'conc': conc,
+        'a_rise': a_rise, 'b_rise': b_rise, 'a_const': a_const, 'b_const': b_const
+    }
+    for name, value in columns.items():
+        result[name] = np.where(passed, value, np.nan)
+    result['status'] = np.where(passed, STATUS_PASSED, STATUS_FAILED)
+
+    return result
 
 
 @params('v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox, a_acc, b_acc, v_acc, a_dep, b_dep, v_dep, a_inv, b_inv, v_inv,  spl_dev, status')
-def analyse_mos(v, c, cut_param=0.02, debug=False, min_r_value=0.4):
+def analyse_mos(v, c, cut_param=0.02, debug=False, min_r_value=0.4, method='derivative'):
     """
     Metal oxide Capacitor: Extract flatband voltage, oxide thickness and charge density.
 
@@ -277,15 +1216,21 @@ def analyse_mos(v, c, cut_param=0.02, debug=False, min_r_value=0.4):
     v ... voltage (V)
     c ... capacitance (F)
     cut_param ... used to cut on 1st derivative to id voltage regions
-
+    min_r_value ... minimum correlation coefficient of the line fits
+    method ... 'derivative' to id regions by cuts on the 1st derivative,
+               'segments' for a continuous three segment line fit
+               (cut_param is not used, min_r_value applies to the whole model)
 
     Returns:
-    v_fb1 ... flatband voltage via inflection (V)
+    v_fb1 ... flatband voltage via inflection, centre of the depletion segment for method 'segments' (V)
     v_fb2 ... flatband voltage via intersection (V)
     t_ox ... oxide thickness (um)
     n_ox ... oxide charge density (cm^-2)
     """
 
+    if method not in ('derivative', 'segments'):
+        raise ValueError("Invalid MOS method: {!r}".format(method))
+
     ## init
     v_fb1 = v_fb2 = t_ox = n_ox = np.nan
     a_acc = b_acc = a_dep = b_dep = a_inv = b_inv = spl_dev = np.nan
@@ -298,37 +1243,57 @@ def analyse_mos(v, c, cut_param=0.02, debug=False, min_r_value=0.4):
     c_acc = np.mean(c[-5:])
     c_inv = np.mean(c[:5])
 
+    v = np.asarray(v)
+    if method == 'segments':
+        t1, t2, a, b, r_value, ok = segments_fit(v[None, :], np.asarray(c, dtype=float)[None, :], [len(v)])
+        (a_inv, a_dep, a_acc), (b_inv, b_dep, b_acc) = a[:, 0], b[:, 0]
+        if not ok[0] or a_dep == a_acc:
+            return v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox, a_acc, b_acc, v_acc, a_dep, b_dep, v_dep, a_inv, b_inv, v_inv, spl_dev, STATUS_FAILED
+        acc = v >= t2[0]
+        inv = v <= t1[0]
+        v_acc, v_dep, v_inv = v[acc], v[(v >= t1[0]) & (v <= t2[0])], v[inv]
+        c_acc, c_inv = c[acc], c[inv]
+        if r_value[0] > min_r_value:
+            v_fb1 = (t1[0] + t2[0]) / 2
+            v_fb2 = (b_acc - b_dep) / (a_dep - a_acc)
+            n_ox = np.mean(c_acc) / (1.602e-19 * (0.1290**2)) * (0.69 + v_fb2)
+            t_ox = 3.9 * 8.85e-12 * (0.001290**2) / np.mean(c_acc) * 1e6
+            status = STATUS_PASSED
+        return v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox, a_acc, b_acc, v_acc, a_dep, b_dep, v_dep, a_inv, b_inv, v_inv, spl_dev, status
+
     # get spline fit, requires strictlty increasing array
     y_norm = c / np.max(c)
-    x_norm = np.arange(len(y_norm))
-    spl = CubicSpline(x_norm, y_norm)
-    spl_dev = spl(x_norm, 1)
+    spl_dev = spline_dev(y_norm)
 
-    # get regions for indexing
-    idx_acc = [i for i in range(len(spl_dev)) if (abs(spl_dev[i]) < cut_param and v[i] > v[np.argmax(spl_dev)])]
-    idx_dep = [i for i in range(len(spl_dev)) if (v[i] > v[np.argmax(spl_dev)] - 0.25 and v[i] < v[np.argmax(spl_dev)] + 0.25)]
-    idx_inv = [i for i in range(len(spl_dev)) if (abs(spl_dev[i]) < cut_param and v[i] < v[np.argmin(spl_dev)])]
-
-    with warnings.catch_warnings():
-        warnings.filterwarnings('error')
-
-        try:
-            v_acc = v[idx_acc[0]:idx_acc[-1] + 1]
-            v_dep = v[idx_dep[0]:idx_dep[-1] + 1]
-            v_inv = v[idx_inv[0]:idx_inv[-1] + 1]
-            c_acc = c[idx_acc[0]:idx_acc[-1] + 1]
-            c_dep = c[idx_dep[0]:idx_dep[-1] + 1]
-            c_inv = c[idx_inv[0]:idx_inv[-1] + 1]
-
-            # line fits to each region
-            a_acc, b_acc, r_value_acc, p_value, std_err = scipy.stats.linregress(v_acc, c_acc)
-            a_dep, b_dep, r_value_dep, p_value, std_err = scipy.stats.linregress(v_dep, c_dep)
-            a_inv, b_inv, r_value_inv, p_value, std_err = scipy.stats.linregress(v_inv, c_inv)
-
-            # print("  r: "+str(r_value_acc)+"  "+str(r_value_dep)+"  "+str(r_value_inv))
-
-            if (np.abs(np.array([r_value_acc, r_value_dep, r_value_inv])) > min_r_value).all():
-                # print("yes")
+    # get regions for indexing, the inflection is only located once
+    v_max_dev = v[np.argmax(spl_dev)]
+    v_min_dev = v[np.argmin(spl_dev)]
+    flat = np.abs(spl_dev) < cut_param
+    idx_acc = np.flatnonzero(flat & (v > v_max_dev))
+    idx_dep = np.flatnonzero((v > v_max_dev - 0.25) & (v < v_max_dev + 0.25))
+    idx_inv = np.flatnonzero(flat & (v < v_min_dev))
+
+    if not (len(idx_acc) and len(idx_dep) and len(idx_inv)):
+        status = STATUS_FAILED
+    else:
+        v_acc = v[idx_acc[0]:idx_acc[-1] + 1]
+        v_dep = v[idx_dep[0]:idx_dep[-1] + 1]
+        v_inv = v[idx_inv[0]:idx_inv[-1] + 1]
+        c_acc = c[idx_acc[0]:idx_acc[-1] + 1]
+        c_dep = c[idx_dep[0]:idx_dep[-1] + 1]
+        c_inv = c[idx_inv[0]:idx_inv[-1] + 1]
+
+        # line fits to each region
+        fits = line_fit(v_acc, c_acc), line_fit(v_dep, c_dep), line_fit(v_inv, c_inv)
+
+        if any(fit is None for fit in fits):
+            status = STATUS_FAILED
+        else:
+            (a_acc, b_acc, r_value_acc), (a_dep, b_dep, r_value_dep), (a_inv, b_inv, r_value_inv) = fits
+
+            if a_dep == a_acc:
+                status = STATUS_FAILED
+            elif (np.abs(np.array([r_value_acc, r_value_dep, r_value_inv])) > min_r_value).all():
                 # flatband voltage via inflection
                 v_fb1 = v[np.argmax(spl_dev)]
 
@@ -341,16 +1306,169 @@ def analyse_mos(v, c, cut_param=0.02, debug=False, min_r_value=0.4):
                 t_ox = 3.9 * 8.85e-12 * (0.001290**2) / np.mean(c_acc) * 1e6
                 status = STATUS_PASSED
 
-        except np.RankWarning:
-            status = STATUS_FAILED
-            print("rank warning")
+    return v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox, a_acc, b_acc, v_acc, a_dep, b_dep, v_dep, a_inv, b_inv, v_inv, spl_dev, status
 
-        except (ValueError, TypeError, IndexError):
-            #traceback.print_exc()
-            status = STATUS_FAILED
-            #print("errrrrrrr"+str(e))
 
-    return v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox, a_acc, b_acc, v_acc, a_dep, b_dep, v_dep, a_inv, b_inv, v_inv, spl_dev, status
+def analyse_mos_many(v, c, cut_param=0.02, min_r_value=0.4, method='derivative', offsets=None, debug=False):
+    """
+    Metal oxide Capacitor: Extract flatband voltage, oxide thickness and
+    charge density for many curves at once (see analyse_mos).
+
+    Parameters:
+    v ... voltages, 2D array (one curve per row) or 1D ragged values
+    c ... capacitances, same layout as v
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    min_r_value ... minimum correlation coefficient of all three line fits
+    method ... 'derivative' or 'segments' (see analyse_mos)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox,
+    a_acc, b_acc, a_dep, b_dep, a_inv, b_inv, status
+    """
+
+    if method not in ('derivative', 'segments'):
+        raise ValueError("Invalid MOS method: {!r}".format(method))
+
+    v, c, lengths = stack_curves(v, c, offsets=offsets)
+    size, width = v.shape
+    result = result_array('v_fb1, v_fb2, c_acc, c_inv, t_ox, n_ox, a_acc, b_acc, a_dep, b_dep, a_inv, b_inv, status', size)
+    result['status'] = STATUS_FAILED
+    if not size or not width:
+        return result
+
+    valid = valid_mask(lengths, width)
+    index = np.arange(width)
+    rows = np.arange(size)
+
+    # take average of last 5 samples for accumulation and inversion capacitance
+    with np.errstate(invalid='ignore'):
+        last = valid & (index >= lengths[:, None] - 5)
+        c_acc = np.where(last, c, 0.).sum(axis=1) / np.count_nonzero(last, axis=1)
+        first = valid & (index < 5)
+        c_inv = np.where(first, c, 0.).sum(axis=1) / np.count_nonzero(first, axis=1)
+
+    if method == 'segments':
+        t1, t2, a, b, r_value, ok = segments_fit(v, c, lengths)
+        a_inv, a_dep, a_acc = a
+        b_inv, b_dep, b_acc = b
+        ok &= a_dep != a_acc
+        ok_acc = ok_dep = ok_inv = ok
+        with np.errstate(invalid='ignore'):
+            acc = valid & (v >= t2[:, None])
+            inv = valid & (v <= t1[:, None])
+            c_acc = np.where(ok, np.where(acc, c, 0.).sum(axis=1) / np.count_nonzero(acc, axis=1), c_acc)
+            c_inv = np.where(ok, np.where(inv, c, 0.).sum(axis=1) / np.count_nonzero(inv, axis=1), c_inv)
+        passed = ok & (r_value > min_r_value)
+
+        # flatband voltage via centre of the depletion segment
+        v_fb1 = (t1 + t2) / 2
+    else:
+        # get spline fit, requires strictlty increasing array
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_norm = c / np.where(valid, c, -np.inf).max(axis=1)[:, None]
+        spl_dev = spline_dev_many(y_norm, lengths)
+        finite = valid & np.isfinite(spl_dev)
+
+        # get regions for indexing
+        v_max_dev = v[rows, np.argmax(np.where(finite, spl_dev, -np.inf), axis=1)][:, None]
+        v_min_dev = v[rows, np.argmin(np.where(finite, spl_dev, np.inf), axis=1)][:, None]
+        with np.errstate(invalid='ignore'):
+            flat = finite & (np.abs(spl_dev) < cut_param)
+            acc = span_mask(flat & (v > v_max_dev))
+            dep = span_mask(finite & (v > v_max_dev - 0.25) & (v < v_max_dev + 0.25))
+            inv = span_mask(flat & (v < v_min_dev))
+
+        # line fits to each region
+        a_acc, b_acc, r_value_acc, ok_acc = linregress_many(v, c, acc)
+        a_dep, b_dep, r_value_dep, ok_dep = linregress_many(v, c, dep)
+        a_inv, b_inv, r_value_inv, ok_inv = linregress_many(v, c, inv)
+        ok = ok_acc & ok_dep & ok_inv
+
+        # accumulation and inversion capacitance from the fit regions if all regions were found
+        found = acc.any(axis=1) & dep.any(axis=1) & inv.any(axis=1)
+        with np.errstate(invalid='ignore'):
+            c_acc = np.where(found, np.where(acc, c, 0.).sum(axis=1) / np.count_nonzero(acc, axis=1), c_acc)
+            c_inv = np.where(found, np.where(inv, c, 0.).sum(axis=1) / np.count_nonzero(inv, axis=1), c_inv)
+
+        r_values = np.abs(np.stack([r_value_acc, r_value_dep, r_value_inv]))
+        passed = ok & (r_values > min_r_value).all(axis=0)
+
+        # flatband voltage via inflection
+        v_fb1 = v_max_dev[:, 0]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # flatband voltage via intersection
+        v_fb2 = (b_acc - b_dep) / (a_dep - a_acc)
+
+        n_ox = c_acc / (1.602e-19 * (0.1290**2)) * (0.69 + v_fb2)
+        t_ox = 3.9 * 8.85e-12 * (0.001290**2) / c_acc * 1e6
+
+    for name, value in (('v_fb1', v_fb1), ('v_fb2', v_fb2), ('t_ox', t_ox), ('n_ox', n_ox)):
+        result[name] = np.where(passed, value, np.nan)
+    for name, value, fit_ok in (('a_acc', a_acc, ok_acc), ('b_acc', b_acc, ok_acc),
+                                ('a_dep', a_dep, ok_dep), ('b_dep', b_dep, ok_dep),
+                                ('a_inv', a_inv, ok_inv), ('b_inv', b_inv, ok_inv)):
+        result[name] = np.where(ok & fit_ok, value, np.nan)
+    result['c_acc'] = c_acc
+    result['c_inv'] = c_inv
+    result['status'] = np.where(passed, STATUS_PASSED, np.where(ok, STATUS_NONE, STATUS_FAILED))
+
+    return result
+
+
+class _GCDCurve:
+    """
+    Preprocessing shared by the GCD algorithms (gradient, spline derivative,
+    derivative of the polynomial fit and current minimum), computed once on
+    first use.
+    Precomputed values can be passed by batch callers.
+    """
+
+    degree = 10
+
+    def __init__(self, v, i, gradient=None, spl_dev=None, poly_dev=None):
+        self.v = v
+        self.i = i
+        self._gradient = gradient
+        self._spl_dev = spl_dev
+        self._poly_dev = poly_dev
+        self._i_min_index = None
+
+    @property
+    def gradient(self):
+        """1st derivative of the current."""
+        if self._gradient is None:
+            self._gradient = np.gradient(self.i)
+        return self._gradient
+
+    @property
+    def spl_dev(self):
+        """1st derivative of the spline fit of the normalised abs. current."""
+        if self._spl_dev is None:
+            y_norm = np.abs(self.i) / np.max(np.abs(self.i))
+            self._spl_dev = spline_dev(y_norm)
+        return self._spl_dev
+
+    @property
+    def poly_dev(self):
+        """1st derivative of the polynomial fit of the current over the voltage."""
+        if self._poly_dev is None:
+            grid = chebyshev_grid(self.v, self.degree)
+            self._poly_dev = grid.evaluate(grid.fit(self.i), 1)
+        return self._poly_dev
+
+    @property
+    def i_min_index(self):
+        """Index of the current minimum."""
+        if self._i_min_index is None:
+            self._i_min_index = np.argmin(self.i)
+        return self._i_min_index
+
+    def windows(self, values):
+        """Return fixed accumulation, depletion and inversion windows of values."""
+        index = self.i_min_index
+        return values[1:6], values[index:(index + 5)], values[-5:]
 
 
 @params('i_surf, i_bulk, i_acc, i_dep, i_inv, v_acc, v_dep, v_inv, i_acc_relstd, i_dep_relstd, i_inv_relstd, spl_dev, status')
@@ -365,8 +1483,12 @@ def analyse_gcd_num(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
     Return:
         surface current, bulk generation current
     """
-    voltage = v
-    current = i
+    return _gcd_num(_GCDCurve(v, i), maxreldev)
+
+
+def _gcd_num(curve, maxreldev):
+    voltage = curve.v
+    current = curve.i
     # initialize defaults
     i_surf = i_bulk = np.nan
     i_acc = i_dep = i_inv = spl_dev = np.nan
@@ -376,7 +1498,7 @@ def analyse_gcd_num(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
     v_dep = []
     v_inv = []
     try:
-        derivative = np.gradient(current)
+        derivative = curve.gradient
         der_min = min(derivative) #transition point from depletion to inversion
         der_max = max(derivative) #transition point from accumulation to depletion
         ind_min = int(np.where(derivative == der_min)[0])
@@ -425,9 +1547,7 @@ def analyse_gcd_num(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
         i_bulk = np.nan
 
     #parameters that were needed before and technically are not needed anymore:
-    v_acc = voltage[1:6]
-    v_dep = voltage[np.argmin(current):(np.argmin(current) + 5)]
-    v_inv = voltage[-5:]
+    v_acc, v_dep, v_inv = curve.windows(voltage)
     spl_dev= "norm"
 
     return i_surf, i_bulk, i_acc, i_dep, i_inv, v_acc, v_dep, v_inv, i_acc_relstd, i_dep_relstd, i_inv_relstd, spl_dev, status
@@ -448,6 +1568,12 @@ def analyse_gcd_legacy(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
     i_surf ... surface generation current
     i_bulk ... bulk generation current
     """
+    return _gcd_legacy(_GCDCurve(v, i), maxreldev)
+
+
+def _gcd_legacy(curve, maxreldev):
+    v = curve.v
+    i = curve.i
     # initialize defaults
     i_surf = i_bulk = np.nan
     i_acc = i_dep = i_inv = spl_dev = np.nan
@@ -457,11 +1583,7 @@ def analyse_gcd_legacy(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
     v_dep = []
     v_inv = []
     # get spline fit, requires strictlty increasing array
-    y_norm = np.abs(i) / np.max(np.abs(i))
-    x_norm = np.arange(len(y_norm))
-
-    spl = CubicSpline(x_norm, y_norm)
-    spl_dev = spl(x_norm, 1)
+    spl_dev = curve.spl_dev
 
     i_acc_relstd = np.nan
     i_dep_relstd = np.nan
@@ -469,7 +1591,7 @@ def analyse_gcd_legacy(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
 
     # get regions for indexing
     try:
-        vmin = v[np.argmin(i)]
+        vmin = v[curve.i_min_index]
         idx_acc = [i for i in range(len(spl_dev)) if (abs(spl_dev[i]) < 0.03 and v[i] < (vmin - 4.5))]
         idx_dep = [i for i in range(len(spl_dev)) if (abs(spl_dev[i]) < 0.01 and v[i] > (vmin - 2.5) and v[i] < (vmin + 2.5))]
         idx_inv = [i for i in range(len(spl_dev)) if (abs(spl_dev[i]) < 0.01 and v[i] > (vmin + 4.5))]
@@ -484,20 +1606,16 @@ def analyse_gcd_legacy(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
             v_acc = v[1:6]
             i_acc = i[1:6]
         if (len(v_dep) == 0):
-            v_dep = v[np.argmin(i):(np.argmin(i) + 5)]
-            i_dep = i[np.argmin(i):(np.argmin(i) + 5)]
+            v_dep = v[curve.i_min_index:(curve.i_min_index + 5)]
+            i_dep = i[curve.i_min_index:(curve.i_min_index + 5)]
         if (len(v_acc) == 0):
             v_inv = v[-5:]
             i_inv = i[-5:]
 
         # the selection above is not stable
         # until this is fixed stay with a simpler selection
-        v_acc = v[1:6]
-        i_acc = i[1:6]
-        v_dep = v[np.argmin(i):(np.argmin(i) + 5)]
-        i_dep = i[np.argmin(i):(np.argmin(i) + 5)]
-        v_inv = v[-5:]
-        i_inv = i[-5:]
+        v_acc, v_dep, v_inv = curve.windows(v)
+        i_acc, i_dep, i_inv = curve.windows(i)
 
 
         i_acc_avg = np.mean(i_acc)
@@ -544,8 +1662,12 @@ def analyse_gcd_sym(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
     Return:
         surface current, bulk generation current
     """
-    voltage = v
-    current = i
+    return _gcd_sym(_GCDCurve(v, i), maxreldev)
+
+
+def _gcd_sym(curve, maxreldev):
+    voltage = curve.v
+    current = curve.i
     # initialize defaults
     i_surf = i_bulk = np.nan
     i_acc = i_dep = i_inv = spl_dev = np.nan
@@ -555,15 +1677,9 @@ def analyse_gcd_sym(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
     v_dep = []
     v_inv = []
     try:
-        # Choose the degree of the polynomial, e.g., 2 for a quadratic fit
-        degree = 10
-
         # Fit a polynomial curve through the data points
-        coefficients = np.polyfit(voltage, current, degree)
-        polynomial_fit = np.poly1d(coefficients)
+        derivative_all = curve.poly_dev
 
-        derivative_all = polynomial_fit.deriv()(voltage)
-        derv_two_all = polynomial_fit.deriv(2)(voltage)
         # Specify the relative percentage of the data you want to extract from the center
         middle_percentage = 0.7
 
@@ -579,10 +1695,7 @@ def analyse_gcd_sym(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
 
         # Extract the middle part of the data
         i_middle = current[middle_range_start:middle_range_end]
-        v_middle = voltage[middle_range_start:middle_range_end]
-        i_fit_middle = polynomial_fit(v_middle)
         derivative = derivative_all[middle_range_start:middle_range_end]
-        derv_2 = derv_two_all[middle_range_start:middle_range_end]
 
         der_min = min(derivative) #transition point from depletion to inversion
         der_max = max(derivative) #transition point from accumulation to depletion
@@ -637,9 +1750,7 @@ def analyse_gcd_sym(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
         i_bulk = np.nan
 
     #parameters that were needed before and technically are not needed anymore:
-    v_acc = voltage[1:6]
-    v_dep = voltage[np.argmin(current):(np.argmin(current) + 5)]
-    v_inv = voltage[-5:]
+    v_acc, v_dep, v_inv = curve.windows(voltage)
     spl_dev= "norm"
 
     return i_surf, i_bulk, i_acc, i_dep, i_inv, v_acc, v_dep, v_inv, i_acc_relstd, i_dep_relstd, i_inv_relstd, spl_dev, status
@@ -649,6 +1760,115 @@ def analyse_gcd_sym(v, i, cut_param=0.01, debug=False, maxreldev=0.01):
 analyse_gcd = analyse_gcd_num
 
 
+GCD_METHODS = ('num', 'legacy', 'sym')
+
+_GCD_KERNELS = {
+    'num': _gcd_num,
+    'legacy': _gcd_legacy,
+    'sym': _gcd_sym,
+}
+
+
+def _gcd_curves(v, i, lengths, methods):
+    """Return GCD curves with preprocessing computed per group of equal length."""
+    gradient = {}
+    spl_dev = {}
+    poly_dev = {}
+    for length in np.unique(lengths):
+        rows = np.flatnonzero(lengths == length)
+        v_group = v[rows, :length]
+        i_group = i[rows, :length]
+        if 'num' in methods and length >= 2:
+            gradient.update(zip(rows, np.gradient(i_group, axis=1)))
+        if 'legacy' in methods:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                y_norm = np.abs(i_group) / np.abs(i_group).max(axis=1, initial=0.)[:, None]
+            spl_dev.update(zip(rows, spline_dev_many(y_norm, np.full(len(rows), length))))
+        if 'sym' in methods:
+            # fit all curves sharing the same voltage steps with one solve
+            steps, inverse = np.unique(v_group, axis=0, return_inverse=True)
+            for index, voltage in enumerate(steps):
+                group = rows[inverse.ravel() == index]
+                grid = chebyshev_grid(voltage, _GCDCurve.degree)
+                derivatives = grid.evaluate(grid.fit(i[group, :length].T), 1)
+                poly_dev.update(zip(group, derivatives.T))
+    for row, length in enumerate(lengths):
+        yield _GCDCurve(
+            v[row, :length], i[row, :length],
+            gradient=gradient.get(row),
+            spl_dev=spl_dev.get(row),
+            poly_dev=poly_dev.get(row)
+        )
+
+
+def analyse_gcd_many(v, i, methods=GCD_METHODS, maxreldev=0.01, consensus_tol=None, offsets=None, debug=False):
+    """
+    Gate Controlled Diode: Generation currents of many GCD or GCD05 curves,
+    evaluating any subset of the GCD algorithms on shared preprocessing.
+
+    Parameters:
+    v ... voltages, 2D array (one curve per row) or 1D ragged values
+    i ... currents, same layout as v
+    methods ... algorithms to evaluate, subset of GCD_METHODS
+    maxreldev ... maximum relative standart deviation to consider measurement as good
+    consensus_tol ... if set, flag curves whose algorithms agree within this relative tolerance
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields i_surf_<method>, i_bulk_<method> and
+    status_<method> for each method, if consensus_tol is set also
+    i_surf_spread, i_bulk_spread (relative max. difference between methods
+    with finite results) and consensus (at least two of them agree)
+    """
+
+    methods = tuple(methods)
+    for method in methods:
+        if method not in _GCD_KERNELS:
+            raise ValueError("Invalid GCD method: {!r}".format(method))
+
+    v, i, lengths = stack_curves(v, i, offsets=offsets)
+    dtype = []
+    for method in methods:
+        dtype += [('i_surf_' + method, float), ('i_bulk_' + method, float), ('status_' + method, 'U6')]
+    if consensus_tol is not None:
+        dtype += [('i_surf_spread', float), ('i_bulk_spread', float), ('consensus', bool)]
+    result = np.empty(len(lengths), dtype=dtype)
+
+    curves = _preprocessed('gcd_curves', lambda: list(_gcd_curves(v, i, lengths, methods)), v, i, lengths, tuple(methods))
+
+    for method in methods:
+        kernel = _GCD_KERNELS[method]
+        i_surf = result['i_surf_' + method]
+        i_bulk = result['i_bulk_' + method]
+        status = result['status_' + method]
+        for row, curve in enumerate(curves):
+            try:
+                r = kernel(curve, maxreldev)
+                i_surf[row], i_bulk[row], status[row] = r[0], r[1], r[-1]
+            except (ValueError, TypeError, IndexError, np.linalg.LinAlgError):
+                i_surf[row], i_bulk[row], status[row] = np.nan, np.nan, STATUS_FAILED
+
+    if consensus_tol is not None:
+        counts = []
+        for name in ('i_surf', 'i_bulk'):
+            values = np.stack([result[name + '_' + method] for method in methods], axis=1)
+            finite = np.isfinite(values)
+            high = np.where(finite, values, -np.inf).max(axis=1, initial=-np.inf)
+            low = np.where(finite, values, np.inf).min(axis=1, initial=np.inf)
+            scale = np.where(finite, np.abs(values), 0.).max(axis=1, initial=0.)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                spread = np.where(scale > 0, (high - low) / scale, 0.)
+            result[name + '_spread'] = np.where(finite.any(axis=1), spread, np.nan)
+            counts.append(np.count_nonzero(finite, axis=1))
+        result['consensus'] = (
+            (np.minimum(*counts) >= 2)
+            & (result['i_surf_spread'] <= consensus_tol)
+            & (result['i_bulk_spread'] <= consensus_tol)
+        )
+
+    return result
+
+
 @params('v_th, a, b, spl_dev, status')
 def analyse_fet(v, i, debug=False, numDev=6, thrMultDev=0.33):
     """
@@ -676,9 +1896,7 @@ def analyse_fet(v, i, debug=False, numDev=6, thrMultDev=0.33):
         y_norm = np.zeros_like(i)
     else:
         y_norm = i / np.max(np.abs(i))
-    x_norm = np.arange(len(y_norm))
-    spl = CubicSpline(x_norm, y_norm)
-    spl_dev = spl(x_norm, 1)
+    spl_dev = spline_dev(y_norm)
 
     # get tangent at max. of 1st derivative
     maximum = np.argmax(spl_dev)
@@ -697,8 +1915,66 @@ def analyse_fet(v, i, debug=False, numDev=6, thrMultDev=0.33):
     return np.nan, a, b, spl_dev, status
 
 
+def analyse_fet_many(v, i, numDev=6, thrMultDev=0.33, offsets=None, debug=False):
+    """
+    Field Effect Transistor: Threshold voltage of many curves at once (see
+    analyse_fet).
+
+    Parameters:
+    v ... voltages, 2D array (one curve per row) or 1D ragged values
+    i ... currents, same layout as v
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields v_th, a, b, status
+    """
+
+    v, i, lengths = stack_curves(v, i, offsets=offsets)
+    size, width = v.shape
+    result = result_array('v_th, a, b, status', size, a=-1, b=-1)
+    result['status'] = STATUS_FAILED
+    if not size or not width:
+        return result
+
+    valid = valid_mask(lengths, width)
+    index = np.arange(width)
+    rows = np.arange(size)
+
+    # get spline fit, requires strictlty increasing array
+    i = i - i[:, :1]  # we are having offset problems
+    scale = np.where(valid, np.abs(i), -np.inf).max(axis=1)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # in case of all-equal out-of-range readings
+        y_norm = np.where((scale == 0) & valid, 0., i / scale)
+    spl_dev = spline_dev_many(y_norm, lengths)
+    ok = np.isfinite(np.where(valid, spl_dev, 0.)).all(axis=1) & (lengths >= 2)
+
+    # get tangent at max. of 1st derivative
+    maximum = np.argmax(np.where(valid, spl_dev, -np.inf), axis=1)
+    previous = np.where(maximum > 0, maximum - 1, lengths - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (i[rows, maximum] - i[rows, previous]) / (v[rows, maximum] - v[rows, previous])
+        b = i[rows, maximum] - a * v[rows, maximum]
+
+        # threshold voltage via tangent
+        v_th = np.where(a != 0, -b / a, np.nan)
+
+    # sanity check on the points after the maximum derivative
+    dev_max = spl_dev[rows, maximum][:, None]
+    window = valid & (index >= maximum[:, None]) & (index < maximum[:, None] + numDev)
+    with np.errstate(invalid='ignore'):
+        good = np.where(window, spl_dev > dev_max * thrMultDev, True).all(axis=1) & (maximum > numDev)
+
+    result['v_th'] = np.where(ok & good, v_th, np.nan)
+    result['a'] = np.where(ok, a, -1)
+    result['b'] = np.where(ok, b, -1)
+    result['status'] = np.where(ok, STATUS_PASSED, STATUS_FAILED)
+
+    return result
+
+
 @params('r_sheet, a, b, x_fit, spl_dev, status, r_value')
-def analyse_van_der_pauw(i, v, cut_param=1e-5, debug=False):
+def analyse_van_der_pauw(i, v, cut_param=1e-5, debug=False, fit='ols'):
     """
     Van der Pauw: Extract sheet resistance.
 
@@ -706,18 +1982,42 @@ def analyse_van_der_pauw(i, v, cut_param=1e-5, debug=False):
     i ... current
     v ... voltage
     cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     r_sheet ... resistance per square
     """
 
-    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug)
+    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug, fit)
     r_sheet = np.pi / np.log(2) * a
     return r_sheet, a, b, x_fit, spl_dev, status, r_value
 
 
+def analyse_van_der_pauw_many(i, v, cut_param=1e-5, fit='ols', offsets=None, debug=False):
+    """
+    Van der Pauw: Extract sheet resistance for many curves at once.
+
+    Parameters:
+    i ... currents, 2D array (one curve per row) or 1D ragged values
+    v ... voltages, same layout as i
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields r_sheet, a, b, status, r_value
+    """
+
+    fit = line_regr_with_cuts_many(i, v, cut_param, fit, offsets, debug)
+    return result_array(
+        'r_sheet, a, b, status, r_value', len(fit),
+        r_sheet=np.pi / np.log(2) * fit['a'],
+        a=fit['a'], b=fit['b'], status=fit['status'], r_value=fit['r_value']
+    )
+
+
 @params('r_sheet, a, b, x_fit, spl_dev, status')
-def analyse_cross(i, v, cut_param=1e-5, debug=False):
+def analyse_cross(i, v, cut_param=1e-5, debug=False, fit='ols'):
     """
     Cross: Extract sheet resistance.
 
@@ -725,19 +2025,43 @@ def analyse_cross(i, v, cut_param=1e-5, debug=False):
     i ... current
     v ... voltage
     cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     r_sheet ... resistance per square
     """
 
-    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug)
+    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug, fit)
     r_sheet = np.pi / np.log(2) * a
 
     return r_sheet, a, b, x_fit, spl_dev, status
 
 
+def analyse_cross_many(i, v, cut_param=1e-5, fit='ols', offsets=None, debug=False):
+    """
+    Cross: Extract sheet resistance for many curves at once.
+
+    Parameters:
+    i ... currents, 2D array (one curve per row) or 1D ragged values
+    v ... voltages, same layout as i
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields r_sheet, a, b, status
+    """
+
+    fit = line_regr_with_cuts_many(i, v, cut_param, fit, offsets, debug)
+    return result_array(
+        'r_sheet, a, b, status', len(fit),
+        r_sheet=np.pi / np.log(2) * fit['a'],
+        a=fit['a'], b=fit['b'], status=fit['status']
+    )
+
+
 @params('t_line, a, b, x_fit, spl_dev, r_value, status')
-def analyse_linewidth(i, v, r_sheet=np.nan, cut_param=1e-5, min_correlation=0.99, debug=False):
+def analyse_linewidth(i, v, r_sheet=np.nan, cut_param=1e-5, min_correlation=0.99, debug=False, fit='ols'):
     """
     Linewidth: Extract linewidth.
 
@@ -746,12 +2070,13 @@ def analyse_linewidth(i, v, r_sheet=np.nan, cut_param=1e-5, min_correlation=0.99
     v ... voltage
     r_sheet ... sheet resistance
     cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     t_line ... linewidth in [um]
     """
 
-    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug)
+    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug, fit)
     if abs(r_value) < min_correlation:
         return np.nan, np.nan, np.nan, x_fit, spl_dev, r_value, status
 
@@ -761,8 +2086,37 @@ def analyse_linewidth(i, v, r_sheet=np.nan, cut_param=1e-5, min_correlation=0.99
     return t_line, a, b, x_fit, spl_dev, r_value, status
 
 
+def analyse_linewidth_many(i, v, r_sheet=np.nan, cut_param=1e-5, min_correlation=0.99, fit='ols', offsets=None, debug=False):
+    """
+    Linewidth: Extract linewidth for many curves at once.
+
+    Parameters:
+    i ... currents, 2D array (one curve per row) or 1D ragged values
+    v ... voltages, same layout as i
+    r_sheet ... sheet resistance, scalar or one value per curve
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields t_line, a, b, r_value, status
+    """
+
+    fit = line_regr_with_cuts_many(i, v, cut_param, fit, offsets, debug)
+    correlated = np.abs(fit['r_value']) >= min_correlation
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_line = r_sheet * 128.5 * 1. / fit['a']
+    return result_array(
+        't_line, a, b, r_value, status', len(fit),
+        t_line=np.where(correlated, t_line, np.nan),
+        a=np.where(correlated, fit['a'], np.nan),
+        b=np.where(correlated, fit['b'], np.nan),
+        r_value=fit['r_value'], status=fit['status']
+    )
+
+
 @params('r_contact, a, b, x_fit, spl_dev, r_value, status')
-def analyse_cbkr(i, v, r_sheet=-1, cut_param=1e-5, debug=False):
+def analyse_cbkr(i, v, r_sheet=-1, cut_param=1e-5, debug=False, fit='ols'):
     """
     Cross Bridge Kelvin Resistance Structure: Extract contact resistance.
 
@@ -771,12 +2125,13 @@ def analyse_cbkr(i, v, r_sheet=-1, cut_param=1e-5, debug=False):
     v ... voltage
     r_sheet ... sheet resistance
     cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     r_contact ... contact resistance
     """
 
-    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug)
+    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug, fit)
 
     if r_sheet == -1:
         r_contact = -1
@@ -789,8 +2144,37 @@ def analyse_cbkr(i, v, r_sheet=-1, cut_param=1e-5, debug=False):
     return r_contact, a, b, x_fit, spl_dev, r_value, status
 
 
+def analyse_cbkr_many(i, v, r_sheet=-1, cut_param=1e-5, fit='ols', offsets=None, debug=False):
+    """
+    Cross Bridge Kelvin Resistance Structure: Extract contact resistance for
+    many curves at once.
+
+    Parameters:
+    i ... currents, 2D array (one curve per row) or 1D ragged values
+    v ... voltages, same layout as i
+    r_sheet ... sheet resistance, scalar or one value per curve
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields r_contact, a, b, r_value, status
+    """
+
+    fit = line_regr_with_cuts_many(i, v, cut_param, fit, offsets, debug)
+    r_sheet = np.asarray(r_sheet, dtype=float)
+    d = 13  # contact size
+    w = 33  # diffusion width
+    r_contact = fit['a'] - (4 * r_sheet * d**2) / (3 * w**2) * (1 + d/(2 * w - 2 * d))
+    return result_array(
+        'r_contact, a, b, r_value, status', len(fit),
+        r_contact=np.where(r_sheet == -1, -1, r_contact),
+        a=fit['a'], b=fit['b'], r_value=fit['r_value'], status=fit['status']
+    )
+
+
 @params('r_contact, a, b, x_fit, spl_dev, status, r_value')
-def analyse_contact(i, v, cut_param=1e-5, debug=False):
+def analyse_contact(i, v, cut_param=1e-5, debug=False, fit='ols'):
     """
     Contact Chain: Extract metal-implant contact resistance.
 
@@ -799,19 +2183,44 @@ def analyse_contact(i, v, cut_param=1e-5, debug=False):
     v ... voltage
     r_sheet ... sheet resistance
     cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     r_contact ... contact resistance
     """
 
-    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug)
+    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug, fit)
     r_contact = a
 
     return r_contact, a, b, x_fit, spl_dev, status, r_value
 
 
+def analyse_contact_many(i, v, cut_param=1e-5, fit='ols', offsets=None, debug=False):
+    """
+    Contact Chain: Extract metal-implant contact resistance for many curves
+    at once.
+
+    Parameters:
+    i ... currents, 2D array (one curve per row) or 1D ragged values
+    v ... voltages, same layout as i
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields r_contact, a, b, status, r_value
+    """
+
+    fit = line_regr_with_cuts_many(i, v, cut_param, fit, offsets, debug)
+    return result_array(
+        'r_contact, a, b, status, r_value', len(fit),
+        r_contact=fit['a'], a=fit['a'], b=fit['b'], status=fit['status'],
+        r_value=fit['r_value']
+    )
+
+
 @params('r, status, r_value')
-def analyse_meander(i, v, cut_param=1e-5, debug=False):
+def analyse_meander(i, v, cut_param=1e-5, debug=False, fit='ols'):
     """
     Meander: Calculates specific resistance per square.
 
@@ -820,6 +2229,7 @@ def analyse_meander(i, v, cut_param=1e-5, debug=False):
     v ... voltage
     w ... strip width, use [5, 10] for [polysilicon, metal]
     nsq ... number of squares, use [476, 12853] for [polysilicon, metal]
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
 
     Returns:
     rho_sq ... specific resistance per square
@@ -827,33 +2237,142 @@ def analyse_meander(i, v, cut_param=1e-5, debug=False):
 
     status = STATUS_PASSED
 
-    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug)
+    a, b, x_fit, spl_dev, status, r_value = line_regr_with_cuts(i, v, cut_param, debug, fit)
     r = a
 
     return r, status, r_value
 
 
+def analyse_meander_many(i, v, cut_param=1e-5, fit='ols', offsets=None, debug=False):
+    """
+    Meander: Calculates specific resistance per square for many curves at
+    once.
+
+    Parameters:
+    i ... currents, 2D array (one curve per row) or 1D ragged values
+    v ... voltages, same layout as i
+    cut_param ... used to cut on 1st derivative to id voltage regions
+    fit ... line fit, 'ols', 'theil-sen' or 'huber' (see line_fit_many)
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields r, status, r_value
+    """
+
+    fit = line_regr_with_cuts_many(i, v, cut_param, fit, offsets, debug)
+    return result_array(
+        'r, status, r_value', len(fit),
+        r=fit['a'], status=fit['status'], r_value=fit['r_value']
+    )
+
+
+def breakdown_mask(i, i_previous, i_compliance=None, jump_ratio=None, i_floor=0.):
+    """
+    Mask of points indicating an oxide breakdown. The relative change tests
+    are elementwise, ramps can be stacked along any axis.
+
+    Parameters:
+    i ... absolute currents
+    i_previous ... absolute currents of the preceding points, NaN for first points
+    i_compliance ... breakdown if the current reaches this value
+    jump_ratio ... breakdown if the current rises by this factor between consecutive points
+    i_floor ... currents below this value are not tested for jumps (noise)
+    """
+    hits = np.zeros(np.shape(i), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        if i_compliance is not None:
+            hits |= i >= i_compliance
+        if jump_ratio is not None:
+            hits |= (i > i_previous * jump_ratio) & (i > i_floor)
+    return hits
+
+
+def breakdown_index(i, lengths, i_compliance=None, jump_ratio=None, i_floor=0.):
+    """
+    Index of the first breakdown point of stacked current ramps.
+
+    Parameters:
+    i ... currents, 2D array (one ramp per row) or 3D array of several
+          current series of the same ramps (series, ramps, points)
+    lengths ... number of valid points per ramp
+    i_compliance, jump_ratio, i_floor ... see breakdown_mask
+
+    Returns:
+    index ... first breakdown point in any series, last valid point without breakdown
+    broken ... ramps with breakdown
+    """
+    i = np.abs(np.asarray(i, dtype=float))
+    previous = np.full_like(i, np.nan)
+    previous[..., 1:] = i[..., :-1]
+    hits = breakdown_mask(i, previous, i_compliance, jump_ratio, i_floor)
+    if hits.ndim == 3:
+        hits = hits.any(axis=0)
+    hits &= valid_mask(lengths, hits.shape[1])
+    broken = hits.any(axis=1)
+    index = np.where(broken, np.argmax(hits, axis=1), np.asarray(lengths) - 1)
+    return index, broken
+
+
 @params('v_bd, status')
-def analyse_breakdown(v, i, debug=False):
+def analyse_breakdown(v, i, i_compliance=None, jump_ratio=None, i_floor=0., i_elm=None, debug=False):
     """
     Breakdown: Get oxide breakdown.
 
     Parameters:
     v ... voltage
     i ... current
+    i_compliance ... breakdown if the absolute current reaches this value
+    jump_ratio ... breakdown if the absolute current rises by this factor between consecutive points
+    i_floor ... currents below this value are not tested for jumps
+    i_elm ... optional 2nd current series (eg. electrometer) tested the same way
 
     Returns:
-    v_bd  ... breakdown voltage
+    v_bd  ... breakdown voltage, last voltage if no breakdown was detected
     """
 
     status = STATUS_PASSED
     v_bd = np.nan
     if len(v) > 0:
-        v_bd = v[-1]
+        currents = [i] if i_elm is None else [i, i_elm]
+        index, broken = breakdown_index(np.array(currents, dtype=float)[:, None, :], [len(v)], i_compliance, jump_ratio, i_floor)
+        v_bd = v[index[0]]
 
     return v_bd, status
 
 
+def analyse_breakdown_many(v, i, i_compliance=None, jump_ratio=None, i_floor=0., i_elm=None, offsets=None, debug=False):
+    """
+    Breakdown: Get oxide breakdown of many ramps at once (see analyse_breakdown).
+
+    Parameters:
+    v ... voltages, 2D array (one ramp per row) or 1D ragged values
+    i ... currents, same layout as v
+    i_compliance, jump_ratio, i_floor ... see analyse_breakdown
+    i_elm ... optional 2nd current series, same layout as v
+    offsets ... curve offsets for ragged values (see stack_curves)
+
+    Returns:
+    structured array with fields v_bd, broken (breakdown detected), status
+    """
+
+    arrays = (v, i) if i_elm is None else (v, i, i_elm)
+    v, *currents, lengths = stack_curves(*arrays, offsets=offsets)
+    size, width = v.shape
+    result = np.empty(size, dtype=[('v_bd', float), ('broken', bool), ('status', 'U6')])
+    result['v_bd'] = np.nan
+    result['broken'] = False
+    result['status'] = STATUS_PASSED
+    if not size or not width:
+        return result
+
+    index, broken = breakdown_index(np.stack(currents), lengths, i_compliance, jump_ratio, i_floor)
+    empty = lengths == 0
+    result['v_bd'] = np.where(empty, np.nan, v[np.arange(size), np.maximum(index, 0)])
+    result['broken'] = broken
+
+    return result
+
+
 @params('c_mean, c_median, d, status')
 def analyse_capacitor(v, c, debug=False):
     """
@@ -880,3 +2399,18 @@ def analyse_capacitor(v, c, debug=False):
     d = 3.9 * 8.85e-12 * 16.9 * 1e-9 / c_median
 
     return c_mean, c_median, d, status
+
+
+## Streaming analysis
+## ------------------------------------
+
+from .streaming import (  # noqa: E402
+    StreamingLinearFit,
+    StreamingVanDerPauw,
+    StreamingCBKR,
+    StreamingMeander,
+    StreamingIV,
+    StreamingBreakdown
+)
+
+from .cache import ResultCache  # noqa: E402
@@ -0,0 +1,173 @@
+"""Bootstrap uncertainties of extracted parameters.
+
+Replicas of each curve are generated by resampling residuals or points
+and evaluated as stacked batches by the vectorized `*_many` analysis
+functions, optionally spread across a process pool.
+
+>>> r = bootstrap(analyse_van_der_pauw_many, i, v, ['r_sheet'], n_resamples=2000, workers=4)
+>>> r['r_sheet'], r['r_sheet_low'], r['r_sheet_high']
+"""
+
+import concurrent.futures
+
+import numpy as np
+
+from . import STATUS_PASSED, result_array, stack_curves
+
+__all__ = ['bootstrap']
+
+METHOD_RESIDUALS = 'residuals'
+METHOD_POINTS = 'points'
+
+
+def smooth_curves(y):
+    """Return Savitzky-Golay smoothed rows of y, used as model for residual resampling."""
+    import scipy.signal
+    width = y.shape[1]
+    if width < 3:
+        return y.copy()
+    windowsize = max(5, (width // 10) | 1)
+    if windowsize > width:
+        windowsize = width if width % 2 else width - 1
+    polyorder = min(2, windowsize - 1)
+    return scipy.signal.savgol_filter(y, window_length=windowsize, polyorder=polyorder, axis=1)
+
+
+def resample_curves(x, y, model, size, method, rng):
+    """
+    Return size replicas of each curve stacked as rows (curve major).
+
+    Parameters:
+    x, y ... 2D arrays, one curve per row
+    model ... smoothed y used for residual resampling
+    size ... number of replicas per curve
+    method ... 'residuals' or 'points'
+    rng ... numpy random generator
+    """
+    count, width = y.shape
+    index = rng.integers(0, width, size=(count, size, width))
+    rows = np.arange(count)[:, None, None]
+    if method == METHOD_RESIDUALS:
+        residuals = y - model
+        x_rep = np.broadcast_to(x[:, None, :], (count, size, width))
+        y_rep = model[:, None, :] + residuals[rows, index]
+    elif method == METHOD_POINTS:
+        # keep points in measurement order
+        index.sort(axis=2)
+        x_rep = x[rows, index]
+        y_rep = y[rows, index]
+    else:
+        raise ValueError("Invalid bootstrap method: {!r}".format(method))
+    return x_rep.reshape(-1, width), y_rep.reshape(-1, width)
+
+
+def _evaluate(function, x, y, kwargs, fields):
+    """Return fields of the replica results, NaN for replicas not passed."""
+    result = function(x, y, **kwargs)
+    passed = result['status'] == STATUS_PASSED
+    return np.stack([np.where(passed, result[name], np.nan) for name in fields], axis=1)
+
+
+def _percentile(samples, q):
+    """Linear interpolated percentiles along axis 1 ignoring NaN, NaN for empty rows."""
+    samples = np.sort(samples, axis=1)  # NaN are sorted to the end
+    count = np.count_nonzero(~np.isnan(samples), axis=1)
+    position = q * np.maximum(count - 1, 0)
+    low = np.floor(position).astype(int)
+    high = np.minimum(low + 1, np.maximum(count - 1, 0))
+    fraction = position - low
+    value_low = np.take_along_axis(samples, low[:, None], axis=1)[:, 0]
+    value_high = np.take_along_axis(samples, high[:, None], axis=1)[:, 0]
+    value = value_low + (value_high - value_low) * fraction
+    return np.where(count > 0, value, np.nan)
+
+
+def bootstrap(function, x, y, fields, n_resamples=1000, method=METHOD_RESIDUALS, confidence=0.95, seed=None, workers=None, chunksize=100, offsets=None, **kwargs):
+    """
+    Bootstrap confidence intervals of extracted parameters.
+
+    Parameters:
+    function ... vectorized analysis function, eg. analyse_cv_many
+    x, y ... curves passed to function, 2D arrays or 1D ragged values
+    fields ... names of result fields to estimate, eg. ['v_dep2', 'rho']
+    n_resamples ... number of replicas per curve
+    method ... 'residuals' (resample residuals of a smoothed curve) or 'points'
+    confidence ... confidence level of the percentile intervals
+    seed ... seed for reproducible replicas
+    workers ... number of worker processes, evaluate in process if None
+    chunksize ... number of replicas per curve evaluated in one batch
+    offsets ... curve offsets for ragged values (see stack_curves)
+    kwargs ... passed to function, arrays with one value per curve are
+               repeated for the replicas
+
+    Returns:
+    structured array with fields <name> (estimate of the original curve),
+    <name>_low, <name>_high, <name>_std for each name in fields and status
+    of the original curve, replicas not passed are ignored
+    """
+    fields = list(fields)
+    if method not in (METHOD_RESIDUALS, METHOD_POINTS):
+        raise ValueError("Invalid bootstrap method: {!r}".format(method))
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1.")
+
+    estimate = function(x, y, offsets=offsets, **kwargs)
+    x, y, lengths = stack_curves(x, y, offsets=offsets)
+    count, width = y.shape
+    names = []
+    for name in fields:
+        names += [name, name + '_low', name + '_high', name + '_std']
+    result = result_array(', '.join(names + ['status']), count)
+
+    for name in fields:
+        result[name] = estimate[name]
+    result['status'] = estimate['status']
+    if not count or not width or n_resamples < 1:
+        return result
+
+    per_curve = [name for name, value in kwargs.items() if np.ndim(value) == 1 and len(value) == count]
+
+    # replicas of ragged curves are evaluated per group of equal length
+    samples = np.full((count, n_resamples, len(fields)), np.nan)
+    sequence = np.random.SeedSequence(seed)
+    tasks = []
+    for length in np.unique(lengths):
+        curves = np.flatnonzero(lengths == length)
+        x_group = x[curves, :length]
+        y_group = y[curves, :length]
+        model = smooth_curves(y_group) if method == METHOD_RESIDUALS else None
+        for start in range(0, n_resamples, chunksize):
+            size = min(chunksize, n_resamples - start)
+            rng = np.random.default_rng(sequence.spawn(1)[0])
+            x_rep, y_rep = resample_curves(x_group, y_group, model, size, method, rng)
+            task_kwargs = dict(kwargs)
+            for name in per_curve:
+                task_kwargs[name] = np.repeat(np.asarray(kwargs[name])[curves], size)
+            tasks.append((curves, start, size, x_rep, y_rep, task_kwargs))
+
+    def store(task, values):
+        curves, start, size = task[:3]
+        samples[curves, start:start + size] = values.reshape(len(curves), size, len(fields))
+
+    if workers is None:
+        for task in tasks:
+            store(task, _evaluate(function, *task[3:], fields=fields))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_evaluate, function, *task[3:], fields=fields) for task in tasks]
+            for task, future in zip(tasks, futures):
+                store(task, future.result())
+
+    alpha = (1 - confidence) / 2
+    for index, name in enumerate(fields):
+        values = samples[:, :, index]
+        finite = np.isfinite(values)
+        n = np.count_nonzero(finite, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(finite, values, 0.).sum(axis=1) / n
+            variance = np.where(finite, values - mean[:, None], 0.)**2
+            result[name + '_std'] = np.sqrt(variance.sum(axis=1) / n)
+        result[name + '_low'] = _percentile(values, alpha)
+        result[name + '_high'] = _percentile(values, 1 - alpha)
+
+    return result
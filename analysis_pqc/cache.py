@@ -0,0 +1,260 @@
+"""Memoization of analysis results.
+
+Results are keyed on a hash of the input arrays, the function name, the
+bound arguments and the package version. An in-memory LRU tier can be
+backed by an on-disk tier, shared between processes, with size bounded
+eviction of the least recently used entries.
+
+>>> cache = ResultCache('~/.cache/analysis-pqc')
+>>> analyse_iv = cache.memoize(analysis_pqc.analyse_iv)
+>>> analyse_iv(v, i)
+
+Callers receive copies of the cached results and may modify them.
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import __version__
+
+__all__ = ['ResultCache']
+
+
+_MISSING = object()
+
+
+def _update_hash(h, value):
+    if isinstance(value, (np.ndarray, list, tuple)):
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            array = None  # ragged sequence
+        if array is not None and array.dtype != object:
+            h.update(b'a')
+            h.update(array.dtype.str.encode())
+            h.update(repr(array.shape).encode())
+            h.update(np.ascontiguousarray(array).tobytes())
+            return
+        h.update(b'l')
+        h.update(repr(len(value)).encode())
+        for item in value:
+            _update_hash(h, item)
+        return
+    h.update(b'v')
+    h.update(repr(value).encode())
+
+
+class ResultCache:
+    """
+    Two tier cache for analysis results.
+
+    Parameters:
+    path ... directory of the on-disk tier, memory only if None
+    maxsize ... max. number of results kept in memory
+    max_bytes ... max. size of the on-disk tier in bytes
+    scan_interval ... number of writes after which the size of the on-disk
+                      tier is determined again, it is also determined again
+                      when the directory was changed by other processes
+    """
+
+    suffix = '.pickle'
+
+    def __init__(self, path=None, maxsize=1024, max_bytes=256 * 1024**2, scan_interval=16):
+        self.path = os.path.expanduser(path) if path is not None else None
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self._writes = 0
+        self._mtime = None
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+
+    def key(self, function, *args, **kwargs):
+        """Return hash key of a call of function."""
+        try:
+            bound = inspect.signature(function).bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = sorted(bound.arguments.items())
+        except (TypeError, ValueError):
+            arguments = list(enumerate(args)) + sorted(kwargs.items())
+        h = hashlib.sha256()
+        h.update(__version__.encode())
+        h.update(getattr(function, '__module__', '').encode())
+        h.update(getattr(function, '__qualname__', repr(function)).encode())
+        for name, value in arguments:
+            h.update(repr(name).encode())
+            _update_hash(h, value)
+        return h.hexdigest()
+
+    def get(self, key, default=None):
+        """Return copy of the cached value for key or default."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return copy.deepcopy(self._memory[key])
+        if self.path is None:
+            return default
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(filename)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        """Store value for key in all tiers."""
+        self._remember(key, value)
+        if self.path is None:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        filename = self._filename(key)
+        fd, tmpname = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                replaced = os.stat(filename).st_size
+            except OSError:
+                replaced = 0
+            with self._lock:
+                before = self._dir_mtime()
+                os.replace(tmpname, filename)
+                after = self._dir_mtime()
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(data) - replaced
+                    self._writes += 1
+                    # the directory changed since our last scan or write if
+                    # other processes share it, scan again then and
+                    # periodically
+                    if before != self._mtime or self._writes >= self.scan_interval:
+                        self._disk_bytes = None
+                self._mtime = after
+        except OSError:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            return
+        if self._disk_size() > self.max_bytes:
+            self.evict()
+
+    def call(self, function, *args, **kwargs):
+        """Return cached result of function(*args, **kwargs)."""
+        key = self.key(function, *args, **kwargs)
+        cached = self.get(key, _MISSING)
+        if cached is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            return self._restore(function, cached)
+        with self._lock:
+            self.misses += 1
+        result = function(*args, **kwargs)
+        # namedtuple result types are not picklable, store plain tuples
+        self.set(key, tuple(result) if hasattr(function, 'result_type') else result)
+        return result
+
+    def memoize(self, function):
+        """Return memoizing wrapper of function."""
+        @functools.wraps(function)
+        def memoize(*args, **kwargs):
+            return self.call(function, *args, **kwargs)
+        return memoize
+
+    def evict(self):
+        """Remove least recently used files until the on-disk tier fits into max_bytes."""
+        entries = []
+        mtime = self._dir_mtime()
+        for entry in self._scan():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            total -= size
+        if total < sum(size for _, size, _ in entries):
+            mtime = self._dir_mtime()
+        with self._lock:
+            self._disk_bytes = total
+            self._writes = 0
+            self._mtime = mtime
+
+    def clear(self):
+        """Remove all cached results."""
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = 0 if self.path is not None else None
+        for entry in self._scan():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _restore(self, function, value):
+        result_type = getattr(function, 'result_type', None)
+        if result_type is not None:
+            return result_type(*value)
+        return value
+
+    def _remember(self, key, value):
+        # keep a private copy, the caller may modify value
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _filename(self, key):
+        return os.path.join(self.path, key + self.suffix)
+
+    def _scan(self):
+        if self.path is None:
+            return []
+        with os.scandir(self.path) as it:
+            return [entry for entry in it if entry.name.endswith(self.suffix)]
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _disk_size(self):
+        with self._lock:
+            size = self._disk_bytes
+        if size is None:
+            mtime = self._dir_mtime()
+            size = 0
+            for entry in self._scan():
+                try:
+                    size += entry.stat().st_size
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_bytes = size
+                self._writes = 0
+                self._mtime = mtime
+        return size
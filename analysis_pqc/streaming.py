@@ -0,0 +1,261 @@
+"""Streaming analysis for live monitoring during a measurement.
+
+The estimators accept points one at a time or in small chunks using
+`update` and keep a constant amount of state. `result` returns the same
+fields as the corresponding analysis function for the points seen so far,
+which allows to abort a sweep as soon as a structure turns out to be bad.
+
+>>> fit = StreamingVanDerPauw()
+>>> for i, v in source:
+...     fit.update(i, v)
+...     if fit.n > 5 and abs(fit.r_value) < .99:
+...         break
+>>> fit.result().r_sheet
+"""
+
+import numpy as np
+
+from . import STATUS_NONE, STATUS_PASSED, breakdown_mask, params
+
+__all__ = [
+    'StreamingLinearFit',
+    'StreamingVanDerPauw',
+    'StreamingCBKR',
+    'StreamingMeander',
+    'StreamingIV',
+    'StreamingBreakdown'
+]
+
+
+class StreamingLinearFit:
+    """
+    Ordinary least squares line fit y = a * x + b updated with running
+    sums (Welford, chunks are merged using Chan's formula).
+
+    a, b and r_value are -1 and status is STATUS_NONE until at least two
+    distinct x values were added.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self._mean_x = 0.
+        self._mean_y = 0.
+        self._ssxm = 0.
+        self._ssym = 0.
+        self._ssxym = 0.
+
+    def update(self, x, y):
+        """Add a point or a chunk of points."""
+        x = np.atleast_1d(np.asarray(x, dtype=float)).ravel()
+        y = np.atleast_1d(np.asarray(y, dtype=float)).ravel()
+        if x.shape != y.shape:
+            raise ValueError("x and y must have the same length.")
+        m = len(x)
+        if not m:
+            return
+        if m == 1:
+            # Welford update
+            self.n += 1
+            dx = x[0] - self._mean_x
+            dy = y[0] - self._mean_y
+            self._mean_x += dx / self.n
+            self._mean_y += dy / self.n
+            self._ssxm += dx * (x[0] - self._mean_x)
+            self._ssym += dy * (y[0] - self._mean_y)
+            self._ssxym += dx * (y[0] - self._mean_y)
+            return
+        # merge statistics of the chunk
+        mean_x = x.mean()
+        mean_y = y.mean()
+        n = self.n + m
+        dx = mean_x - self._mean_x
+        dy = mean_y - self._mean_y
+        weight = self.n * m / n
+        self._ssxm += np.sum((x - mean_x)**2) + dx * dx * weight
+        self._ssym += np.sum((y - mean_y)**2) + dy * dy * weight
+        self._ssxym += np.sum((x - mean_x) * (y - mean_y)) + dx * dy * weight
+        self._mean_x += dx * m / n
+        self._mean_y += dy * m / n
+        self.n = n
+
+    @property
+    def ok(self):
+        """True if a line can be fitted to the points seen so far."""
+        return self.n >= 2 and self._ssxm > 0
+
+    @property
+    def slope(self):
+        if not self.ok:
+            return -1
+        return self._ssxym / self._ssxm
+
+    @property
+    def intercept(self):
+        if not self.ok:
+            return -1
+        return self._mean_y - self.slope * self._mean_x
+
+    @property
+    def r_value(self):
+        if not self.ok:
+            return -1
+        if self._ssym == 0:
+            return 0.
+        r_value = self._ssxym / np.sqrt(self._ssxm * self._ssym)
+        return min(max(r_value, -1.), 1.)
+
+    @property
+    def status(self):
+        return STATUS_PASSED if self.ok else STATUS_NONE
+
+    @params('a, b, r_value, status')
+    def result(self):
+        return self.slope, self.intercept, self.r_value, self.status
+
+
+class StreamingVanDerPauw(StreamingLinearFit):
+    """Van der Pauw: sheet resistance, points are added as update(i, v)."""
+
+    @params('r_sheet, a, b, status, r_value')
+    def result(self):
+        a = self.slope
+        r_sheet = np.pi / np.log(2) * a
+        return r_sheet, a, self.intercept, self.status, self.r_value
+
+
+class StreamingCBKR(StreamingLinearFit):
+    """
+    Cross Bridge Kelvin Resistance Structure: contact resistance, points
+    are added as update(i, v).
+
+    Parameters:
+    r_sheet ... sheet resistance, -1 if unknown
+    """
+
+    def __init__(self, r_sheet=-1):
+        super().__init__()
+        self.r_sheet = r_sheet
+
+    @params('r_contact, a, b, r_value, status')
+    def result(self):
+        a = self.slope
+        if self.r_sheet == -1:
+            r_contact = -1
+        else:
+            d = 13  # contact size
+            w = 33  # diffusion width
+            r_contact = a - (4 * self.r_sheet * d**2) / (3 * w**2) * (1 + d/(2 * w - 2 * d))
+        return r_contact, a, self.intercept, self.r_value, self.status
+
+
+class StreamingMeander(StreamingLinearFit):
+    """Meander: resistance, points are added as update(i, v)."""
+
+    @params('r, status, r_value')
+    def result(self):
+        return self.slope, self.status, self.r_value
+
+
+class StreamingIV:
+    """
+    Diode IV: currents at standard voltages (see analyse_iv), points are
+    added as update(v, i).
+    """
+
+    voltages = (800, 600, 300)
+
+    def __init__(self):
+        self.n = 0
+        self.v_max = np.nan
+        self.i_max = np.nan
+        self._abs_v_max = -np.inf
+        self._currents = {voltage: np.nan for voltage in self.voltages}
+        self._counts = {voltage: 0 for voltage in self.voltages}
+
+    def update(self, v, i):
+        """Add a point or a chunk of points."""
+        v = np.atleast_1d(np.asarray(v, dtype=float)).ravel()
+        i = np.atleast_1d(np.asarray(i, dtype=float)).ravel()
+        if v.shape != i.shape:
+            raise ValueError("v and i must have the same length.")
+        if not len(v):
+            return
+        self.n += len(v)
+        abs_v = np.abs(v)
+        index = np.argmax(abs_v)
+        if abs_v[index] > self._abs_v_max:
+            self._abs_v_max = abs_v[index]
+            self.v_max = v[index]
+            self.i_max = i[index]
+        for voltage in self.voltages:
+            matches = i[abs_v == voltage]
+            if len(matches):
+                self._counts[voltage] += len(matches)
+                self._currents[voltage] = matches[0]
+
+    def current(self, voltage):
+        """Return current measured at +/- voltage, NaN if not exactly one point matched."""
+        if self._counts[voltage] != 1:
+            return np.nan
+        return self._currents[voltage]
+
+    @property
+    def status(self):
+        return STATUS_PASSED if self.n else STATUS_NONE
+
+    @params('v_max, i_max, i_800, i_600, i300, status')
+    def result(self):
+        return self.v_max, self.i_max, self.current(800), self.current(600), self.current(300), self.status
+
+
+class StreamingBreakdown:
+    """
+    Breakdown: detects an oxide breakdown while points are added as
+    update(v, i), to stop a ramp as soon as it happens.
+
+    Parameters:
+    i_compliance ... breakdown if the absolute current reaches this value
+    jump_ratio ... breakdown if the absolute current rises by this factor between consecutive points
+    i_floor ... currents below this value are not tested for jumps
+
+    Without breakdown v_bd is the last voltage (see analyse_breakdown).
+    """
+
+    def __init__(self, i_compliance=None, jump_ratio=None, i_floor=0.):
+        self.i_compliance = i_compliance
+        self.jump_ratio = jump_ratio
+        self.i_floor = i_floor
+        self.n = 0
+        self.broken = False
+        self.v_bd = np.nan
+        self._i_last = np.full(2, np.nan)
+
+    def update(self, v, i, i_elm=None):
+        """Add a point or a chunk of points, return True on breakdown."""
+        if self.broken:
+            return True
+        v = np.atleast_1d(np.asarray(v, dtype=float)).ravel()
+        currents = [i] if i_elm is None else [i, i_elm]
+        currents = np.abs([np.atleast_1d(np.asarray(value, dtype=float)).ravel() for value in currents])
+        if currents.shape[1] != len(v):
+            raise ValueError("v and i must have the same length.")
+        if not len(v):
+            return False
+        self.n += len(v)
+        previous = np.concatenate((self._i_last[:len(currents), None], currents[:, :-1]), axis=1)
+        hits = breakdown_mask(currents, previous, self.i_compliance, self.jump_ratio, self.i_floor).any(axis=0)
+        if hits.any():
+            self.broken = True
+            self.v_bd = v[np.argmax(hits)]
+        else:
+            self.v_bd = v[-1]
+            self._i_last[:len(currents)] = currents[:, -1]
+        return self.broken
+
+    @property
+    def status(self):
+        return STATUS_PASSED if self.n else STATUS_NONE
+
+    @params('v_bd, status')
+    def result(self):
+        return self.v_bd, self.status
@@ -0,0 +1,169 @@
+"""Parameter sweeps for calibrating analysis parameters.
+
+A grid of keyword arguments is evaluated by a vectorized `*_many` analysis
+function on the same stacked curves. Preprocessing which does not depend on
+the swept parameters is computed once (see reuse_preprocessing), grid points
+can be spread across a process pool receiving the curves once per worker.
+
+>>> r = sweep(analyse_cv_many, v, c, {'cut_param': [0.004, 0.008], 'max_v': [300, 500]}, fields=['v_dep2'])
+>>> r['cut_param'], r['pass_rate'], r['v_dep2_median'], r['v_dep2_std']
+"""
+
+import concurrent.futures
+import inspect
+import itertools
+
+import numpy as np
+
+from . import STATUS_FAILED, STATUS_PASSED, reuse_preprocessing, stack_curves
+
+__all__ = ['sweep']
+
+_worker_curves = None
+
+
+def parameter_grid(grid):
+    """Return list of keyword dicts for all combinations of the values in grid."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _apply_min_correlation(function, settings):
+    """Split min_correlation from settings if function does not accept it."""
+    settings = dict(settings)
+    min_correlation = None
+    if 'min_correlation' in settings and 'min_correlation' not in inspect.signature(function).parameters:
+        min_correlation = settings.pop('min_correlation')
+    return settings, min_correlation
+
+
+def _init_worker(x, y, lengths, series):
+    global _worker_curves
+    _worker_curves = x, y, lengths, series
+
+
+def _evaluate(function, settings, kwargs, curves=None):
+    """Return results of function for each settings on the same curves."""
+    x, y, lengths, series = _worker_curves if curves is None else curves
+    offsets = None
+    if (lengths != x.shape[1]).any():
+        # pass ragged curves without padding
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        valid = np.arange(x.shape[1]) < lengths[:, None]
+        x, y = x[valid], y[valid]
+        series = {name: values[valid] for name, values in series.items()}
+    results = []
+    with reuse_preprocessing():
+        for setting in settings:
+            setting, min_correlation = _apply_min_correlation(function, dict(kwargs, **series, **setting))
+            result = function(x, y, offsets=offsets, **setting)
+            if min_correlation is not None:
+                # same cut as applied by the *_data wrappers of the scripts
+                with np.errstate(invalid='ignore'):
+                    correlated = np.abs(result['r_value']) >= min_correlation
+                result['status'] = np.where(correlated, result['status'], STATUS_FAILED)
+            results.append(result)
+    return results
+
+
+def evaluate_grid(function, x, y, settings, workers=None, offsets=None, series=None, **kwargs):
+    """
+    Evaluate function for each keyword dict in settings on the same curves.
+
+    Parameters:
+    function ... vectorized analysis function, eg. analyse_cv_many
+    x, y ... curves passed to function, 2D arrays or 1D ragged values
+    settings ... sequence of keyword dicts (see parameter_grid)
+    workers ... number of worker processes, evaluate in process if None
+    offsets ... curve offsets for ragged values (see stack_curves)
+    series ... dict of additional keyword arguments with the same layout as x
+    kwargs ... passed to function for all settings
+
+    Returns:
+    list of result arrays, one per setting
+    """
+    settings = list(settings)
+    names = list(series or {})
+    x, y, *values, lengths = stack_curves(x, y, *(series[name] for name in names), offsets=offsets)
+    curves = x, y, lengths, dict(zip(names, values))
+    if workers is None or workers < 2 or len(settings) < 2:
+        return _evaluate(function, settings, kwargs, curves)
+
+    # each worker receives the curves once and evaluates every n-th setting
+    workers = min(workers, len(settings))
+    results = [None] * len(settings)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=curves) as executor:
+        futures = {
+            worker: executor.submit(_evaluate, function, settings[worker::workers], kwargs)
+            for worker in range(workers)
+        }
+        for worker, future in futures.items():
+            results[worker::workers] = future.result()
+    return results
+
+
+def summarize(results, fields, status='status'):
+    """
+    Pass rates and spreads of results.
+
+    Parameters:
+    results ... sequence of result arrays (see evaluate_grid)
+    fields ... names of result fields to summarize
+    status ... name of the status field
+
+    Returns:
+    structured array with fields count, passed, pass_rate and
+    <name>_median, <name>_std of passed curves for each name in fields
+    """
+    dtype = [('count', int), ('passed', int), ('pass_rate', float)]
+    for name in fields:
+        dtype += [(name + '_median', float), (name + '_std', float)]
+    summary = np.empty(len(results), dtype=dtype)
+    for row, result in enumerate(results):
+        passed = result[status] == STATUS_PASSED
+        summary['count'][row] = len(result)
+        summary['passed'][row] = np.count_nonzero(passed)
+        summary['pass_rate'][row] = np.count_nonzero(passed) / len(result) if len(result) else np.nan
+        for name in fields:
+            values = result[name][passed]
+            values = values[np.isfinite(values)]
+            summary[name + '_median'][row] = np.median(values) if len(values) else np.nan
+            summary[name + '_std'][row] = np.std(values) if len(values) else np.nan
+    return summary
+
+
+def sweep(function, x, y, grid, fields=None, status='status', workers=None, offsets=None, series=None, **kwargs):
+    """
+    Evaluate a grid of analysis parameters on a batch of curves.
+
+    Parameters:
+    function ... vectorized analysis function, eg. analyse_cv_many
+    x, y ... curves passed to function, 2D arrays or 1D ragged values
+    grid ... dict of parameter name and sequence of values, all combinations
+             are evaluated; min_correlation is applied as cut on the result
+             field r_value if function does not accept it (as the scripts do)
+    fields ... names of result fields to summarize, all float fields if None
+    status ... name of the status field
+    workers ... number of worker processes, evaluate in process if None
+    offsets ... curve offsets for ragged values (see stack_curves)
+    series ... dict of additional keyword arguments with the same layout as x
+    kwargs ... passed to function for all grid points, min_correlation is
+               applied as in grid
+
+    Returns:
+    structured array with one row per grid point, the grid parameters and
+    the fields of summarize
+    """
+    settings = parameter_grid(grid)
+    results = evaluate_grid(function, x, y, settings, workers=workers, offsets=offsets, series=series, **kwargs)
+    if fields is None:
+        fields = [name for name in results[0].dtype.names if results[0].dtype[name] == float] if results else []
+    summary = summarize(results, fields, status=status)
+
+    dtype = [(name, np.asarray(list(grid[name])).dtype) for name in grid] + summary.dtype.descr
+    table = np.empty(len(settings), dtype=dtype)
+    for name in grid:
+        table[name] = [setting[name] for setting in settings]
+    for name in summary.dtype.names:
+        table[name] = summary[name]
+    return table
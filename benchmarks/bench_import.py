@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""Import time benchmark for the analysis_pqc package.
+
+Measures `import analysis_pqc` in fresh interpreters and verifies that no
+SciPy submodule is loaded at import. Exits with status 1 if SciPy is
+imported or the median exceeds the optional limit, so it can guard
+against regressions in automation.
+
+Synopsis
+
+  python benchmarks/bench_import.py [-n NUMBER] [--limit SECONDS]
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import sys, time
+t = time.perf_counter()
+import analysis_pqc
+t = time.perf_counter() - t
+print(t, any(name == 'scipy' or name.startswith('scipy.') for name in sys.modules))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='number', type=int, default=10, help='number of interpreter runs (default 10)')
+    parser.add_argument('--limit', type=float, help='fail if the median import time exceeds this value (seconds)')
+    return parser.parse_args()
+
+
+def measure(code):
+    output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    seconds, scipy_loaded = output.split()
+    return float(seconds), scipy_loaded == 'True'
+
+
+def main():
+    args = parse_args()
+
+    candidates = [
+        ("numpy", PROBE.replace('import analysis_pqc', 'import numpy')),
+        ("analysis_pqc", PROBE),
+        ("eager scipy", PROBE.replace('import analysis_pqc', 'import analysis_pqc, scipy.interpolate, scipy.stats, scipy.signal')),
+    ]
+    status = 0
+    for name, code in candidates:
+        times = []
+        scipy_loaded = False
+        for _ in range(args.number):
+            seconds, scipy_loaded = measure(code)
+            times.append(seconds)
+        median = statistics.median(times)
+        print(f"{name:<20} {median * 1e3:8.1f} ms  (min {min(times) * 1e3:.1f} ms, scipy loaded: {scipy_loaded})")
+        if name == "analysis_pqc":
+            if scipy_loaded:
+                print("error: importing analysis_pqc loads scipy")
+                status = 1
+            if args.limit is not None and median > args.limit:
+                print(f"error: import time exceeds limit of {args.limit * 1e3:.1f} ms")
+                status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""Decode benchmark for PQC JSON measurement files.
+
+Compares json.load followed by np.array per series (previous
+read_json_file) with the direct-to-numpy decoders of pqc_json_decoder on
+generated files of realistic sizes. Reports median decode time and peak
+traced memory (tracemalloc) per file type.
+
+Synopsis
+
+  python benchmarks/bench_json_decode.py [-n NUMBER]
+
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pqc_json_decoder  # noqa: E402
+
+# name: number of points, series keys
+FILES = {
+    "vdp": (21, ['timestamp', 'current', 'voltage_vsrc', 'temperature_box', 'temperature_chuck', 'humidity_box']),
+    "cv (fine sweep)": (5000, ['timestamp', 'voltage_hvsrc', 'current_hvsrc', 'capacitance', 'capacitance2', 'resistance', 'temperature_box', 'temperature_chuck', 'humidity_box']),
+    "breakdown ramp": (100000, ['timestamp', 'voltage', 'current_hvsrc', 'current_elm', 'temperature_box', 'temperature_chuck', 'humidity_box']),
+}
+
+
+def decode_json(filename):
+    with open(filename) as f:
+        data = json.load(f)
+    series = data.get('series', {})
+    for k, v in series.items():
+        series[k] = np.array(v)
+    return data
+
+
+def create_file(dirname, name, size, keys):
+    rng = np.random.default_rng(0)
+    data = {
+        'meta': {'sample_name': 'HPK_VPX12345_001_2-S_HM_WR', 'start_timestamp': '2021-01-01T00:00:00', 'measurement_name': name},
+        'series': {key: (rng.normal(size=size) * 1e-9).tolist() for key in keys}
+    }
+    filename = os.path.join(dirname, name.split()[0] + '.json')
+    with open(filename, 'w') as f:
+        json.dump(data, f)
+    return filename
+
+
+def measure(function, filename, number):
+    times = []
+    for _ in range(number):
+        t = time.perf_counter()
+        function(filename)
+        times.append(time.perf_counter() - t)
+    tracemalloc.start()
+    function(filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='number', type=int, default=5, help='number of runs per file (default 5)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    candidates = [("json + np.array", decode_json)]
+    for backend in pqc_json_decoder.BACKENDS:
+        if backend == 'simdjson' and pqc_json_decoder.simdjson is None:
+            print("simdjson             not installed (pip install pysimdjson)")
+            continue
+        candidates.append((backend, lambda filename, backend=backend: pqc_json_decoder.load_measurement(filename, backend=backend)))
+
+    with tempfile.TemporaryDirectory() as dirname:
+        for name, (size, keys) in FILES.items():
+            filename = create_file(dirname, name, size, keys)
+            print(f"{name}: {len(keys)} series x {size} points, {os.path.getsize(filename) / 1024**2:.2f} MB")
+            for label, function in candidates:
+                seconds, peak = measure(function, filename, args.number)
+                print(f"  {label:<20} {seconds * 1e3:9.2f} ms  peak {peak / 1024**2:8.2f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""Micro-benchmark for the per-call overhead of the `params` decorator.
+
+Compares the previous implementation (creating the namedtuple class on every
+call) with the precompiled result types and the compact record mode.
+
+Synopsis
+
+  python benchmarks/bench_params.py [-n NUMBER]
+
+"""
+
+import argparse
+import timeit
+from collections import namedtuple
+
+import numpy as np
+
+import analysis_pqc
+
+NAMES = 'v_max, i_max, i_800, i_600, i300, status'
+
+
+def params_legacy(names):
+    """Previous decorator, creating a new namedtuple class per call."""
+    def params(f):
+        def params(*args, **kwargs):
+            return namedtuple(f.__name__, names)(*f(*args, **kwargs))
+        return params
+    return params
+
+
+def analyse_dummy(v, i):
+    return 0., 0., 0., 0., 0., analysis_pqc.STATUS_PASSED
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='number', type=int, default=20000, help='number of calls (default 20000)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    v = np.linspace(0, 1000, 101)
+    i = np.linspace(0, 1e-6, 101)
+
+    candidates = [
+        ("plain tuple", analyse_dummy),
+        ("legacy params", params_legacy(NAMES)(analyse_dummy)),
+        ("precompiled params", analysis_pqc.params(NAMES)(analyse_dummy)),
+        ("analyse_iv", analysis_pqc.analyse_iv),
+    ]
+    baseline = None
+    for name, f in candidates:
+        t = timeit.timeit(lambda: f(v, i), number=args.number)
+        per_call = t / args.number * 1e6
+        if baseline is None:
+            baseline = per_call
+        print(f"{name:<20} {per_call:8.2f} us/call  (+{per_call - baseline:7.2f} us overhead)")
+
+    results = [analysis_pqc.analyse_iv(v, i) for _ in range(1000)]
+    t = timeit.timeit(lambda: analysis_pqc.to_records(results), number=10) / 10
+    print(f"{'to_records (1000)':<20} {t * 1e3:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,9 @@ from jinja2 import Environment, FileSystemLoader
 import yaml
 
 from pqc_resultset import PQC_resultset
+from pqc_structures import load_structures
+from pqc_json_cache import JSONFileCache
+from pqc_analysis_tools import set_json_cache
 
 
 def create_dir(dirname: str) -> None:
@@ -275,7 +278,7 @@ def load_batch(path: str, outdir: str = None, *, lazy: bool = False,
     create_histograms = create_histograms and has_outdir
     batchname = os.path.basename(os.path.normpath(path))
     print(f"Batch: {batchname}")
-    pqc_results = PQC_resultset(batchname)
+    pqc_results = PQC_resultset(batchname, structures=load_structures(config))
 
     # Apply configuration
     apply_configuration(pqc_results.dataseries, config)
@@ -349,6 +352,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('-f', dest='force', action='store_true', help='force evaluating all directories (normally, only directories with at least one VdP measurement are evaluated to prevent blank lines if the is a wrong file or so)')
     parser.add_argument('-t', dest='templates', metavar='EXPR', action='append', default=[], help='select templates to render (eg. -t*.tex -t*.html -tall.txt)')
     parser.add_argument('-c', '--config', metavar='NAME', default='default', help='select custom configuration')
+    parser.add_argument('--cache-dir', metavar='DIR', help='cache decoded measurement files in binary format in DIR')
+    parser.add_argument('--cache-size', metavar='MB', type=float, default=1024, help='max. size of the cache directory in MB (default 1024)')
+    parser.add_argument('--rebuild-cache', action='store_true', help='decode all measurement files again and rewrite the cache')
     return parser.parse_args()
 
 
@@ -360,6 +366,9 @@ def main() -> None:
 
     # Load configuration
     config = load_configuration(args.config)
+    # Cache decoded measurement files (optional)
+    if args.cache_dir:
+        set_json_cache(JSONFileCache(args.cache_dir, max_bytes=int(args.cache_size * 1024**2), rebuild=args.rebuild_cache))
     # Create output directory
     create_dir(outdir)
 
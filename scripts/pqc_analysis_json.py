@@ -102,7 +102,9 @@ def analyse_iv_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = abs(series.get("voltage", np.array([])))
     i_elm = -series.get("current_elm", np.array([]))
@@ -166,9 +168,9 @@ def analyse_iv_data(path, options=None, config=None):
             "%s:  IV:\ti_600: %.3f uA\ti_300: %.3f nA" % (lbl, i_600 * 1e6, i_300 * 1e9)
         )
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -206,7 +208,9 @@ def analyse_cv_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_hvsrc", np.array([]))
     i = series.get("current_hvsrc", np.array([]))
@@ -303,11 +307,11 @@ def analyse_cv_data(path, options=None, config=None):
             "%s: \tCV: v_fd: %.2e V\trho: %.2e Ohm\tconc: %.2e cm^-3"
             % (lbl, v_dep2, rho, conc * 1e-6)
         )
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     ac_freq_hz = meta.get("lcr_frequency").split(" ")[0]
     ac_ampl_v = meta.get("lcr_amplitude").split(" ")[0]
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -355,7 +359,9 @@ def analyse_mos_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_hvsrc", np.array([]))
     i = series.get("current_hvsrc", np.array([]))
@@ -436,11 +442,11 @@ def analyse_mos_data(path, options=None, config=None):
             % (lbl, v_fb2, c_acc_m, t_ox, n_ox)
         )
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
     ac_freq_hz = meta.get("lcr_frequency").split(" ")[0]
     ac_ampl_v = meta.get("lcr_amplitude").split(" ")[0]
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -484,7 +490,9 @@ def analyse_gcd_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     biasv = series.get("bias_voltage", np.array([]))
     v = series.get("voltage", np.array([]))
@@ -541,9 +549,9 @@ def analyse_gcd_data(path, options=None, config=None):
             % (lbl, gcd_result.i_surf, gcd_result.i_bulk)
         )
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -581,7 +589,9 @@ def analyse_fet_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage", np.array([]))
     i_em = series.get("current_elm", np.array([]))
@@ -655,9 +665,9 @@ def analyse_fet_data(path, options=None, config=None):
     if options.print:
         print("%s: \tnFet: v_th: %.2e V" % (lbl, v_th))
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
     )
@@ -692,7 +702,9 @@ def analyse_van_der_pauw_data(path, options=None, min_correlation=0.99, config=N
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_vsrc", np.array([]))
     i = series.get("current", np.array([]))
@@ -747,9 +759,9 @@ def analyse_van_der_pauw_data(path, options=None, min_correlation=0.99, config=N
             % (lbl, r_sheet, a, r_value, lbl_vdp)
         )  # lbl_vdp
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -789,7 +801,9 @@ def analyse_linewidth_data(
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_vsrc", np.array([]))
     i = series.get("current", np.array([]))
@@ -841,9 +855,9 @@ def analyse_linewidth_data(
     if options.print:
         print("%s: \tLinewidth: %.2e um\t%s" % (lbl, t_line, lbl_vdp))
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -883,7 +897,9 @@ def analyse_cbkr_data(
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_vsrc", np.array([]))
     i = series.get("current", np.array([]))
@@ -930,9 +946,9 @@ def analyse_cbkr_data(
     if options.print:
         print("%s: \tcbkr: r_contact: %.2e Ohm\t%s" % (lbl, r_contact, lbl_vdp))
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -969,7 +985,9 @@ def analyse_contact_data(path, options=None, min_correlation=0.95, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_vsrc", np.array([]))
     i = series.get("current", np.array([]))
@@ -1021,9 +1039,9 @@ def analyse_contact_data(path, options=None, min_correlation=0.95, config=None):
             % (lbl, r_contact, r_value)
         )
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -1060,7 +1078,9 @@ def analyse_meander_data(path, options=None, min_correlation=0.99, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_vsrc", np.array([]))
     i = series.get("current", np.array([]))
@@ -1109,9 +1129,9 @@ def analyse_meander_data(path, options=None, min_correlation=0.99, config=None):
     if options.print:
         print(f"{lbl}: \tMeander: r: {r:.2e} r_value: {r_value:.2f}")
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -1147,7 +1167,9 @@ def analyse_breakdown_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage", np.array([]))
     i = series.get("current_hvsrc", np.array([]))
@@ -1157,6 +1179,7 @@ def analyse_breakdown_data(path, options=None, config=None):
     humidity = series.get("humidity_box", np.array([]))
 
     i = np.array(i)
+    i_elm = np.array(i_elm)
 
     lbl = assign_label(path, test)
     x_loc = 0.3
@@ -1165,7 +1188,8 @@ def analyse_breakdown_data(path, options=None, config=None):
     if len(v) == 0:
         return np.nan, None
 
-    v_bd, status = analyse_breakdown(v, i, debug=0, **kwargs)
+    # the electrometer current is tested for breakdown as well if recorded
+    v_bd, status = analyse_breakdown(v, i, i_elm=i_elm if len(i_elm) == len(v) else None, debug=0, **kwargs)
 
     if options.plot:
         fig, ax = plt.subplots(1, 1)
@@ -1189,9 +1213,9 @@ def analyse_breakdown_data(path, options=None, config=None):
     if options.print:
         print("%s: \tBreakdown: v_bd: %.2e V" % (lbl, v_bd))
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -1228,7 +1252,9 @@ def analyse_capacitor_data(path, options=None, config=None):
     if options is None:
         options = AnalysisOptions()
 
-    series = read_json_file(path).get("series")
+    measurement = MeasurementFile.load(path)
+    path = measurement.filename
+    series = measurement.series
     timestamp = series.get("timestamp", np.array([]))
     v = series.get("voltage_hvsrc", np.array([]))
     i = series.get("current_hvsrc", np.array([]))
@@ -1253,11 +1279,11 @@ def analyse_capacitor_data(path, options=None, config=None):
     if options.print:
         print("%s: \tCapacitance: %.2e F, " % (lbl, c_median))
 
-    meta = read_json_file(path).get("meta")
+    meta = measurement.meta
     start_timestamp = meta.get("start_timestamp").replace("T", " ")
     ac_freq_hz = meta.get("lcr_frequency").split(" ")[0]
     ac_ampl_v = meta.get("lcr_amplitude").split(" ")[0]
-    rawdata = PQC_RawData(path, test, meta, series)
+    rawdata = PQC_RawData(measurement, test)
     # convert relative timestamp to absolute timestamp
     timestamp_abs = np.array(
         list(map(rel_to_abs_timestamp, repeat(start_timestamp), timestamp))
@@ -2,8 +2,8 @@
 analysis.
 """
 
+import fnmatch
 import glob
-import json
 import os
 import dateutil.parser as timestamp_parser
 
@@ -12,13 +12,20 @@ import numpy as np
 
 from datetime import datetime,timedelta
 
+from pqc_json_decoder import load_measurement, read_json_meta
+
 __all__ = [
     'find_most_recent_file',
     'find_all_files_from_path',
+    'SampleDirectoryIndex',
     'get_timestamp',
     'rel_to_abs_timestamp',
     'assign_label',
     'read_json_file',
+    'set_json_cache',
+    'MeasurementFile',
+    'read_json_meta',
+    'SampleMetaIndex',
     'units',
     'normalise_parameter',
     'plot_curve',
@@ -26,6 +33,64 @@ __all__ = [
 ]
 
 
+def _tokenize(filename):
+    # the replace is necessary for van_der_pauw/van-der-pauw
+    return [v.lower().replace("-", "_") for v in filename.split('_')]
+
+
+class SampleDirectoryIndex:
+    """Measurement files of a directory listed once, with an inverted index of
+    the filename tokens for test, whitelist and blacklist queries (see
+    find_all_files_from_path).
+
+    >>> index = SampleDirectoryIndex('HPK_VPX12345_001_2-S_HM_WR')
+    >>> find_most_recent_file(index, 'van_der_pauw', whitelist=['n', 'cross'], blacklist=['reverse'])
+    """
+
+    def __init__(self, path, pattern='*.json'):
+        self.path = path
+        self.pattern = pattern
+        # same selection as glob: no hidden files unless the pattern is hidden,
+        # no files for a missing directory
+        names = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.startswith('.') and not pattern.startswith('.'):
+                        continue
+                    if fnmatch.fnmatch(entry.name, pattern):
+                        names.append(entry.name)
+        except OSError:
+            pass
+        self.filenames = sorted(os.path.join(path, name) for name in names)
+        self._tokens = {}
+        for position, filename in enumerate(self.filenames):
+            for token in _tokenize(filename):
+                self._tokens.setdefault(token, set()).add(position)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.path!r})"
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def find(self, test=None, *, whitelist=None, blacklist=None):
+        """Return sorted filenames matching test and all whitelist tokens but
+        none of the blacklist tokens.
+        """
+        required = []
+        if test is not None:
+            required.append(test)
+        required.extend(e.lower() for e in whitelist or [])
+        if required:
+            positions = set.intersection(*(self._tokens.get(token, set()) for token in required))
+        else:
+            positions = set(range(len(self.filenames)))
+        for e in blacklist or []:
+            positions -= self._tokens.get(e.lower(), set())
+        return [self.filenames[position] for position in sorted(positions)]
+
+
 def find_all_files_from_path(path, test=None, *, whitelist=None, blacklist=None, pattern='*.json'):
     """
     returns a list of measurements for a given test
@@ -33,21 +98,11 @@ def find_all_files_from_path(path, test=None, *, whitelist=None, blacklist=None,
     eg for forward right poly vdp:
       whitlelist=["PQCFlutesRight","polyslicon"] and
       blacklist=["reverse"]
+    path can be a SampleDirectoryIndex to query a directory listed before
     """
-    filedir = []
-
-    filenames = glob.glob(os.path.join(path, pattern))
-    filenames.sort()
-
-    for filename in filenames:
-        # the replace is necessary for van_der_pauw/van-der-pauw
-        segments = [v.lower().replace("-", "_") for v in filename.split('_')]
-        if (test is None or test in segments) and \
-           (blacklist is None or not any(e.lower() in segments for e in blacklist)) and \
-           (whitelist is None or all(e.lower() in segments for e in whitelist)):
-            filedir.append(filename)
-
-    return np.sort(filedir)
+    if not isinstance(path, SampleDirectoryIndex) or path.pattern != pattern:
+        path = SampleDirectoryIndex(os.fspath(getattr(path, 'path', path)), pattern)
+    return np.sort(path.find(test, whitelist=whitelist, blacklist=blacklist))
 
 
 def find_most_recent_file(path, test=None, *, whitelist=None, blacklist=None):
@@ -93,6 +148,17 @@ def assign_label(path, test, vdp=False):
     return lbl
 
 
+_json_cache = None
+
+
+def set_json_cache(cache):
+    """Set cache used by read_json_file (see pqc_json_cache.JSONFileCache),
+    disable caching if None.
+    """
+    global _json_cache
+    _json_cache = cache
+
+
 def read_json_file(filename):
     """Return a PQC JSON formatted file as dictionary containing numpy arrays.
 
@@ -100,25 +166,112 @@ def read_json_file(filename):
     >>> series.get('voltage')
     array([0.0, 0.1, 0.2, 0.3])
     """
+    cache = _json_cache
+    if cache is not None:
+        data = cache.get(filename)
+        if data is not None:
+            return data
     data = {"series": {}}
     try:
-        with open(filename) as f:
-            data = json.load(f)
-        # convert to numpy arrays
+        # numeric series are decoded to float64 arrays directly
+        data = load_measurement(filename)
         series = data.get('series', {})
         for k, v in series.items():
-            series[k] = np.array(v)
+            series[k] = np.asarray(v)
     except Exception:
         raise RuntimeError(f"Failed to parse JSON file: {filename}")
+    if cache is not None:
+        cache.set(filename, data)
     return data
 
 
+class MeasurementFile:
+    """PQC JSON measurement file parsed once, providing `meta`, `series`
+    (numpy arrays) and the start timestamp.
+
+    >>> measurement = MeasurementFile.load('sample.json')
+    >>> measurement.series.get('voltage')
+    array([0.0, 0.1, 0.2, 0.3])
+    >>> measurement.timestamp
+    datetime.datetime(2021, 1, 1, 0, 0)
+    """
+
+    def __init__(self, filename, meta=None, series=None):
+        self.filename = filename
+        self.meta = meta if meta is not None else {}
+        self.series = series if series is not None else {}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.filename!r})"
+
+    def __fspath__(self):
+        return self.filename
+
+    @classmethod
+    def load(cls, filename, cache=None):
+        """Return parsed measurement file, an already parsed file is returned
+        as is. If `cache` is a dict, files are parsed only once per cache.
+        """
+        if isinstance(filename, cls):
+            return filename
+        if cache is not None and filename in cache:
+            return cache[filename]
+        data = read_json_file(filename)
+        measurement = cls(filename, data.get('meta'), data.get('series'))
+        if cache is not None:
+            cache[filename] = measurement
+        return measurement
+
+    @property
+    def timestamp(self):
+        """Start timestamp as datetime object."""
+        return timestamp_parser.parse(self.meta['start_timestamp'])
+
+
+class SampleMetaIndex:
+    """Metadata of the measurement files of a sample directory, read from the
+    file headers only (see read_json_meta) and kept per file. The directory
+    listing of a SampleDirectoryIndex is reused if given.
+
+    >>> index = SampleMetaIndex(SampleDirectoryIndex('HPK_VPX12345_001_2-S_HM_WR'))
+    >>> index.timestamp(index.filenames()[-1])
+    datetime.datetime(2021, 1, 1, 0, 0)
+    """
+
+    def __init__(self, path, pattern='*.json'):
+        if not isinstance(path, SampleDirectoryIndex):
+            path = SampleDirectoryIndex(path, pattern)
+        self.index = path
+        self.path = path.path
+        self.pattern = path.pattern
+        self._meta = {}
+
+    def filenames(self):
+        """Return sorted measurement files of the directory."""
+        return list(self.index.filenames)
+
+    def meta(self, filename):
+        """Return meta dict of a measurement file of the directory."""
+        if filename not in self._meta:
+            self._meta[filename] = read_json_meta(filename)
+        return self._meta[filename]
+
+    def timestamp(self, filename):
+        """Return start timestamp of a measurement file as datetime object."""
+        return timestamp_parser.parse(self.meta(filename)['start_timestamp'])
+
+    def timestamps(self):
+        """Return dict of start timestamps of all measurement files."""
+        return {filename: self.timestamp(filename) for filename in self.filenames()}
+
+
 def get_timestamp(filename):
-    ret = None
-    with open(filename) as json_file:
-        data = json.load(json_file)
-        ret = timestamp_parser.parse(data['meta']['start_timestamp'])
-    return ret
+    """Return start timestamp of a measurement file or MeasurementFile, only
+    the file header is read.
+    """
+    if isinstance(filename, MeasurementFile):
+        return filename.timestamp
+    return timestamp_parser.parse(read_json_meta(filename)['start_timestamp'])
 
 def rel_to_abs_timestamp(start_time,incr_time):
     dt_start_time=datetime.strptime(start_time,'%Y-%m-%d %H:%M:%S')
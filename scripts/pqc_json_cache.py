@@ -0,0 +1,199 @@
+"""Binary sidecar cache for PQC JSON measurement files.
+
+Each measurement file is stored as one raw byte column file (`.npy`) holding
+all series back to back and a small JSON blob with the remaining data (meta)
+and the column layout. Entries are keyed on the absolute source path, its
+modification time and size, so changed files are decoded again. Column files
+are memory mapped (copy on write) on later runs.
+
+>>> cache = JSONFileCache('~/.cache/analysis-pqc/json')
+>>> set_json_cache(cache)  # see pqc_analysis_tools
+>>> read_json_file('sample.json')  # decoded once, then loaded from cache
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+__all__ = ['JSONFileCache']
+
+ALIGNMENT = 16
+
+
+class JSONFileCache:
+    """
+    Cache of decoded measurement files in a directory.
+
+    Parameters:
+    path ... cache directory, created if not existing
+    max_bytes ... max. size of the cache directory in bytes, least recently
+                  used entries are evicted
+    rebuild ... ignore existing entries and store all files again
+    """
+
+    suffixes = ('.npy', '.json')
+
+    def __init__(self, path, max_bytes=1024**3, rebuild=False):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, filename):
+        """Return key of a source file from path, mtime and size, None if not existing."""
+        filename = os.path.abspath(os.fspath(filename))
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        h = hashlib.sha1()
+        h.update(filename.encode())
+        h.update(repr((stat.st_mtime_ns, stat.st_size)).encode())
+        return h.hexdigest()
+
+    def get(self, filename):
+        """Return cached data of a source file or None."""
+        key = self.key(filename)
+        if key is None or self.rebuild:
+            self.misses += 1
+            return None
+        base = self._filename(key)
+        try:
+            with open(base + '.json') as f:
+                header = json.load(f)
+            raw = np.load(base + '.npy', mmap_mode='c').view(np.ndarray) if header['columns'] else None
+            os.utime(base + '.json')
+            os.utime(base + '.npy')
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        series = {}
+        for name, dtype, offset, shape in header['columns']:
+            dtype = np.dtype(dtype)
+            size = dtype.itemsize * int(np.prod(shape, dtype=int))
+            series[name] = raw[offset:offset + size].view(dtype).reshape(shape)
+        data = header['data']
+        data['series'] = series
+        self.hits += 1
+        return data
+
+    def set(self, filename, data):
+        """Store decoded data of a source file, series must be numpy arrays.
+        Files with object series (eg. ragged lists) are not cached.
+        """
+        key = self.key(filename)
+        if key is None:
+            return
+        series = data.get('series') or {}
+        arrays = [(name, np.ascontiguousarray(value)) for name, value in series.items()]
+        if any(array.dtype.hasobject for _, array in arrays):
+            return
+        columns = []
+        chunks = []
+        offset = 0
+        for name, array in arrays:
+            columns.append([name, array.dtype.str, offset, list(array.shape)])
+            chunk = array.view(np.uint8).reshape(-1) if array.size else np.empty(0, np.uint8)
+            padding = -len(chunk) % ALIGNMENT
+            chunks.append(chunk)
+            chunks.append(np.zeros(padding, np.uint8))
+            offset += len(chunk) + padding
+        header = {
+            'source': os.path.abspath(os.fspath(filename)),
+            'data': {name: value for name, value in data.items() if name != 'series'},
+            'columns': columns
+        }
+        try:
+            text = json.dumps(header)
+        except (TypeError, ValueError):
+            return
+        raw = np.concatenate(chunks) if chunks else np.empty(0, np.uint8)
+        base = self._filename(key)
+        size = 0
+        try:
+            # column file first, the header marks a complete entry
+            size += self._write(base + '.npy', lambda f: np.save(f, raw, allow_pickle=False))
+            size += self._write(base + '.json', lambda f: f.write(text.encode()))
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+        if self._disk_size() > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits into max_bytes."""
+        entries = {}
+        for entry in self._scan():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            key = os.path.splitext(entry.name)[0]
+            mtime, size = entries.get(key, (0, 0))
+            entries[key] = max(mtime, stat.st_mtime), size + stat.st_size
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1]):
+            if total <= self.max_bytes:
+                break
+            for suffix in self.suffixes:
+                try:
+                    os.remove(self._filename(key) + suffix)
+                except OSError:
+                    pass
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        """Remove all cached entries."""
+        for entry in self._scan():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = 0
+
+    def _write(self, filename, write):
+        fd, tmpname = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                size = f.tell()
+            os.replace(tmpname, filename)
+        except OSError:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+        return size
+
+    def _filename(self, key):
+        return os.path.join(self.path, key)
+
+    def _scan(self):
+        with os.scandir(self.path) as it:
+            return [entry for entry in it if entry.name.endswith(self.suffixes)]
+
+    def _disk_size(self):
+        with self._lock:
+            size = self._disk_bytes
+        if size is None:
+            size = 0
+            for entry in self._scan():
+                try:
+                    size += entry.stat().st_size
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_bytes = size
+        return size
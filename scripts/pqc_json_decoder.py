@@ -0,0 +1,226 @@
+"""Decoder for PQC JSON measurement files building numpy arrays directly.
+
+Flat numeric arrays of the `series` object are converted to float64 arrays
+without creating a Python float per value, all other values are decoded as
+by the json module. The `simdjson` backend (package pysimdjson) is used if
+installed, otherwise a pure standard library scanner.
+
+>>> data = load_measurement('sample.json')
+>>> data['series']['voltage']
+array([0. , 0.1, 0.2, 0.3])
+
+Metadata is read from the head of a file only, stopping before `series`:
+
+>>> read_json_meta('sample.json')['start_timestamp']
+'2021-01-01T00:00:00'
+"""
+
+import json
+import re
+
+import numpy as np
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+__all__ = ['BACKENDS', 'decode_measurement', 'load_measurement', 'read_json_meta']
+
+BACKENDS = ('stdlib', 'simdjson')
+
+DEFAULT_BACKEND = 'simdjson' if simdjson is not None else 'stdlib'
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# characters of a flat array of JSON numbers (no strings, null, NaN or nested arrays)
+_NUMBERS = re.compile(r'[0-9eE+\-., \t\n\r]*')
+
+_decoder = json.JSONDecoder()
+
+
+def _skip(text, index):
+    return _WHITESPACE.match(text, index).end()
+
+
+def _expect(text, index, char):
+    if text[index:index + 1] != char:
+        raise json.JSONDecodeError(f"Expecting {char!r} delimiter", text, index)
+    return index + 1
+
+
+def _decode_array(text, index):
+    """Return float64 array of a flat numeric JSON array at index and end index,
+    other values are converted by np.array.
+    """
+    if text[index:index + 1] == '[':
+        end = text.find(']', index)
+        if end >= 0 and _NUMBERS.fullmatch(text, index + 1, end):
+            content = text[index + 1:end]
+            if not content.strip():
+                return np.array([]), end + 1
+            values = np.fromstring(content, dtype=np.float64, sep=',')
+            if len(values) == content.count(',') + 1:
+                return values, end + 1
+    value, end = _decoder.raw_decode(text, index)
+    return np.array(value), end
+
+
+def _decode_object(text, index, decode_value):
+    """Return dict of the JSON object at index and end index, values decoded by
+    decode_value(key, text, index).
+    """
+    index = _skip(text, _expect(text, index, '{'))
+    result = {}
+    if text[index:index + 1] == '}':
+        return result, index + 1
+    while True:
+        index = _expect(text, index, '"')
+        key, index = json.decoder.scanstring(text, index)
+        index = _skip(text, _expect(text, _skip(text, index), ':'))
+        result[key], index = decode_value(key, text, index)
+        index = _skip(text, index)
+        if text[index:index + 1] == '}':
+            return result, index + 1
+        index = _skip(text, _expect(text, index, ','))
+
+
+def _decode_series(text, index):
+    return _decode_object(text, index, lambda key, text, index: _decode_array(text, index))
+
+
+def _decode_top(key, text, index):
+    if key == 'series' and text[index:index + 1] == '{':
+        return _decode_series(text, index)
+    return _decoder.raw_decode(text, index)
+
+
+def _decode_stdlib(data):
+    text = data.decode('utf-8') if isinstance(data, bytes) else data
+    index = _skip(text, 0)
+    if text[index:index + 1] != '{':
+        return json.loads(text)
+    result, index = _decode_object(text, index, _decode_top)
+    if _skip(text, index) != len(text):
+        raise json.JSONDecodeError("Extra data", text, index)
+    return result
+
+
+def _simdjson_value(value):
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def _simdjson_array(value):
+    if isinstance(value, simdjson.Array) and not (len(value) and isinstance(value[0], (simdjson.Array, simdjson.Object))):
+        try:
+            return np.frombuffer(value.as_buffer(of_type='d'), dtype=np.float64).copy()
+        except (TypeError, ValueError):
+            pass  # mixed types, eg. null values
+    return np.array(_simdjson_value(value))
+
+
+def _decode_simdjson(data):
+    if simdjson is None:
+        raise ValueError("JSON backend 'simdjson' requires package pysimdjson")
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    document = simdjson.Parser().parse(data)
+    if not isinstance(document, simdjson.Object):
+        return _simdjson_value(document)
+    result = {}
+    for key in document.keys():
+        value = document[key]
+        if key == 'series' and isinstance(value, simdjson.Object):
+            result[key] = {name: _simdjson_array(value[name]) for name in value.keys()}
+        else:
+            result[key] = _simdjson_value(value)
+    return result
+
+
+def decode_measurement(data, backend=None):
+    """
+    Decode a PQC JSON document, flat numeric series become float64 arrays.
+
+    Parameters:
+    data ... JSON document as str or bytes
+    backend ... 'stdlib' or 'simdjson', pysimdjson if installed by default
+
+    Returns:
+    dict with series converted to numpy arrays
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'stdlib':
+        return _decode_stdlib(data)
+    if backend == 'simdjson':
+        return _decode_simdjson(data)
+    raise ValueError("Invalid JSON backend: {!r}".format(backend))
+
+
+def load_measurement(filename, backend=None):
+    """Decode a PQC JSON measurement file (see decode_measurement)."""
+    backend = backend or DEFAULT_BACKEND
+    # simdjson parses bytes, read text otherwise to keep a single copy in memory
+    if backend == 'simdjson':
+        with open(filename, 'rb') as f:
+            data = f.read()
+    else:
+        with open(filename, encoding='utf-8') as f:
+            data = f.read()
+    return decode_measurement(data, backend=backend)
+
+
+def _decode_item(text, index):
+    """Return key, value and index of the following delimiter of a top level
+    object item at index.
+    """
+    index = _expect(text, index, '"')
+    key, index = json.decoder.scanstring(text, index)
+    index = _skip(text, _expect(text, _skip(text, index), ':'))
+    value, index = _decoder.raw_decode(text, index)
+    index = _skip(text, index)
+    if text[index:index + 1] not in (',', '}'):
+        raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+    return key, value, index
+
+
+def read_json_meta(filename, chunksize=16384):
+    """
+    Return the `meta` object of a PQC JSON measurement file, reading the file
+    incrementally only up to the end of `meta`.
+
+    Parameters:
+    filename ... measurement file
+    chunksize ... number of characters read at once, doubled for every read
+
+    Returns:
+    dict, empty if the file has no meta object
+    """
+    with open(filename, encoding='utf-8') as f:
+        text = ''
+        index = None
+        eof = False
+        while True:
+            try:
+                if index is None:
+                    index = _skip(text, _expect(text, _skip(text, 0), '{'))
+                    if text[index:index + 1] == '}':
+                        return {}
+                # items before meta (usually none) are decoded and skipped
+                key, value, index = _decode_item(text, index)
+                if key == 'meta':
+                    return value
+                if text[index] == '}':
+                    return {}
+                index = _skip(text, index + 1)
+                continue
+            except json.JSONDecodeError:
+                # incomplete item, read more unless at end of file
+                if eof:
+                    raise
+            chunk = f.read(chunksize)
+            chunksize *= 2
+            eof = not chunk
+            text += chunk
@@ -1,5 +1,7 @@
 import os
 
+from pqc_analysis_tools import MeasurementFile
+
 class PQC_RawData:
     '''
     This class is used to store 'raw' measurement data and extracted parameters for use with .xml templates
@@ -10,7 +12,10 @@ class PQC_RawData:
     29.09.2021, Moritz Wiehe
     '''
 
-    def __init__(self,path,test,meta,series):
+    def __init__(self,path,test,meta=None,series=None):
+        if isinstance(path,MeasurementFile):
+            meta=path.meta
+            path=path.filename
         self.data={}
         self.path=path
         self.test=test
@@ -16,6 +16,7 @@ from analysis_pqc import params
 import pqc_analysis_json as pqc
 from pqc_values import PQC_Values, make_chunks
 from pqc_analysis_json import AnalysisOptions
+from pqc_structures import load_structures
 
 __all__ = ["Histogram", "PQC_resultset"]
 
@@ -31,8 +32,9 @@ class PQC_resultset:
 
     OUTPUT_PREFIX = "analysis_"
 
-    def __init__(self, batchname, dataseries=None):
+    def __init__(self, batchname, dataseries=None, structures=None):
         self.batch = batchname
+        self.structures = structures if structures is not None else load_structures()
         self.labels = []
         self.flutes = []
         self.timestamps = []
@@ -217,6 +219,11 @@ class PQC_resultset:
             self.dataseries["contact_n"] = PQC_Values(
                 "cont_n", "Contact Chain N", 85.0, "kOhm", 1e-3, stray=0.5
             )
+
+            # dataseries of additional structures of the registry
+            for key in self.structures.outputs:
+                if key not in self.dataseries:
+                    self.dataseries[key] = PQC_Values(key, key)
         else:
             self.dataseries = dataseries
 
@@ -262,7 +269,7 @@ class PQC_resultset:
         ret = [None] * len(self.dataseries["vdp_n_f"].split(junk_size))
 
         for i in range(0, len(ret)):
-            ret[i] = PQC_resultset(self.batch)
+            ret[i] = PQC_resultset(self.batch, structures=self.structures)
 
         for key in self.dataseries:
             if type(self.dataseries[key]) is PQC_Values:
@@ -283,10 +290,13 @@ class PQC_resultset:
     def analyze_sample(self, path, create_plots=False, force_eval=False, config=None):
         """Analyze sample data and append results to dataseries."""
 
+        # directory is listed once for all structures
+        index = pqc.SampleDirectoryIndex(path)
+
         # TODO
         # this finds out if there is an empty directory, assuming that there is at least one vdp measurement
         if (
-            len(pqc.find_all_files_from_path(path, "van_der_pauw", whitelist=["cross"]))
+            len(pqc.find_all_files_from_path(index, "van_der_pauw", whitelist=["cross"]))
             < 1
             and not force_eval
         ):
@@ -297,15 +307,16 @@ class PQC_resultset:
         label = os.path.basename(path)
         self.labels.append(label)
         self.rawdata[label] = {}
+        files = {}  # measurement files parsed once per sample
 
         # TODO
-        x = pqc.find_all_files_from_path(path, "van_der_pauw")
+        x = pqc.find_all_files_from_path(index, "van_der_pauw")
         if len(x) > 0:
-            self.timestamps.append(pqc.get_timestamp(x[-1]))
+            # only the file header is read for the timestamp
+            self.timestamps.append(pqc.SampleMetaIndex(index).timestamp(x[-1]))
         else:
             self.timestamps.append(0)
 
-        cross = "cross"
         plotImgLabel = self.dataseries["xlabels"][-1]
         if create_plots:
             plot_dir = self.plot_dir
@@ -314,401 +325,7 @@ class PQC_resultset:
 
         options = AnalysisOptions(plot_dir, plotImgLabel)
 
-        # =================================================== Flute 1 ===================================================
-
-        v_th, rawdata = pqc.analyse_fet_data(
-            pqc.find_most_recent_file(path, "fet", whitelist=[]),
-            options=options,
-            config=config,
-        )
-        self.dataseries["v_th"].append(v_th)
-        if rawdata is not None:
-            self.rawdata[label]["FET"] = rawdata
-
-        _, v_fb2, t_ox, n_ox, c_acc_m, rawdata = pqc.analyse_mos_data(
-            pqc.find_most_recent_file(path, "mos", whitelist=[]),
-            options=options,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["MOS_capacitor_HV_Source"] = rawdata
-        self.dataseries["v_fb2"].append(v_fb2)
-        self.dataseries["t_ox"].append(t_ox)
-        self.dataseries["n_ox"].append(n_ox)
-        self.dataseries["c_acc_m"].append(c_acc_m)
-
-        c_mean, c_median, d, rawdata = pqc.analyse_capacitor_data(
-            pqc.find_most_recent_file(
-                path,
-                "capacitor",
-                whitelist=["Left", "250mV", "10kHz"],
-                blacklist=["mos"],
-            ),
-            options=options,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label][
-                "Capacitor_test_structure_Left_10kHz_250mV_HV_Source"
-            ] = rawdata
-        self.dataseries["cap_l"].append(c_median)
-        self.dataseries["cap_l_tox"].append(d)
-
-        c_mean, c_median, d, rawdata = pqc.analyse_capacitor_data(
-            pqc.find_most_recent_file(
-                path,
-                "capacitor",
-                whitelist=["Right", "250mV", "10kHz"],
-                blacklist=["mos"],
-            ),
-            options=options,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label][
-                "Capacitor_test_structure_Right_10kHz_250mV_HV_Source"
-            ] = rawdata
-        self.dataseries["cap_r"].append(c_median)
-        self.dataseries["cap_r_tox"].append(d)
-
-        vdp_poly_f, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path,
-                "van_der_pauw",
-                whitelist=["Polysilicon", cross],
-                blacklist=["reverse"],
-            ),
-            options=options.pushPrefix("VdP_poly_fwd"),
-            config=config,
-        )
-        self.dataseries["vdp_poly_f"].append(vdp_poly_f)
-        if rawdata is not None:
-            self.rawdata[label]["Polysilicon_Van-der-Pauw_cross"] = rawdata
-
-        vdp_poly_r, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, "van_der_pauw", whitelist=["Polysilicon", "reverse", cross]
-            ),
-            options=options.pushPrefix("VdP_poly_rev"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Reverse_Polysilicon_Van-der-Pauw_cross"] = rawdata
-        self.dataseries["vdp_poly_r"].append(vdp_poly_r)
-
-        vdp_n_f, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, "van_der_pauw", whitelist=["n", cross], blacklist=["reverse"]
-            ),
-            options=options.pushPrefix("VdP_N_fwd"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["N_Van-der-Pauw_cross"] = rawdata
-        self.dataseries["vdp_n_f"].append(vdp_n_f)
-
-        vdp_n_r, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, "van_der_pauw", whitelist=["n", "reverse", cross]
-            ),
-            options=options.pushPrefix("VdP_N_rev"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Reverse_N_Van-der-Pauw_cross"] = rawdata
-        self.dataseries["vdp_n_r"].append(vdp_n_r)
-
-        vdp_pstop_f, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, "van_der_pauw", whitelist=["P_stop", cross], blacklist=["reverse"]
-            ),
-            options=options.pushPrefix("VdP_P-Stop_fwd"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["P-stop_Van-der-Pauw_cross"] = rawdata
-        self.dataseries["vdp_pstop_f"].append(vdp_pstop_f)
-
-        vdp_pstop_r, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, "van_der_pauw", whitelist=["P_stop", "reverse", cross]
-            ),
-            options=options.pushPrefix("VdP_P-Stop_rev"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Reverse_P-stop_Van-der-Pauw_cross"] = rawdata
-        self.dataseries["vdp_pstop_r"].append(vdp_pstop_r)
-
-        # =================================================== Flute 2 ===================================================
-
-        i_surf, i_bulk, rawdata = pqc.analyse_gcd_data(
-            pqc.find_most_recent_file(path, "gcd", whitelist=[]),
-            options=options.pushPrefix("GCD"),
-            config=config,
-        )  # only i_surf valid
-        self.dataseries["i_surf"].append(i_surf)
-        # s0 = i_surf / q / ni[cm^-3] / Agate[cm^2]
-        s0 = i_surf / 1.602e-19 / 7.01e9 / 0.505e-2
-        
-        self.dataseries["s0"].append(s0)
-        if rawdata is not None:
-            rawdata.add_data({"s0": s0})
-            self.rawdata[label]["GCD"] = rawdata
-
-        t_line_n, rawdata = pqc.analyse_linewidth_data(
-            pqc.find_most_recent_file(path, "linewidth", whitelist=["n"]),
-            r_sheet=self.dataseries["vdp_n_f"].values[-1],
-            options=options.pushPrefix("lw_n"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["N_linewidth_structure"] = rawdata
-        self.dataseries["t_line_n"].append(t_line_n)
-
-        t_line_pstop2, rawdata = pqc.analyse_linewidth_data(
-            pqc.find_most_recent_file(
-                path, "linewidth", whitelist=["P_stop", "2_wire"]
-            ),
-            r_sheet=self.dataseries["vdp_pstop_f"].values[-1],
-            options=options.pushPrefix("lw_p2"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["P-stop_linewidth_structure_2-wire"] = rawdata
-        self.dataseries["t_line_pstop2"].append(t_line_pstop2)
-
-        t_line_pstop4, rawdata = pqc.analyse_linewidth_data(
-            pqc.find_most_recent_file(
-                path, "linewidth", whitelist=["P_stop", "4_wire"]
-            ),
-            r_sheet=self.dataseries["vdp_pstop_f"].values[-1],
-            options=options.pushPrefix("lw_p4"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["P-stop_linewidth_structure_4-wire"] = rawdata
-        self.dataseries["t_line_pstop4"].append(t_line_pstop4)
-
-        meander_poly, rawdata = pqc.analyse_meander_data(
-            pqc.find_most_recent_file(path, "meander", whitelist=["polysilicon"]),
-            options=options.pushPrefix("meander_poly"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Polysilicon_meander"] = rawdata
-        self.dataseries["meander_poly"].append(meander_poly)
-
-        v_bd, rawdata = pqc.analyse_breakdown_data(
-            pqc.find_most_recent_file(path, "breakdown", whitelist=[]),
-            options=options,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Dielectric_Breakdown_1"] = rawdata
-        self.dataseries["v_bd"].append(v_bd)
-
-        # =================================================== Flute 3 ===================================================
-
-        # we want this for FLute_3 and not Flute_1
-        i600, i300, rawdata = pqc.analyse_iv_data(
-            pqc.find_most_recent_file(path, "iv", whitelist=["3"]),
-            options=options.pushPrefix("IV_DiodeHalf"),
-            config=config,
-        )
-        self.dataseries["i600"].append(i600)
-        self.dataseries["i300"].append(i300)
-        if rawdata is not None:
-            self.rawdata[label]["Diode_IV"] = rawdata
-        v_fd, rho, conc, rawdata = pqc.analyse_cv_data(
-            pqc.find_most_recent_file(path, "cv", whitelist=["3"]),
-            options=options.pushPrefix("CV_DiodeHalf"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Diode_CV"] = rawdata
-        self.dataseries["v_fd"].append(v_fd)
-        self.dataseries["rho"].append(rho)
-        self.dataseries["conc"].append(conc)
-
-        vdp_metclo_f, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path,
-                "van_der_pauw",
-                whitelist=["metal", "clover"],
-                blacklist=["reverse"],
-            ),
-            options=options.pushPrefix("VdP_Metal_fwd"),
-            min_correlation=0.95,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Metal_clover_leaf_Van-der-Pauw"] = rawdata
-        self.dataseries["vdp_metclo_f"].append(vdp_metclo_f)
-
-        vdp_metclo_r, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path,
-                "van_der_pauw",
-                whitelist=["metal", "clover", "reverse"],
-                blacklist=[],
-            ),
-            options=options.pushPrefix("VdP_Metal_rev"),
-            min_correlation=0.95,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Reverse_Metal_clover_leaf_Van-der-Pauw"] = rawdata
-        self.dataseries["vdp_metclo_r"].append(vdp_metclo_r)
-
-        vdp_p_cross_bridge_f, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path,
-                "van_der_pauw",
-                whitelist=["P", "cross_bridge"],
-                blacklist=["reverse"],
-            ),
-            options=options.pushPrefix("VdP_P-edge_fwd"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["P_cross-bridge_Van-der-Pauw"] = rawdata
-        self.dataseries["vdp_p_cross_bridge_f"].append(vdp_p_cross_bridge_f)
-
-        vdp_p_cross_bridge_r, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, "van_der_pauw", whitelist=["P", "cross_bridge", "reverse"]
-            ),
-            options=options.pushPrefix("VdP_P-edge_rev"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Reverse_P_cross-bridge_Van-der-Pauw"] = rawdata
-        self.dataseries["vdp_p_cross_bridge_r"].append(vdp_p_cross_bridge_r)
-
-        t_line_p_cross_bridge, rawdata = pqc.analyse_linewidth_data(
-            pqc.find_most_recent_file(
-                path, "linewidth", whitelist=["P", "cross_bridge"]
-            ),
-            r_sheet=self.dataseries["vdp_p_cross_bridge_f"].values[-1],
-            options=options.pushPrefix("lw_P-edge"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["P_cross-bridge_linewidth"] = rawdata
-        self.dataseries["t_line_p_cross_bridge"].append(t_line_p_cross_bridge)
-
-        vdp_bulk_f, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(
-                path, whitelist=["bulk", "cross"], blacklist=["reverse"]
-            ),
-            options=options.pushPrefix("VdP_bulk_fwd"),
-            min_correlation=0.85,
-            config=config,
-        )
-        self.dataseries["vdp_bulk_f"].append(vdp_bulk_f)
-        if rawdata is not None:
-            self.rawdata[label]["Bulk_cross"] = rawdata
-
-        vdp_bulk_r, rawdata = pqc.analyse_van_der_pauw_data(
-            pqc.find_most_recent_file(path, whitelist=["bulk", "reverse", "cross"]),
-            options=options.pushPrefix("VdP_bulk_rev"),
-            min_correlation=0.85,
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Reverse_bulk_cross"] = rawdata
-        self.dataseries["vdp_bulk_r"].append(vdp_bulk_r)
-
-        bulk_rsheet = (
-            self.dataseries["vdp_bulk_f"].values[-1]
-            + self.dataseries["vdp_bulk_r"].values[-1]
-        ) / 2
-
-        bulk_rho0 = bulk_rsheet * np.log(2.0) * 2.0 * 187e-6 / (2 - np.sqrt(2.0)) * 1e-1
-        self.dataseries["vdp_bulk_rho"].append(bulk_rho0 * config['VDP_bulk_F'])
-        if "Bulk_cross" in self.rawdata[label]:
-            self.rawdata[label]["Bulk_cross"].add_data(
-                {"vdp_bulk_rho": bulk_rho0 * config['VDP_bulk_F']}
-            )
-        if "Reverse_bulk_cross" in self.rawdata[label]:
-            self.rawdata[label]["Reverse_bulk_cross"].add_data(
-                {"vdp_bulk_rho": bulk_rho0 * config['VDP_bulk_F']}
-            )
-
-        meander_metal, rawdata = pqc.analyse_meander_data(
-            pqc.find_most_recent_file(path, "meander", whitelist=["metal"]),
-            options=options.pushPrefix("meander_metal"),
-            config=config,
-        )
-        self.dataseries["meander_metal"].append(meander_metal)
-        if rawdata is not None:
-            self.rawdata[label]["Metal_meander"] = rawdata
-
-        # =================================================== Flute 4 ===================================================
-
-        i_surf05, i_bulk05, rawdata = pqc.analyse_gcd_data(
-            pqc.find_most_recent_file(path, "gcd05", whitelist=[]),
-            options=options.pushPrefix("GCD05"),
-            config=config,
-        )  # for i_bulk
-        self.dataseries["i_surf05"].append(i_surf05)
-        self.dataseries["i_bulk05"].append(i_bulk05)
-        s0_gcd05 = i_surf05 / 1.602e-19 / 7.01e9 / 0.732e-2
-        
-        self.dataseries["s0_gcd05"].append(s0_gcd05)
-        if rawdata is not None:
-            rawdata.add_data({"s0": s0_gcd05})
-            self.rawdata[label]["GCD05"] = rawdata
-
-        r_contact_n, rawdata = pqc.analyse_cbkr_data(
-            pqc.find_most_recent_file(path, "cbkr", whitelist=["n"]),
-            r_sheet=self.dataseries["vdp_n_f"].values[-1],
-            options=options.pushPrefix("cbkr_n"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["N_CBKR"] = rawdata
-        self.dataseries["r_contact_n"].append(r_contact_n)
-
-        r_contact_poly, rawdata = pqc.analyse_cbkr_data(
-            pqc.find_most_recent_file(path, "cbkr", whitelist=["Polysilicon"]),
-            r_sheet=self.dataseries["vdp_poly_f"].values[-1],
-            options=options.pushPrefix("cbkr_poly"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Polysilicon_CBKR"] = rawdata
-        self.dataseries["r_contact_poly"].append(r_contact_poly)
-
-        contact_poly, rawdata = pqc.analyse_contact_data(
-            pqc.find_most_recent_file(
-                path, "contact", whitelist=["chain", "polysilicon"]
-            ),
-            options=options.pushPrefix("contact_chain_poly"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["Polysilicon_contact_chain"] = rawdata
-        self.dataseries["contact_poly"].append(contact_poly)
-
-        contact_p, rawdata = pqc.analyse_contact_data(
-            pqc.find_most_recent_file(path, "contact", whitelist=["chain", "P"]),
-            options=options.pushPrefix("contact_chain_p"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["P_contact_chain"] = rawdata
-        self.dataseries["contact_p"].append(contact_p)
-
-        contact_n, rawdata = pqc.analyse_contact_data(
-            pqc.find_most_recent_file(path, "contact", whitelist=["chain", "N"]),
-            options=options.pushPrefix("contact_chain_n"),
-            config=config,
-        )
-        if rawdata is not None:
-            self.rawdata[label]["N_contact_chain"] = rawdata
-        self.dataseries["contact_n"].append(contact_n)
+        self.structures.analyze(index, self.dataseries, self.rawdata[label], options, config=config, files=files)
 
     def analyze(self, basepath, create_plots=False, force_eval=False, config=None):
         """Analyze and collect results of a batch of samples inside a directory."""
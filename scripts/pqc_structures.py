@@ -0,0 +1,228 @@
+"""Registry of PQC test structures analysed per sample.
+
+The registry declares for each structure how its measurement file is found,
+which analysis function of pqc_analysis_json is applied, which dataseries
+receive the returned values and under which template id the rawdata is
+stored. Derived quantities are calculated from dataseries after all
+structures were analysed. See config/structures.yaml for the format.
+"""
+
+import os
+
+import numpy as np
+import yaml
+
+import pqc_analysis_json as pqc
+
+__all__ = [
+    'Structure',
+    'Derived',
+    'StructureRegistry',
+    'load_structures'
+]
+
+DEFAULT_REGISTRY = 'structures'
+
+Q_E = 1.602e-19  # C
+N_I = 7.01e9  # cm^-3
+
+
+def surface_generation_velocity(i_surf, area):
+    """Return surface generation velocity s0 = i_surf / q / ni[cm^-3] / Agate[cm^2]."""
+    return i_surf / Q_E / N_I / area
+
+
+def bulk_resistivity(r_sheet_f, r_sheet_r, factor=1.):
+    """Return bulk resistivity from forward and reverse bulk cross sheet resistance."""
+    bulk_rsheet = (r_sheet_f + r_sheet_r) / 2
+    bulk_rho0 = bulk_rsheet * np.log(2.0) * 2.0 * 187e-6 / (2 - np.sqrt(2.0)) * 1e-1
+    return bulk_rho0 * factor
+
+
+DERIVED_FUNCTIONS = {
+    'surface_generation_velocity': surface_generation_velocity,
+    'bulk_resistivity': bulk_resistivity,
+}
+
+
+class Structure:
+    """Test structure analysed by an analysis function of pqc_analysis_json."""
+
+    def __init__(self, name, analysis, dataseries, *, test=None, whitelist=None,
+                 blacklist=None, prefix=None, kwargs=None, depends=None):
+        self.name = name
+        self.analysis = analysis
+        self.function = getattr(pqc, analysis, None)
+        if not callable(self.function):
+            raise ValueError(f"No such analysis function: {analysis!r} (structure {name!r})")
+        self.dataseries = list(dataseries)
+        self.test = test
+        self.whitelist = list(whitelist or [])
+        self.blacklist = list(blacklist or [])
+        self.prefix = prefix
+        self.kwargs = dict(kwargs or {})
+        self.depends = dict(depends or {})
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.analysis!r})"
+
+    @property
+    def outputs(self):
+        """Dataseries keys receiving values, skipped positions removed."""
+        return [key for key in self.dataseries if key is not None]
+
+    def find_file(self, path):
+        """Return most recent measurement file of the structure in path (or
+        SampleDirectoryIndex) or None.
+        """
+        return pqc.find_most_recent_file(path, self.test, whitelist=self.whitelist, blacklist=self.blacklist)
+
+    def analyse(self, filename, dataseries, options, config=None):
+        """Return values and rawdata of the analysis of filename.
+
+        Parameters:
+        filename ... measurement file or MeasurementFile, None if not measured
+        dataseries ... dict of PQC_Values providing the dependencies
+        options ... AnalysisOptions of the sample
+        config ... configuration dict passed to the analysis function
+        """
+        kwargs = dict(self.kwargs)
+        for name, key in self.depends.items():
+            kwargs[name] = dataseries[key].values[-1]
+        if self.prefix is not None:
+            options = options.pushPrefix(self.prefix)
+        result = self.function(filename, options=options, config=config, **kwargs)
+        values, rawdata = result[:-1], result[-1]
+        if len(values) != len(self.dataseries):
+            raise ValueError(f"Structure {self.name!r}: {self.analysis} returned {len(values)} values, expected {len(self.dataseries)}")
+        return values, rawdata
+
+
+class Derived:
+    """Quantity derived from dataseries of other structures."""
+
+    def __init__(self, name, function, inputs, *, kwargs=None, config=None, rawdata=None):
+        self.name = name
+        self.function = DERIVED_FUNCTIONS.get(function)
+        if self.function is None:
+            raise ValueError(f"No such derived function: {function!r} (derived {name!r})")
+        self.inputs = list(inputs)
+        self.kwargs = dict(kwargs or {})
+        self.config = dict(config or {})
+        self.rawdata = dict(rawdata or {})
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+    def calculate(self, dataseries, config=None):
+        """Return value calculated from the most recent values of dataseries."""
+        kwargs = dict(self.kwargs)
+        for name, key in self.config.items():
+            kwargs[name] = (config or {})[key]
+        args = [dataseries[key].values[-1] for key in self.inputs]
+        return self.function(*args, **kwargs)
+
+
+class StructureRegistry:
+    """Ordered collection of structures and derived quantities.
+
+    Structures are ordered so that dependencies are analysed first, otherwise
+    the declared order is kept.
+    """
+
+    def __init__(self, structures, derived=None):
+        self.derived = list(derived or [])
+        self.structures = self._resolve(list(structures))
+        outputs = set(self.outputs)
+        for item in self.derived:
+            missing = [key for key in item.inputs if key not in outputs]
+            if missing:
+                raise ValueError(f"Derived {item.name!r} depends on unknown dataseries: {', '.join(missing)}")
+            outputs.add(item.name)
+
+    @staticmethod
+    def _resolve(structures):
+        producers = {}
+        for structure in structures:
+            for key in structure.outputs:
+                if key in producers:
+                    raise ValueError(f"Dataseries {key!r} produced by structures {producers[key].name!r} and {structure.name!r}")
+                producers[key] = structure
+        ordered = []
+        pending = list(structures)
+        while pending:
+            done = set(key for structure in ordered for key in structure.outputs)
+            for structure in pending:
+                for key in structure.depends.values():
+                    if key not in producers:
+                        raise ValueError(f"Structure {structure.name!r} depends on unknown dataseries: {key}")
+                if all(key in done for key in structure.depends.values()):
+                    ordered.append(structure)
+                    pending.remove(structure)
+                    break
+            else:
+                names = ', '.join(structure.name for structure in pending)
+                raise ValueError(f"Circular structure dependencies: {names}")
+        return ordered
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create registry from dict with lists `structures` and `derived`."""
+        structures = []
+        for item in data.get('structures') or []:
+            item = dict(item)
+            structures.append(Structure(item.pop('name'), item.pop('analysis'), item.pop('dataseries'), **item))
+        derived = []
+        for item in data.get('derived') or []:
+            item = dict(item)
+            derived.append(Derived(item.pop('name'), item.pop('function'), item.pop('inputs'), **item))
+        return cls(structures, derived)
+
+    @property
+    def outputs(self):
+        """Dataseries keys of all structures and derived quantities in order."""
+        keys = [key for structure in self.structures for key in structure.outputs]
+        return keys + [item.name for item in self.derived]
+
+    def analyze(self, path, dataseries, rawdata, options, config=None, files=None):
+        """Analyse all structures of a sample directory.
+
+        Parameters:
+        path ... sample directory or SampleDirectoryIndex of the measurement files
+        dataseries ... dict of PQC_Values, one value is appended per output
+        rawdata ... dict of the sample receiving rawdata per template id
+        options ... AnalysisOptions of the sample
+        config ... configuration dict
+        files ... dict of already parsed MeasurementFile by filename
+        """
+        if files is None:
+            files = {}
+        for structure in self.structures:
+            filename = structure.find_file(path)
+            if filename is not None:
+                filename = pqc.MeasurementFile.load(filename, files)
+            values, data = structure.analyse(filename, dataseries, options, config)
+            for key, value in zip(structure.dataseries, values):
+                if key is not None:
+                    dataseries[key].append(value)
+            if data is not None:
+                rawdata[structure.name] = data
+
+        for item in self.derived:
+            value = item.calculate(dataseries, config)
+            dataseries[item.name].append(value)
+            for name, key in item.rawdata.items():
+                if name in rawdata:
+                    rawdata[name].add_data({key: value})
+
+
+def load_structures(config=None):
+    """Load structure registry selected by key `structures` of the
+    configuration from YAML file in directory `config`.
+    """
+    name = (config or {}).get('structures') or DEFAULT_REGISTRY
+    filename = os.path.join(os.path.dirname(__file__), 'config', f'{name}.yaml')
+    if not os.path.isfile(filename):
+        raise ValueError(f"No such structure registry: {name}")
+    with open(filename) as fp:
+        return StructureRegistry.from_dict(yaml.safe_load(fp) or {})
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""Sweep analysis parameters over all measurements of a batch.
+
+Each measurement file of the selected test is loaded once, all combinations
+of the given parameter values are evaluated by the vectorized analysis and
+pass rates and spreads of the extracted values are reported per setting.
+Parameters not swept are taken from the selected configuration.
+
+Synopsis
+
+  python scripts/pqc_sweep.py <batch path> cv -p cut_param=0.004,0.008,0.016 -p max_v=300,500
+  python scripts/pqc_sweep.py <batch path> van_der_pauw -p fit=ols,huber -p min_correlation=0.99,0.999 -w reverse
+
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+
+import numpy as np
+import yaml
+
+import analysis_pqc
+from analysis_pqc.sweep import sweep
+from pqc_analysis_json import AnalysisOptions
+from pqc_analysis_tools import SampleDirectoryIndex, find_all_files_from_path, read_json_file, set_json_cache
+from pqc_json_cache import JSONFileCache
+from pqc_structures import load_structures
+
+
+def cv_area(path, config=None):
+    """Return implant area of a CV measurement, None if not analysed (see analyse_cv_data)."""
+    if "Flute_3" in path:
+        return 6.25e-6  # m^2, half (but without rounded edges)
+    return None
+
+
+def r_sheet(path, config=None):
+    """Return sheet resistance of the Van der Pauw structure the structure
+    registry assigns to a linewidth or CBKR measurement (dependency r_sheet),
+    None if the structure or its Van der Pauw measurement is not found.
+    """
+    registry = load_structures(config)
+    index = SampleDirectoryIndex(os.path.dirname(path))
+    for structure in registry.structures:
+        key = structure.depends.get("r_sheet")
+        if key is None or path not in find_all_files_from_path(index, structure.test, whitelist=structure.whitelist, blacklist=structure.blacklist):
+            continue
+        for source in registry.structures:
+            if key in source.outputs:
+                filename = source.find_file(index)
+                if filename is None:
+                    return None
+                values, _ = source.analyse(filename, {}, AnalysisOptions(), config)
+                return values[source.dataseries.index(key)]
+    return None
+
+
+def abs_x(x, y):
+    return np.abs(x), y
+
+
+def abs_xy(x, y):
+    return np.abs(x), np.abs(y)
+
+
+IV = [("current", "voltage_vsrc")]
+
+# test: analysis function, x and y series (alternatives used in order if the
+# y series is missing), additional series keyword arguments, transformation
+# of x and y, per file keyword arguments f(filename, config) and fixed keyword
+# arguments as in the analyse_*_data functions
+STRUCTURES = {
+    "iv": (analysis_pqc.analyse_iv_many, [("voltage", "current_hvsrc")], None, abs_xy, None, {}),
+    "cv": (analysis_pqc.analyse_cv_many, [("voltage_hvsrc", "capacitance")], None, abs_x, {"area": cv_area}, {"carrier": "holes"}),
+    "mos": (analysis_pqc.analyse_mos_many, [("voltage_hvsrc", "capacitance")], None, None, None, {}),
+    "gcd": (analysis_pqc.analyse_gcd_many, [("voltage", "current_elm")], None, None, None, {"maxreldev": 0.03}),
+    "fet": (analysis_pqc.analyse_fet_many, [("voltage", "current_elm")], None, None, None, {}),
+    "van_der_pauw": (analysis_pqc.analyse_van_der_pauw_many, IV, None, None, None, {"min_correlation": 0.99}),
+    "linewidth": (analysis_pqc.analyse_linewidth_many, IV, None, None, {"r_sheet": r_sheet}, {"cut_param": -1.0, "min_correlation": 0.9}),
+    "cbkr": (analysis_pqc.analyse_cbkr_many, IV, None, None, {"r_sheet": r_sheet}, {"cut_param": 0.01}),
+    "contact": (analysis_pqc.analyse_contact_many, IV, None, None, None, {"cut_param": 0.01, "min_correlation": 0.95}),
+    # the polysilicon resistor uses a voltage source
+    "meander": (analysis_pqc.analyse_meander_many, IV + [("current_elm", "voltage")], None, None, None, {"min_correlation": 0.99}),
+    "breakdown": (analysis_pqc.analyse_breakdown_many, [("voltage", "current_hvsrc")], {"i_elm": "current_elm"}, None, None, {}),
+}
+
+
+def load_configuration(name):
+    """Load configuration from YAML file in directory `config`."""
+    filename = os.path.join(os.path.dirname(__file__), 'config', f'{name}.yaml')
+    if not os.path.isfile(filename):
+        raise ValueError(f"No such configuration: {name}")
+    with open(filename) as fp:
+        return yaml.safe_load(fp)
+
+
+def parse_grid(specs):
+    """Return grid dict from specs like ['cut_param=0.004,0.008', 'fit=ols,huber']."""
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition('=')
+        if not sep or not values:
+            raise ValueError(f"Invalid parameter specification: {spec}")
+        grid[name.strip()] = [yaml.safe_load(value) for value in values.split(',')]
+    return grid
+
+
+def load_curves(path, test, whitelist=None, blacklist=None, config=None):
+    """Return ragged x, y values, offsets, filenames, per file kwargs and
+    ragged additional series of all measurements of test in the batch.
+    """
+    function, keys, series_kwargs, transform, file_kwargs, _ = STRUCTURES[test]
+    dirs = [path] + sorted(d for d in glob.glob(os.path.join(path, "*")) if os.path.isdir(d))
+    xs, ys, filenames = [], [], []
+    kwargs = {name: [] for name in (file_kwargs or {})}
+    extra = {name: [] for name in (series_kwargs or {})}
+    for dirname in dirs:
+        for filename in find_all_files_from_path(dirname, test, whitelist=whitelist, blacklist=blacklist):
+            values = {name: f(filename, config) for name, f in (file_kwargs or {}).items()}
+            if any(value is None for value in values.values()):
+                continue
+            series = read_json_file(filename).get("series", {})
+            for x_key, y_key in keys:
+                x = np.asarray(series.get(x_key, []), dtype=float)
+                y = np.asarray(series.get(y_key, []), dtype=float)
+                if len(y):
+                    break
+            if not len(x) or len(x) != len(y):
+                continue
+            if transform is not None:
+                x, y = transform(x, y)
+            xs.append(x)
+            ys.append(y)
+            filenames.append(filename)
+            for name, value in values.items():
+                kwargs[name].append(value)
+            for name, key in (series_kwargs or {}).items():
+                # NaN values are ignored for measurements without the series
+                value = np.asarray(series.get(key, []), dtype=float)
+                extra[name].append(value if len(value) == len(x) else np.full(len(x), np.nan))
+    offsets = np.concatenate(([0], np.cumsum([len(x) for x in xs]))).astype(int)
+    x = np.concatenate(xs) if xs else np.array([])
+    y = np.concatenate(ys) if ys else np.array([])
+    kwargs = {name: np.asarray(value) for name, value in kwargs.items()}
+    extra = {name: np.concatenate(value) for name, value in extra.items() if value}
+    return x, y, offsets, filenames, kwargs, extra
+
+
+def print_table(table, file=sys.stdout):
+    names = table.dtype.names
+    rows = [[format_value(row[name]) for name in names] for row in table]
+    widths = [max([len(name)] + [len(row[index]) for row in rows]) for index, name in enumerate(names)]
+    print("  ".join(name.rjust(width) for name, width in zip(names, widths)), file=file)
+    for row in rows:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)), file=file)
+
+
+def format_value(value):
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep analysis parameters over all measurements of a batch.")
+    parser.add_argument('path', help='path to the folder of the batch')
+    parser.add_argument('test', choices=sorted(STRUCTURES), help='test to analyse')
+    parser.add_argument('-p', dest='params', metavar='NAME=VALUES', action='append', default=[], help='parameter values to sweep, comma separated (eg. -p cut_param=0.004,0.008)')
+    parser.add_argument('-f', dest='fields', metavar='FIELD', action='append', help='result fields to summarize (default all)')
+    parser.add_argument('-w', dest='whitelist', metavar='TOKEN', action='append', help='only use files with this filename token')
+    parser.add_argument('-b', dest='blacklist', metavar='TOKEN', action='append', help='skip files with this filename token')
+    parser.add_argument('-j', dest='workers', type=int, help='number of worker processes')
+    parser.add_argument('-o', dest='output', metavar='FILE', help='write summary as CSV file')
+    parser.add_argument('-c', '--config', metavar='NAME', default='default', help='select custom configuration')
+    parser.add_argument('--cache-dir', metavar='DIR', help='cache decoded measurement files in binary format in DIR')
+    parser.add_argument('--cache-size', metavar='MB', type=float, default=1024, help='max. size of the cache directory in MB (default 1024)')
+    parser.add_argument('--rebuild-cache', action='store_true', help='decode all measurement files again and rewrite the cache')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if not os.path.isdir(args.path):
+        raise OSError(f"not a directory: {args.path}")
+
+    grid = parse_grid(args.params)
+    if not grid:
+        raise ValueError("No parameters to sweep, use -p NAME=VALUES")
+
+    config = load_configuration(args.config)
+    if args.cache_dir:
+        set_json_cache(JSONFileCache(args.cache_dir, max_bytes=int(args.cache_size * 1024**2), rebuild=args.rebuild_cache))
+    function, _, _, _, _, fixed_kwargs = STRUCTURES[args.test]
+    kwargs = dict(fixed_kwargs)
+    kwargs.update(config.get("analysis_parameters", {}).get(f"analyse_{args.test}") or {})
+    for name in grid:
+        kwargs.pop(name, None)
+
+    x, y, offsets, filenames, file_kwargs, series = load_curves(args.path, args.test, args.whitelist, args.blacklist, config)
+    print(f"{len(filenames)} measurements of test '{args.test}'", file=sys.stderr)
+    if not filenames:
+        return 1
+    kwargs.update(file_kwargs)
+
+    status = 'status'
+    if args.test == 'gcd':
+        # evaluate the default algorithm of analyse_gcd
+        kwargs['methods'] = ['num']
+        status = 'status_num'
+
+    table = sweep(function, x, y, grid, fields=args.fields, status=status, workers=args.workers, offsets=offsets, series=series, **kwargs)
+    print_table(table)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as fp:
+            writer = csv.writer(fp)
+            writer.writerow(table.dtype.names)
+            writer.writerows(table.tolist())
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
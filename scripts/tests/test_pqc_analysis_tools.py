@@ -0,0 +1,113 @@
+import contextlib
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pqc_analysis_tools import MeasurementFile, SampleMetaIndex, get_timestamp
+from pqc_analysis_tools import SampleDirectoryIndex, find_all_files_from_path, find_most_recent_file
+
+
+class MeasurementFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'sample.json')
+        with open(self.filename, 'w') as fp:
+            json.dump({
+                'meta': {'start_timestamp': '2021-01-02T03:04:05', 'sample_name': 'sample'},
+                'series': {'voltage': [0.0, 0.1, 0.2], 'current': [1e-9, 2e-9, 3e-9]}
+            }, fp)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_load(self):
+        cache = {}
+        measurement = MeasurementFile.load(self.filename, cache)
+        self.assertEqual(measurement.filename, self.filename)
+        self.assertEqual(os.fspath(measurement), self.filename)
+        self.assertEqual(measurement.meta['sample_name'], 'sample')
+        np.testing.assert_array_equal(measurement.series['voltage'], [0.0, 0.1, 0.2])
+        self.assertIsInstance(measurement.series['current'], np.ndarray)
+        self.assertEqual(measurement.timestamp, datetime.datetime(2021, 1, 2, 3, 4, 5))
+        self.assertIs(MeasurementFile.load(self.filename, cache), measurement)
+        self.assertIs(MeasurementFile.load(measurement), measurement)
+        self.assertEqual(get_timestamp(self.filename), measurement.timestamp)
+        self.assertEqual(get_timestamp(measurement), measurement.timestamp)
+
+    def test_sample_meta_index(self):
+        index = SampleMetaIndex(self.tempdir.name)
+        self.assertEqual(index.filenames(), [self.filename])
+        self.assertEqual(index.meta(self.filename)['sample_name'], 'sample')
+        self.assertEqual(index.timestamps(), {self.filename: datetime.datetime(2021, 1, 2, 3, 4, 5)})
+        directory = SampleDirectoryIndex(self.tempdir.name)
+        index = SampleMetaIndex(directory)
+        self.assertIs(index.index, directory)
+        self.assertEqual(index.filenames(), directory.filenames)
+        self.assertEqual(index.timestamp(self.filename), datetime.datetime(2021, 1, 2, 3, 4, 5))
+
+
+class SampleDirectoryIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = self.tempdir.name
+        for name in [
+            'S_Flute_1_N_Van-der-Pauw_cross_van-der-pauw_2021-01-01.json',
+            'S_Flute_1_N_Van-der-Pauw_cross_van-der-pauw_2021-01-02.json',
+            'S_Flute_1_Reverse_N_Van-der-Pauw_cross_van-der-pauw_2021-01-01.json',
+            'S_Flute_1_P_stop_Van-der-Pauw_cross_van-der-pauw_2021-01-01.json',
+            'S_Flute_2_N_linewidth_structure_linewidth_2021-01-01.json',
+            '.S_Flute_1_N_hidden_van-der-pauw_2021-01-03.json',
+            'S_Flute_1_N_Van-der-Pauw_cross_van-der-pauw_2021-01-03.txt',
+        ]:
+            open(os.path.join(self.path, name), 'w').close()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def filenames(self, files):
+        return [os.path.basename(filename) for filename in files]
+
+    def test_find(self):
+        index = SampleDirectoryIndex(self.path)
+        self.assertEqual(len(index), 5)
+        for test, whitelist, blacklist in [
+            (None, None, None),
+            ('van_der_pauw', None, None),
+            ('van_der_pauw', ['n', 'Cross'], ['reverse']),
+            ('van_der_pauw', ['P_stop'], []),
+            ('linewidth', ['N'], None),
+            ('Van_der_pauw', None, None),
+            (None, ['flute'], None),
+        ]:
+            files = find_all_files_from_path(index, test, whitelist=whitelist, blacklist=blacklist)
+            self.assertEqual(list(files), list(find_all_files_from_path(self.path, test, whitelist=whitelist, blacklist=blacklist)))
+        self.assertEqual(self.filenames(find_all_files_from_path(index, 'van_der_pauw', whitelist=['n', 'Cross'], blacklist=['reverse'])), [
+            'S_Flute_1_N_Van-der-Pauw_cross_van-der-pauw_2021-01-01.json',
+            'S_Flute_1_N_Van-der-Pauw_cross_van-der-pauw_2021-01-02.json',
+        ])
+        self.assertEqual(len(find_all_files_from_path(index, 'Van_der_pauw')), 0)
+        self.assertEqual(len(find_all_files_from_path(index, pattern='*.txt')), 1)
+        self.assertEqual(len(find_all_files_from_path(os.path.join(self.path, 'missing'))), 0)
+
+    def test_find_most_recent_file(self):
+        index = SampleDirectoryIndex(self.path)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            filename = find_most_recent_file(index, 'van_der_pauw', whitelist=['n'], blacklist=['reverse'])
+        self.assertEqual(os.path.basename(filename), 'S_Flute_1_N_Van-der-Pauw_cross_van-der-pauw_2021-01-02.json')
+        self.assertEqual(output.getvalue(), '')
+        with contextlib.redirect_stdout(output):
+            filename = find_most_recent_file(index, 'van_der_pauw', whitelist=['n'])
+        self.assertIn('Warning: heterogenous naming', output.getvalue())
+        self.assertIsNone(find_most_recent_file(index, 'cv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pqc_analysis_tools import read_json_file, set_json_cache
+from pqc_json_cache import JSONFileCache
+
+
+class JSONFileCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'sample.json')
+        self.cachedir = os.path.join(self.tempdir.name, 'cache')
+        self.write({'voltage': [0.0, 0.1, 0.2], 'index': [1, 2, 3], 'empty': []})
+
+    def tearDown(self):
+        set_json_cache(None)
+        self.tempdir.cleanup()
+
+    def write(self, series):
+        with open(self.filename, 'w') as fp:
+            json.dump({'meta': {'sample_name': 'sample'}, 'series': series}, fp)
+
+    def test_cache(self):
+        cache = JSONFileCache(self.cachedir)
+        set_json_cache(cache)
+        ref = read_json_file(self.filename)
+        data = read_json_file(self.filename)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(data['meta'], ref['meta'])
+        self.assertEqual(sorted(data['series']), sorted(ref['series']))
+        for name, value in ref['series'].items():
+            self.assertEqual(data['series'][name].dtype, value.dtype)
+            np.testing.assert_array_equal(data['series'][name], value)
+        # copy on write, cache is not modified
+        data['series']['voltage'][0] = 42.
+        self.assertEqual(read_json_file(self.filename)['series']['voltage'][0], 0.0)
+
+        # modified source is decoded again
+        self.write({'voltage': [1.0, 2.0]})
+        os.utime(self.filename, ns=(0, 1))
+        np.testing.assert_array_equal(read_json_file(self.filename)['series']['voltage'], [1.0, 2.0])
+
+        rebuild = JSONFileCache(self.cachedir, rebuild=True)
+        self.assertIsNone(rebuild.get(self.filename))
+
+    def test_evict(self):
+        cache = JSONFileCache(self.cachedir, max_bytes=0)
+        cache.set(self.filename, read_json_file(self.filename))
+        self.assertEqual(os.listdir(self.cachedir), [])
+        self.assertIsNone(cache.get(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
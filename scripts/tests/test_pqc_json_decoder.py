@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pqc_json_decoder import decode_measurement, read_json_meta
+
+
+class PQCJSONDecoderTest(unittest.TestCase):
+
+    def assertDecoded(self, text):
+        data = decode_measurement(text, backend='stdlib')
+        ref = json.loads(text)
+        self.assertEqual(sorted(data), sorted(ref))
+        for key, value in ref.items():
+            if key != 'series':
+                self.assertEqual(data[key], value)
+        for name, value in ref.get('series', {}).items():
+            self.assertIsInstance(data['series'][name], np.ndarray)
+            np.testing.assert_array_equal(data['series'][name], np.array(value))
+        return data
+
+    def test_decode(self):
+        data = self.assertDecoded(json.dumps({
+            'meta': {'sample_name': 'sample', 'list': [1, 2], 'series': {'a': 1}},
+            'series': {
+                'voltage': [0.0, -0.1, 2e-3, 1.5E+2, -0],
+                'index': [1, 2, 3],
+                'empty': [],
+                'missing': [1.0, None, 3.0],
+                'nan': [1.0, float('nan')],
+                'names': ['a', 'b'],
+                'nested': [[1, 2], [3, 4]]
+            },
+            'other': None
+        }))
+        self.assertEqual(data['series']['voltage'].dtype, np.float64)
+        self.assertEqual(data['series']['index'].dtype, np.float64)
+        self.assertEqual(data['series']['nested'].shape, (2, 2))
+        self.assertTrue(np.isnan(data['series']['nan'][1]))
+        self.assertDecoded('{ "series" : { "v" : [ 1 ,\n 2 ] , "i":[]} ,"meta":{} }')
+        self.assertDecoded('{"series": {}}')
+        self.assertDecoded('{}')
+        self.assertEqual(decode_measurement(b'{"series": {"v": [1.5]}}')['series']['v'].tolist(), [1.5])
+
+    def test_invalid(self):
+        for text in ['', '{"series": {"v": [1, 2,]}}', '{"series": {"v": [1, 2]}', '{"series": {"v": [1]}} x']:
+            with self.assertRaises(ValueError):
+                decode_measurement(text, backend='stdlib')
+        with self.assertRaises(ValueError):
+            decode_measurement('{}', backend='yaml')
+
+    def test_read_json_meta(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'sample.json')
+            documents = [
+                ({'meta': {'sample_name': 'x' * 1000}, 'series': {'v': list(range(1000))}}, {'sample_name': 'x' * 1000}),
+                ({'series_units': {'v': 'V'}, 'series': {'v': [1, 2]}, 'meta': {'a': 1}}, {'a': 1}),
+                ({'series': {'v': [1, 2]}}, {}),
+                ({}, {}),
+            ]
+            for document, meta in documents:
+                with open(filename, 'w') as fp:
+                    json.dump(document, fp, indent=2)
+                self.assertEqual(read_json_meta(filename, chunksize=16), meta)
+            with open(filename, 'w') as fp:
+                fp.write('{"meta": {"a": 1')
+            with self.assertRaises(ValueError):
+                read_json_meta(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
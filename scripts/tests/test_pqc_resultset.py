@@ -0,0 +1,158 @@
+import contextlib
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import yaml
+
+import pqc_analysis_json as pqc
+import pqc_analysis_tools
+from pqc_analysis_json import AnalysisOptions
+from pqc_resultset import PQC_resultset
+
+SAMPLE = 'HPK_VPX1_001_2-S_HM_WR'
+
+# prefixes pushed by the hard-coded analyze_sample sequence
+PREFIXES = [
+    'VdP_poly_fwd', 'VdP_poly_rev', 'VdP_N_fwd', 'VdP_N_rev', 'VdP_P-Stop_fwd',
+    'VdP_P-Stop_rev', 'GCD', 'lw_n', 'lw_p2', 'lw_p4', 'meander_poly',
+    'IV_DiodeHalf', 'CV_DiodeHalf', 'VdP_Metal_fwd', 'VdP_Metal_rev',
+    'VdP_P-edge_fwd', 'VdP_P-edge_rev', 'lw_P-edge', 'VdP_bulk_fwd',
+    'VdP_bulk_rev', 'meander_metal', 'GCD05', 'cbkr_n', 'cbkr_poly',
+    'contact_chain_poly', 'contact_chain_p', 'contact_chain_n',
+]
+
+
+def write_measurement(path, name, measurement_name, flute, day, series):
+    filename = os.path.join(path, f'{SAMPLE}_PQCFlutesLeft_{name}_2021-01-{day:02d}T00-00-00.json')
+    meta = {
+        'sample_name': SAMPLE,
+        'measurement_name': measurement_name,
+        'measurement_type': 'iv',
+        'contact_name': f'Flute {flute}',
+        'start_timestamp': f'2021-01-{day:02d}T00:00:00',
+        'operator': 'operator',
+        'waiting_time': '1 s',
+    }
+    n = len(next(iter(series.values())))
+    series = dict(series, temperature_box=[20.] * n, temperature_chuck=[20.] * n, humidity_box=[30.] * n)
+    with open(filename, 'w') as fp:
+        json.dump({'meta': meta, 'series': {key: list(value) for key, value in series.items()}}, fp)
+
+
+class PQCResultsetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, SAMPLE)
+        os.makedirs(self.path)
+        rng = np.random.default_rng(0)
+        i = np.linspace(-1e-5, 1e-5, 21)
+        for name, measurement_name, flute, day, r in [
+            ('Flute_1_Polysilicon_Van-der-Pauw_cross_van-der-pauw', 'Polysilicon Van-der-Pauw cross', 1, 1, 400.),
+            ('Flute_1_n_Van-der-Pauw_cross_van-der-pauw', 'N+ Van-der-Pauw cross', 1, 2, 8.),
+            ('Flute_1_Reverse_n_Van-der-Pauw_cross_van-der-pauw', 'Reverse N+ Van-der-Pauw cross', 1, 3, 8.5),
+            ('Flute_1_P-stop_Van-der-Pauw_cross_van-der-pauw', 'P-stop Van-der-Pauw cross', 1, 4, 4000.),
+            ('Flute_2_n_linewidth_structure_linewidth', 'N+ linewidth structure', 2, 1, 300.),
+            ('Flute_2_polysilicon_meander_meander', 'Polysilicon meander', 2, 1, 1e3),
+            ('Flute_3_bulk_cross_van-der-pauw', 'Bulk cross', 3, 5, 0.2),
+            ('Flute_3_reverse_bulk_cross_van-der-pauw', 'Reverse bulk cross', 3, 6, 0.21),
+            ('Flute_4_n_CBKR_cbkr', 'N+ CBKR', 4, 1, 5.),
+        ]:
+            v = i * r + rng.normal(0, 1e-8 * r, len(i))
+            write_measurement(self.path, name, measurement_name, flute, day, {'current': i, 'voltage_vsrc': v})
+        v = np.linspace(-10, 10, 81)
+        i_elm = 1e-12 * (5 - 4 / (1 + np.exp(-(v + 4) * 3)) + 7 / (1 + np.exp(-(v - 4) * 2)))
+        write_measurement(self.path, 'Flute_2_GCD_gcd', 'GCD', 2, 1, {'voltage': v, 'current_elm': i_elm})
+        with open(os.path.join(os.path.dirname(__file__), '..', 'config', 'default.yaml')) as fp:
+            self.config = yaml.safe_load(fp)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def find(self, test, whitelist, blacklist=None):
+        return pqc.find_most_recent_file(self.path, test, whitelist=whitelist, blacklist=blacklist)
+
+    def expected(self):
+        """Return values of the measured structures as analysed by the former
+        hard-coded analyze_sample sequence.
+        """
+        config = self.config
+        vdp_n_f = pqc.analyse_van_der_pauw_data(self.find('van_der_pauw', ['n', 'cross'], ['reverse']), config=config)[0]
+        vdp_bulk_f = pqc.analyse_van_der_pauw_data(self.find(None, ['bulk', 'cross'], ['reverse']), config=config)[0]
+        vdp_bulk_r = pqc.analyse_van_der_pauw_data(self.find(None, ['bulk', 'reverse', 'cross']), config=config)[0]
+        i_surf = pqc.analyse_gcd_data(self.find('gcd', []), config=config)[0]
+        bulk_rsheet = (vdp_bulk_f + vdp_bulk_r) / 2
+        bulk_rho0 = bulk_rsheet * np.log(2.0) * 2.0 * 187e-6 / (2 - np.sqrt(2.0)) * 1e-1
+        return {
+            'vdp_poly_f': pqc.analyse_van_der_pauw_data(self.find('van_der_pauw', ['Polysilicon', 'cross'], ['reverse']), config=config)[0],
+            'vdp_n_f': vdp_n_f,
+            'vdp_n_r': pqc.analyse_van_der_pauw_data(self.find('van_der_pauw', ['n', 'reverse', 'cross']), config=config)[0],
+            'vdp_pstop_f': pqc.analyse_van_der_pauw_data(self.find('van_der_pauw', ['P_stop', 'cross'], ['reverse']), config=config)[0],
+            'i_surf': i_surf,
+            's0': i_surf / 1.602e-19 / 7.01e9 / 0.505e-2,
+            't_line_n': pqc.analyse_linewidth_data(self.find('linewidth', ['n']), r_sheet=vdp_n_f, config=config)[0],
+            'meander_poly': pqc.analyse_meander_data(self.find('meander', ['polysilicon']), config=config)[0],
+            'vdp_bulk_f': vdp_bulk_f,
+            'vdp_bulk_r': vdp_bulk_r,
+            'vdp_bulk_rho': bulk_rho0 * config['VDP_bulk_F'],
+            'r_contact_n': pqc.analyse_cbkr_data(self.find('cbkr', ['n']), r_sheet=vdp_n_f, config=config)[0],
+        }
+
+    def test_analyze_sample(self):
+        resultset = PQC_resultset('batch')
+        prefixes = []
+        push_prefix = AnalysisOptions.pushPrefix
+
+        def record(options, prefix):
+            prefixes.append(prefix)
+            return push_prefix(options, prefix)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            with mock.patch.object(AnalysisOptions, 'pushPrefix', record), \
+                    mock.patch('pqc_analysis_tools.read_json_meta', wraps=pqc_analysis_tools.read_json_meta) as read_json_meta:
+                resultset.analyze_sample(self.path, config=self.config)
+            expected = self.expected()
+
+        self.assertEqual(prefixes, PREFIXES)
+        self.assertEqual(resultset.labels, [SAMPLE])
+        # timestamp of the last Van der Pauw measurement sorted by filename
+        self.assertEqual(resultset.timestamps, [datetime.datetime(2021, 1, 6)])
+        # read from the file header only
+        read_json_meta.assert_called_once_with(self.find(None, ['bulk', 'reverse', 'cross']))
+
+        series = {key: value for key, value in resultset.dataseries.items() if not key.startswith('x')}
+        self.assertEqual(set(series), set(resultset.structures.outputs))
+        for key, value in series.items():
+            self.assertEqual(len(value.values), 1, key)
+        for key, value in expected.items():
+            self.assertTrue(np.isfinite(value), key)
+            self.assertAlmostEqual(series[key].values[0], value, msg=key)
+        for key in set(series) - set(expected):
+            self.assertFalse(np.isfinite(series[key].values[0]), key)
+
+        rawdata = resultset.rawdata[SAMPLE]
+        self.assertEqual(set(rawdata), {
+            'Polysilicon_Van-der-Pauw_cross',
+            'N_Van-der-Pauw_cross',
+            'Reverse_N_Van-der-Pauw_cross',
+            'P-stop_Van-der-Pauw_cross',
+            'GCD',
+            'N_linewidth_structure',
+            'Polysilicon_meander',
+            'Bulk_cross',
+            'Reverse_bulk_cross',
+            'N_CBKR',
+        })
+        self.assertAlmostEqual(rawdata['GCD'].data['s0'], expected['s0'])
+        self.assertAlmostEqual(rawdata['Bulk_cross'].data['vdp_bulk_rho'], expected['vdp_bulk_rho'])
+        self.assertAlmostEqual(rawdata['Reverse_bulk_cross'].data['vdp_bulk_rho'], expected['vdp_bulk_rho'])
+
+
+if __name__ == '__main__':
+    unittest.main()
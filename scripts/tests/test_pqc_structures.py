@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from pqc_structures import StructureRegistry, load_structures
+from pqc_structures import bulk_resistivity, surface_generation_velocity
+
+
+class PQCStructuresTest(unittest.TestCase):
+
+    def test_default_registry(self):
+        registry = load_structures()
+        names = [structure.name for structure in registry.structures]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn('N_Van-der-Pauw_cross', names)
+        self.assertIn('vdp_bulk_rho', registry.outputs)
+        # dependencies are analysed first
+        outputs = []
+        for structure in registry.structures:
+            for key in structure.depends.values():
+                self.assertIn(key, outputs)
+            outputs.extend(structure.outputs)
+        self.assertEqual(load_structures({'structures': None}).outputs, registry.outputs)
+        with self.assertRaises(ValueError):
+            load_structures({'structures': 'no_such_registry'})
+
+    def test_registry_order(self):
+        registry = StructureRegistry.from_dict({'structures': [
+            {'name': 'lw', 'analysis': 'analyse_linewidth_data', 'dataseries': ['t_line'], 'depends': {'r_sheet': 'r'}},
+            {'name': 'vdp', 'analysis': 'analyse_van_der_pauw_data', 'dataseries': ['r']},
+        ]})
+        self.assertEqual([structure.name for structure in registry.structures], ['vdp', 'lw'])
+        self.assertEqual(registry.outputs, ['r', 't_line'])
+
+    def test_registry_errors(self):
+        with self.assertRaises(ValueError):
+            StructureRegistry.from_dict({'structures': [
+                {'name': 'x', 'analysis': 'analyse_nothing_data', 'dataseries': ['x']},
+            ]})
+        with self.assertRaises(ValueError):
+            StructureRegistry.from_dict({'structures': [
+                {'name': 'lw', 'analysis': 'analyse_linewidth_data', 'dataseries': ['t_line'], 'depends': {'r_sheet': 'r'}},
+            ]})
+        with self.assertRaises(ValueError):
+            StructureRegistry.from_dict({'structures': [
+                {'name': 'a', 'analysis': 'analyse_linewidth_data', 'dataseries': ['a'], 'depends': {'r_sheet': 'b'}},
+                {'name': 'b', 'analysis': 'analyse_linewidth_data', 'dataseries': ['b'], 'depends': {'r_sheet': 'a'}},
+            ]})
+        with self.assertRaises(ValueError):
+            StructureRegistry.from_dict({'derived': [
+                {'name': 's0', 'function': 'surface_generation_velocity', 'inputs': ['i_surf']},
+            ]})
+
+    def test_derived(self):
+        self.assertAlmostEqual(surface_generation_velocity(1e-12, 0.505e-2), 1e-12 / 1.602e-19 / 7.01e9 / 0.505e-2)
+        rho = bulk_resistivity(1., 3., factor=2.)
+        self.assertAlmostEqual(rho, 2. * np.log(2.) * 2. * 187e-6 / (2 - np.sqrt(2.)) * 1e-1 * 2.)
+
+
+if __name__ == '__main__':
+    unittest.main()
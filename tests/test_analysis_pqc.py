@@ -1,4 +1,9 @@
+import concurrent.futures
+import subprocess
+import sys
 import unittest
+import warnings
+
 import numpy as np
 
 import analysis_pqc
@@ -13,30 +18,286 @@ class AnalysisPQCTest(unittest.TestCase):
         self.assertEqual(analysis_pqc.STATUS_PASSED, "passed")
         self.assertEqual(analysis_pqc.STATUS_FAILED, "failed")
 
+    def test_lazy_scipy_import(self):
+        code = "import sys, analysis_pqc; print(any(name.split('.')[0] == 'scipy' for name in sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+    def test_params(self):
+        r1 = analysis_pqc.analyse_iv(x, y)
+        r2 = analysis_pqc.analyse_iv(x, y)
+        self.assertIs(type(r1), type(r2))
+        self.assertIs(type(r1), analysis_pqc.analyse_iv.result_type)
+        self.assertEqual(analysis_pqc.analyse_iv.__name__, 'analyse_iv')
+
+    def test_to_records(self):
+        results = [analysis_pqc.analyse_van_der_pauw(x, y * k) for k in (1, 2)]
+        r = analysis_pqc.to_records(results)
+        self.assertEqual(r.dtype.names, results[0]._fields)
+        self.assertEqual(r.dtype['x_fit'], object)
+        np.testing.assert_equal(r['r_sheet'], [results[0].r_sheet, results[1].r_sheet])
+        self.assertEqual(list(r['status']), [analysis_pqc.STATUS_PASSED] * 2)
+
     def test_line_regr_with_cuts(self):
         r = analysis_pqc.line_regr_with_cuts(x, y, cut_param=-.4)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
 
+    def test_line_regr_with_cuts_many(self):
+        rng = np.random.default_rng(42)
+        i = np.tile(np.linspace(-1e-5, 1e-5, 21), (4, 1))
+        v = i * [[10.], [200.], [3e3], [-5.]] + rng.normal(0, 1e-6, i.shape)
+        v[3] = 1e-3
+        r = analysis_pqc.line_regr_with_cuts_many(i, v, cut_param=1e-5)
+        for k in range(len(v)):
+            ref = analysis_pqc.line_regr_with_cuts(i[k], v[k], cut_param=1e-5)
+            self.assertEqual(r['status'][k], ref.status)
+            np.testing.assert_allclose([r['a'][k], r['b'][k], r['r_value'][k]], [ref.a, ref.b, ref.r_value], rtol=1e-9, atol=1e-12)
+        # ragged values
+        r = analysis_pqc.line_regr_with_cuts_many(np.append(x, x[:5]), np.append(y, y[:5]), cut_param=-.4, offsets=[0, 8, 13])
+        self.assertEqual(list(r['status']), [analysis_pqc.STATUS_PASSED] * 2)
+        self.assertAlmostEqual(r['a'][1], analysis_pqc.line_regr_with_cuts(x[:5], y[:5], cut_param=-.4).a)
+
+    def test_spline_dev(self):
+        from scipy.interpolate import CubicSpline
+        rng = np.random.default_rng(2)
+        for n in (2, 3, 4, 9, 120):
+            y = rng.normal(size=(3, n))
+            x_norm = np.arange(n)
+            ref = CubicSpline(x_norm, y, axis=1)(x_norm, 1)
+            np.testing.assert_allclose(analysis_pqc.spline_dev(y), ref, atol=1e-12)
+            np.testing.assert_allclose(analysis_pqc.spline_dev(y[0]), ref[0], atol=1e-12)
+        self.assertIs(analysis_pqc.derivative_operator(9), analysis_pqc.derivative_operator(9))
+        with self.assertRaises(ValueError):
+            analysis_pqc.spline_dev([1., np.nan, 2.])
+        with self.assertRaises(ValueError):
+            analysis_pqc.spline_dev([1.])
+
+    def test_derivative_operator(self):
+        operator = analysis_pqc.derivative_operator(1000)
+        self.assertEqual(operator.shape, (3, 1000))
+        self.assertFalse(operator.flags.writeable)
+        y = np.random.default_rng(3).normal(size=(5, 1000))
+        batch = analysis_pqc.solve_derivative(y)
+        for row in range(len(y)):
+            np.testing.assert_array_equal(analysis_pqc.solve_derivative(y[row]), batch[row])
+        lengths = np.array([1000, 600, 3, 2, 1])
+        spl_dev = analysis_pqc.spline_dev_many(y, lengths)
+        for row, length in enumerate(lengths[:-1]):
+            np.testing.assert_array_equal(spl_dev[row, :length], analysis_pqc.spline_dev(y[row, :length]))
+        self.assertTrue(np.isnan(spl_dev[-1]).all())
+
+    def test_chebyshev_grid(self):
+        v = np.linspace(-15, 15, 121)
+        i = np.stack([np.tanh(v - 3) * 1e-11, np.exp(v / 10) * 1e-12], axis=1)
+        grid = analysis_pqc.chebyshev_grid(v, 10)
+        self.assertIs(grid, analysis_pqc.chebyshev_grid(v.copy(), 10))
+        coef = grid.fit(i)
+        for k in range(i.shape[1]):
+            polynomial = np.poly1d(np.polyfit(v, i[:, k], 10))
+            for deriv in range(3):
+                ref = polynomial.deriv(deriv)(v) if deriv else polynomial(v)
+                np.testing.assert_allclose(grid.evaluate(coef, deriv)[:, k], ref, rtol=1e-8, atol=1e-8 * np.abs(ref).max())
+
+    def test_line_fit(self):
+        a, b, r_value = analysis_pqc.line_fit(x, 2 * x + 1)
+        self.assertAlmostEqual(a, 2)
+        self.assertAlmostEqual(b, 1)
+        self.assertAlmostEqual(r_value, 1)
+        self.assertIsNone(analysis_pqc.line_fit([1.], [1.]))
+        self.assertIsNone(analysis_pqc.line_fit([1., 1.], [1., 2.]))
+        self.assertIsNone(analysis_pqc.line_fit([1., np.nan], [1., 2.]))
+
+    def test_robust_fit(self):
+        from scipy.stats import theilslopes
+        rng = np.random.default_rng(4)
+        i = np.tile(np.linspace(1e-6, 1e-5, 30), (3, 1))
+        v = 2e3 * i + rng.normal(0, 1e-5, i.shape)
+        v[:, 7] += 1e-2
+        mask = analysis_pqc.valid_mask([30, 30, 20], 30)
+        a, b, r_value, ok = analysis_pqc.theil_sen_many(i, v, mask)
+        self.assertAlmostEqual(a[2], theilslopes(v[2, :20], i[2, :20])[0])
+        a, b, r_value, ok = analysis_pqc.huber_many(i, v, mask)
+        np.testing.assert_allclose(a, 2e3, rtol=1e-2)
+        self.assertTrue((r_value > .99).all())
+        self.assertLess(analysis_pqc.linregress_many(i, v, mask)[2][0], .99)
+        for fit in analysis_pqc.FIT_METHODS:
+            r = analysis_pqc.analyse_van_der_pauw_many(i, v, cut_param=-1, fit=fit)
+            for k in range(len(i)):
+                ref = analysis_pqc.analyse_van_der_pauw(i[k], v[k], cut_param=-1, fit=fit)
+                np.testing.assert_allclose(r['r_sheet'][k], ref.r_sheet, rtol=1e-9)
+                np.testing.assert_allclose(r['r_value'][k], ref.r_value, rtol=1e-9)
+        with self.assertRaises(ValueError):
+            analysis_pqc.line_fit(x, y, fit='lad')
+
+    def test_thread_pool(self):
+        rng = np.random.default_rng(3)
+        v = np.linspace(0, 600, 121)
+        curves = [1e-11 / np.sqrt(np.clip(v, 5, v_fd) / v_fd) * (1 + rng.normal(0, 1e-3, v.shape)) for v_fd in np.linspace(50, 550, 24)]
+        calls = [(analysis_pqc.analyse_cv, v, c) for c in curves]
+        calls += [(analysis_pqc.analyse_mos, v, c) for c in curves]
+        calls += [(analysis_pqc.analyse_van_der_pauw, v, c) for c in curves]
+        calls += [(analysis_pqc.line_regr_with_cuts, x, y, -1)]
+        filters = list(warnings.filters)
+        serial = [f(*args) for f, *args in calls]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            threaded = list(executor.map(lambda call: call[0](*call[1:]), calls))
+        self.assertEqual(warnings.filters, filters)
+        for r1, r2 in zip(serial, threaded):
+            self.assertEqual(r1.status, r2.status)
+            for value1, value2 in zip(r1, r2):
+                np.testing.assert_array_equal(value1, value2)
+
     def test_analyse_iv(self):
         r = analysis_pqc.analyse_iv(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
 
+    def test_analyse_iv_many(self):
+        v = np.array([[0., 300., 600., 800.], [0., -300., -600., -700.]])
+        i = np.array([[0., 1., 2., 3.], [0., -4., -5., -6.]])
+        r = analysis_pqc.analyse_iv_many(v, i)
+        for k in range(len(v)):
+            ref = analysis_pqc.analyse_iv(v[k], i[k])
+            self.assertEqual(r['status'][k], ref.status)
+            np.testing.assert_equal([r[name][k] for name in ref._fields[:-1]], ref[:-1])
+        # ragged values
+        r = analysis_pqc.analyse_iv_many(np.append(v[0], v[1][:3]), np.append(i[0], i[1][:3]), offsets=[0, 4, 7])
+        self.assertEqual(list(r['status']), [analysis_pqc.STATUS_PASSED] * 2)
+        np.testing.assert_equal(r['v_max'], [800., -600.])
+        np.testing.assert_equal(r['i_600'], [2., -5.])
+        np.testing.assert_equal(r['i_800'], [3., np.nan])
+
     def test_analyse_cv(self):
         r = analysis_pqc.analyse_cv(x, y, cut_param=-.005)
         self.assertEqual(r.status, analysis_pqc.STATUS_FAILED)
 
+    def test_analyse_cv_many(self):
+        rng = np.random.default_rng(1)
+        v = np.tile(np.linspace(0, 600, 121), (4, 1))
+        v_fd = np.array([[150.], [250.], [350.], [450.]])
+        c = 1e-11 / np.sqrt(np.clip(v, 5, v_fd) / v_fd) * (1 + rng.normal(0, 1e-3, v.shape))
+        r = analysis_pqc.analyse_cv_many(v, c, area=6.25e-6, carrier='holes')
+        for k in range(len(v)):
+            ref = analysis_pqc.analyse_cv(v[k], c[k], area=6.25e-6, carrier='holes')
+            self.assertEqual(r['status'][k], ref.status)
+            for name in ('v_dep1', 'v_dep2', 'rho', 'conc', 'a_rise', 'b_rise', 'a_const', 'b_const'):
+                np.testing.assert_allclose(r[name][k], getattr(ref, name), rtol=1e-9)
+        self.assertIn(analysis_pqc.STATUS_PASSED, r['status'])
+        r = analysis_pqc.analyse_cv_many([x], [y], cut_param=-.005)
+        self.assertEqual(r['status'][0], analysis_pqc.STATUS_FAILED)
+
+    def test_breakpoint_split(self):
+        x = np.tile(np.arange(20.), (2, 1))
+        y = np.where(x < 12, 2 * x, 30.)
+        y[1] = np.where(x[1] < 5, -x[1], -8.)
+        split, ok = analysis_pqc.breakpoint_split(x, y, 0, 20)
+        self.assertEqual(list(split), [12, 5])
+        self.assertTrue(ok.all())
+        split, ok = analysis_pqc.breakpoint_split(x, y, 0, 5)
+        self.assertEqual(list(ok), [False, False])
+
+    def test_analyse_cv_breakpoint(self):
+        rng = np.random.default_rng(5)
+        v = np.tile(np.linspace(0, 600, 121), (3, 1))
+        v_fd = np.array([[150.], [250.], [350.]])
+        inv_c2 = np.where(v < v_fd, np.clip(v, 5, None) / v_fd, 1 + 1e-3 * (v - v_fd)) * 1e22
+        c = (1 + rng.normal(0, 1e-4, v.shape)) / np.sqrt(inv_c2)
+        r = analysis_pqc.analyse_cv_many(v, c, area=6.25e-6, carrier='holes', method='breakpoint')
+        np.testing.assert_allclose(r['v_dep2'], v_fd[:, 0], rtol=.02)
+        for k in range(len(v)):
+            ref = analysis_pqc.analyse_cv(v[k], c[k], area=6.25e-6, carrier='holes', method='breakpoint')
+            self.assertEqual(r['status'][k], ref.status)
+            for name in ('v_dep1', 'v_dep2', 'rho', 'a_rise', 'a_const'):
+                np.testing.assert_allclose(r[name][k], getattr(ref, name), rtol=1e-9)
+        with self.assertRaises(ValueError):
+            analysis_pqc.analyse_cv(x, y, method='spline')
+
     def test_analyse_mos(self):
         r = analysis_pqc.analyse_mos(x, y, cut_param=-1)
         self.assertEqual(r.status, analysis_pqc.STATUS_FAILED)
 
+    def test_analyse_mos_many(self):
+        v = np.tile(np.linspace(-5, 10, 151), (3, 1))
+        v_fb = np.array([[1.], [2.5], [4.]])
+        c = 1e-11 + 7e-11 / (1 + np.exp(-(v - v_fb) * 2.))
+        r = analysis_pqc.analyse_mos_many(v, c)
+        for k in range(len(v)):
+            ref = analysis_pqc.analyse_mos(v[k], c[k])
+            self.assertEqual(r['status'][k], ref.status)
+            for name in ('v_fb1', 'v_fb2', 't_ox', 'n_ox', 'a_acc', 'b_dep', 'a_inv'):
+                np.testing.assert_allclose(r[name][k], getattr(ref, name), rtol=1e-9)
+            np.testing.assert_allclose(r['c_acc'][k], np.mean(ref.c_acc), rtol=1e-9)
+            np.testing.assert_allclose(r['c_inv'][k], np.mean(ref.c_inv), rtol=1e-9)
+        r = analysis_pqc.analyse_mos_many([x], [y], cut_param=-1)
+        self.assertEqual(r['status'][0], analysis_pqc.STATUS_FAILED)
+
+    def test_segments_fit(self):
+        x = np.tile(np.linspace(0, 10, 41), (2, 1))
+        t = np.array([[3.1], [5.2]])
+        y = np.where(x < t, 1., np.where(x < t + 2, 1 + 2 * (x - t), 5. + .1 * (x - t - 2)))
+        t1, t2, a, b, r_value, ok = analysis_pqc.segments_fit(x[:, ::-1], y[:, ::-1], [41, 41])
+        self.assertTrue(ok.all())
+        np.testing.assert_allclose(t1, t[:, 0], atol=1e-3)
+        np.testing.assert_allclose(t2, t[:, 0] + 2, atol=1e-3)
+        np.testing.assert_allclose(a, [[0, 0], [2, 2], [.1, .1]], atol=1e-2)
+        np.testing.assert_allclose(r_value, 1., rtol=1e-6)
+        t1, t2, a, b, r_value, ok = analysis_pqc.segments_fit(x, y, [5, 41], min_points=3)
+        self.assertEqual(list(ok), [False, True])
+
+    def test_analyse_mos_segments(self):
+        v = np.tile(np.linspace(-5, 10, 151), (3, 1))
+        v_fb = np.array([[1.], [2.5], [4.]])
+        rng = np.random.default_rng(1)
+        c = np.clip((v - v_fb + 3) / 3, 0, 1) * 7e-11 + 1e-11 + rng.normal(0, 1e-14, v.shape)
+        r = analysis_pqc.analyse_mos_many(v, c, method='segments')
+        np.testing.assert_allclose(r['v_fb2'], v_fb[:, 0], atol=.01)
+        for k in range(len(v)):
+            ref = analysis_pqc.analyse_mos(v[k], c[k], method='segments')
+            self.assertEqual(ref.status, analysis_pqc.STATUS_PASSED)
+            self.assertEqual(r['status'][k], ref.status)
+            for name in ('v_fb1', 'v_fb2', 't_ox', 'n_ox', 'a_acc', 'b_dep', 'a_inv'):
+                np.testing.assert_allclose(r[name][k], getattr(ref, name), rtol=1e-9)
+            np.testing.assert_allclose(r['c_acc'][k], np.mean(ref.c_acc), rtol=1e-9)
+        with self.assertRaises(ValueError):
+            analysis_pqc.analyse_mos(x, y, method='spline')
+
     def test_analyse_gcd(self):
         r = analysis_pqc.analyse_gcd(x, y, cut_param=-1)
         self.assertEqual(r.status, analysis_pqc.STATUS_FAILED)
 
+    def test_analyse_gcd_many(self):
+        v = np.tile(np.linspace(-15, 15, 61), (3, 1))
+        i = -1e-11 - 5e-12 * (v < np.array([[-4.], [-3.], [-2.]])) - 8e-12 * (v > 3)
+        r = analysis_pqc.analyse_gcd_many(v, i, consensus_tol=.1)
+        for k in range(len(v)):
+            for method in analysis_pqc.GCD_METHODS:
+                ref = getattr(analysis_pqc, 'analyse_gcd_' + method)(v[k], i[k])
+                self.assertEqual(r['status_' + method][k], ref.status)
+                np.testing.assert_allclose(r['i_surf_' + method][k], ref.i_surf, rtol=1e-6)
+                np.testing.assert_allclose(r['i_bulk_' + method][k], ref.i_bulk, rtol=1e-6)
+        self.assertEqual(r.dtype['consensus'], bool)
+        r = analysis_pqc.analyse_gcd_many(np.concatenate([x, x[:6]]), np.concatenate([y, y[:6]]), methods=['num'], offsets=[0, 8, 14])
+        self.assertEqual(r.dtype.names, ('i_surf_num', 'i_bulk_num', 'status_num'))
+        ref = analysis_pqc.analyse_gcd_num(x[:6], y[:6])
+        self.assertEqual(r['status_num'][1], ref.status)
+        with self.assertRaises(ValueError):
+            analysis_pqc.analyse_gcd_many([x], [y], methods=['spline'])
+
     def test_analyse_fet(self):
         r = analysis_pqc.analyse_fet(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
 
+    def test_analyse_fet_many(self):
+        rng = np.random.default_rng(4)
+        v = np.linspace(-5, 10, 40)
+        curves = [1e-6 * np.log1p(np.exp((v - v_th) * 2)) + rng.normal(0, 1e-9, v.shape) for v_th in (1, 2, 3)]
+        curves.append(np.full(v.shape, 1e-9))
+        r = analysis_pqc.analyse_fet_many(np.tile(v, (4, 1)), curves)
+        r_ragged = analysis_pqc.analyse_fet_many(np.concatenate([v, x]), np.concatenate([curves[0], y]), offsets=[0, 40, 48])
+        for got, (v_k, i_k) in zip(list(r) + list(r_ragged), [(v, c) for c in curves] + [(v, curves[0]), (x, y)]):
+            ref = analysis_pqc.analyse_fet(v_k, i_k)
+            self.assertEqual(got['status'], ref.status)
+            np.testing.assert_array_equal([got['v_th'], got['a'], got['b']], [ref.v_th, ref.a, ref.b])
+
     def test_analyse_van_der_pauw(self):
         r = analysis_pqc.analyse_van_der_pauw(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
@@ -45,6 +306,12 @@ class AnalysisPQCTest(unittest.TestCase):
         r = analysis_pqc.analyse_cross(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
 
+    def test_analyse_van_der_pauw_many(self):
+        r = analysis_pqc.analyse_van_der_pauw_many([x, x], [y, 2 * y])
+        ref = analysis_pqc.analyse_van_der_pauw(x, 2 * y)
+        self.assertEqual(r['status'][1], ref.status)
+        self.assertAlmostEqual(r['r_sheet'][1], ref.r_sheet)
+
     def test_analyse_linewidth(self):
         r = analysis_pqc.analyse_linewidth(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
@@ -55,6 +322,16 @@ class AnalysisPQCTest(unittest.TestCase):
         r = analysis_pqc.analyse_cbkr(x, y, r_sheet=1, cut_param=1e-5)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
 
+    def test_analyse_cbkr_many(self):
+        r = analysis_pqc.analyse_cbkr_many([x, x], [y, y], r_sheet=[-1, 1], cut_param=1e-5)
+        ref = analysis_pqc.analyse_cbkr(x, y, r_sheet=1, cut_param=1e-5)
+        self.assertEqual(r['r_contact'][0], -1)
+        self.assertAlmostEqual(r['r_contact'][1], ref.r_contact)
+        r = analysis_pqc.analyse_linewidth_many([x], [y], r_sheet=1, min_correlation=1.)
+        self.assertTrue(np.isnan(r['t_line'][0]))
+        r = analysis_pqc.analyse_meander_many([x], [y])
+        self.assertAlmostEqual(r['r'][0], analysis_pqc.analyse_meander(x, y).r)
+
     def test_analyse_contact(self):
         r = analysis_pqc.analyse_contact(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
@@ -67,6 +344,19 @@ class AnalysisPQCTest(unittest.TestCase):
         r = analysis_pqc.analyse_breakdown(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
 
+    def test_analyse_breakdown_many(self):
+        v = np.arange(10.)
+        i = np.array([1e-12, -2e-12, 1e-12, 1e-11, 1e-11, 2e-11, 5e-8, 1e-6, 1e-6, 1e-6])
+        self.assertEqual(analysis_pqc.analyse_breakdown(v, i).v_bd, 9)
+        self.assertEqual(analysis_pqc.analyse_breakdown(v, i, jump_ratio=100, i_floor=1e-10).v_bd, 6)
+        self.assertEqual(analysis_pqc.analyse_breakdown(v, i, i_compliance=1e-6).v_bd, 7)
+        self.assertEqual(analysis_pqc.analyse_breakdown(v, i, i_compliance=1e-6, i_elm=i[::-1]).v_bd, 0)
+        r = analysis_pqc.analyse_breakdown_many(np.concatenate([v, v[:5]]), np.concatenate([i, i[:5]]), jump_ratio=100, i_floor=1e-10, offsets=[0, 10, 15])
+        np.testing.assert_array_equal(r['v_bd'], [6, 4])
+        np.testing.assert_array_equal(r['broken'], [True, False])
+        r = analysis_pqc.analyse_breakdown_many([v, v], [i, -i], i_compliance=1e-6)
+        np.testing.assert_array_equal(r['v_bd'], [7, 7])
+
     def test_analyse_capacitor(self):
         r = analysis_pqc.analyse_capacitor(x, y)
         self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
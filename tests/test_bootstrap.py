@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+
+import analysis_pqc
+from analysis_pqc import bootstrap
+
+def failing_van_der_pauw_many(x, y, **kwargs):
+    """Fail every third curve with a bogus r_sheet, as failed fits do."""
+    result = analysis_pqc.analyse_van_der_pauw_many(x, y, **kwargs)
+    failed = np.arange(len(result)) % 3 == 1
+    result['r_sheet'][failed] = -100.
+    result['status'][failed] = analysis_pqc.STATUS_FAILED
+    return result
+
+class BootstrapTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.i = np.tile(np.linspace(-1e-5, 1e-5, 20), (3, 1))
+        self.v = 3 * self.i + rng.normal(0, 1e-7, self.i.shape)
+
+    def test_percentile(self):
+        samples = np.array([[1., 4., np.nan, 2., 3.], [np.nan] * 5])
+        p = bootstrap._percentile(samples, .25)
+        self.assertAlmostEqual(p[0], np.nanpercentile(samples[0], 25))
+        self.assertTrue(np.isnan(p[1]))
+
+    def test_van_der_pauw(self):
+        r = bootstrap.bootstrap(analysis_pqc.analyse_van_der_pauw_many, self.i, self.v, ['r_sheet'], n_resamples=200, seed=1)
+        ref = analysis_pqc.analyse_van_der_pauw_many(self.i, self.v)
+        np.testing.assert_array_equal(r['r_sheet'], ref['r_sheet'])
+        self.assertTrue((r['r_sheet_low'] < r['r_sheet']).all())
+        self.assertTrue((r['r_sheet_high'] > r['r_sheet']).all())
+        self.assertTrue((r['r_sheet_std'] > 0).all())
+        r2 = bootstrap.bootstrap(analysis_pqc.analyse_van_der_pauw_many, self.i, self.v, ['r_sheet'], n_resamples=200, seed=1, workers=2)
+        np.testing.assert_array_equal(r2, r)
+
+    def test_failed_replicas(self):
+        i, v = self.i[:1], self.v[:1]
+        r = bootstrap.bootstrap(failing_van_der_pauw_many, i, v, ['r_sheet'], n_resamples=300, seed=1, chunksize=300)
+        ref = analysis_pqc.analyse_van_der_pauw_many(i, v)['r_sheet']
+        self.assertTrue((r['r_sheet_low'] > 0).all())
+        self.assertTrue((r['r_sheet_low'] < ref).all())
+        self.assertTrue((r['r_sheet_high'] > ref).all())
+        self.assertTrue((r['r_sheet_std'] < 1).all())
+
+    def test_cv(self):
+        rng = np.random.default_rng(1)
+        v = np.tile(np.linspace(0, 600, 121), (2, 1))
+        c = 1e-11 / np.sqrt(np.clip(v, 5, 250) / 250) * (1 + rng.normal(0, 1e-3, v.shape))
+        area = np.array([6.25e-6, 6.25e-6])
+        r = bootstrap.bootstrap(analysis_pqc.analyse_cv_many, v, c, ['v_dep2', 'rho'], n_resamples=50, seed=1, area=area, carrier='holes')
+        self.assertTrue((r['v_dep2_low'] <= r['v_dep2_high']).all())
+        self.assertTrue(np.isfinite(r['rho_std']).all())
+
+    def test_points(self):
+        offsets = [0, 20, 35]
+        i = np.concatenate([self.i[0], self.i[1, :15]])
+        v = np.concatenate([self.v[0], self.v[1, :15]])
+        r = bootstrap.bootstrap(analysis_pqc.analyse_van_der_pauw_many, i, v, ['r_sheet', 'a'], n_resamples=100, method='points', seed=1, offsets=offsets)
+        self.assertEqual(len(r), 2)
+        self.assertTrue(np.isfinite(r['a_std']).all())
+        with self.assertRaises(ValueError):
+            bootstrap.bootstrap(analysis_pqc.analyse_van_der_pauw_many, self.i, self.v, ['r_sheet'], method='jackknife')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+import analysis_pqc
+from analysis_pqc.cache import ResultCache
+
+x = np.array([0., 1., 2., 3., 4., 5., 6., 7.])
+y = np.array([.1, .2, .3, .5, .6, .6, 6.,6.])
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_memory(self):
+        cache = ResultCache()
+        analyse = cache.memoize(analysis_pqc.analyse_van_der_pauw)
+        r1 = analyse(x, y)
+        r2 = analyse(x, y)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIs(type(r2), analysis_pqc.analyse_van_der_pauw.result_type)
+        self.assertEqual(r1.status, r2.status)
+        np.testing.assert_array_equal(r1.x_fit, r2.x_fit)
+        analyse(x, y, cut_param=1e-3)
+        analyse(x, 2 * y)
+        self.assertEqual(cache.misses, 3)
+        analyse(i=x, v=y)
+        self.assertEqual(cache.hits, 2)
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as path:
+            ref = ResultCache(path).call(analysis_pqc.analyse_van_der_pauw, x, y)
+            many = ResultCache(path).call(analysis_pqc.analyse_van_der_pauw_many, [x, x], [y, y])
+            cache = ResultCache(path)
+            r = cache.call(analysis_pqc.analyse_van_der_pauw, x, y)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(r._fields, ref._fields)
+            for value, expected in zip(r, ref):
+                np.testing.assert_array_equal(value, expected)
+            r = cache.call(analysis_pqc.analyse_van_der_pauw_many, [x, x], [y, y])
+            self.assertEqual(cache.hits, 2)
+            np.testing.assert_array_equal(r, many)
+
+    def test_evict(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = ResultCache(path, max_bytes=2000)
+            for k in range(20):
+                cache.call(analysis_pqc.analyse_van_der_pauw, x, y * (k + 1))
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+            self.assertLessEqual(size, 2000)
+            self.assertTrue(os.listdir(path))
+            cache.clear()
+            self.assertFalse(os.listdir(path))
+
+    def test_copies(self):
+        cache = ResultCache()
+        analyse = cache.memoize(analysis_pqc.analyse_van_der_pauw_many)
+        r = analyse([x, x], [y, y])
+        r['r_sheet'] = 0.
+        r = analyse([x, x], [y, y])
+        self.assertTrue((r['r_sheet'] != 0.).all())
+        r['r_sheet'] = 0.
+        self.assertTrue((analyse([x, x], [y, y])['r_sheet'] != 0.).all())
+
+    def test_shared_directory(self):
+        with tempfile.TemporaryDirectory() as path:
+            caches = [ResultCache(path, max_bytes=100000), ResultCache(path, max_bytes=100000)]
+            for k in range(9):
+                for n, cache in enumerate(caches):
+                    cache.set(f'{n}-{k}', np.zeros(1000))  # 8 kB
+                    size = sum(entry.stat().st_size for entry in os.scandir(path))
+                    self.assertLessEqual(size, 100000)
+            self.assertGreater(len(os.listdir(path)), 8)
+
+    def test_overwrite(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = ResultCache(path)
+            for value in (np.zeros(1000), np.zeros(10), np.zeros(100)):
+                cache.set('key', value)
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+            self.assertEqual(cache._disk_size(), size)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+
+from scipy.stats import linregress
+
+import analysis_pqc
+from analysis_pqc import streaming
+
+x = np.array([0., 1., 2., 3., 4., 5., 6., 7.])
+y = np.array([.1, .2, .3, .5, .6, .6, 6.,6.])
+
+class StreamingTest(unittest.TestCase):
+
+    def test_linear_fit(self):
+        fit = streaming.StreamingLinearFit()
+        self.assertEqual(fit.result().status, analysis_pqc.STATUS_NONE)
+        fit.update(x[0], y[0])
+        fit.update(x[1:2], y[1:2])
+        fit.update(x[2:5], y[2:5])
+        for k in range(5, len(x)):
+            fit.update(x[k], y[k])
+        ref = linregress(x, y)
+        r = fit.result()
+        self.assertEqual(r.status, analysis_pqc.STATUS_PASSED)
+        self.assertAlmostEqual(r.a, ref.slope)
+        self.assertAlmostEqual(r.b, ref.intercept)
+        self.assertAlmostEqual(r.r_value, ref.rvalue)
+
+    def test_van_der_pauw(self):
+        fit = streaming.StreamingVanDerPauw()
+        fit.update(x, 2 * x + 1)
+        r = fit.result()
+        self.assertAlmostEqual(r.r_sheet, np.pi / np.log(2) * 2)
+        self.assertAlmostEqual(r.r_value, 1.)
+
+    def test_cbkr(self):
+        fit = analysis_pqc.StreamingCBKR(r_sheet=-1)
+        fit.update(x, y)
+        self.assertEqual(fit.result().r_contact, -1)
+
+    def test_iv(self):
+        v = np.array([0, -100, -300, -600, -800, -900.])
+        i = np.array([0, -1, -2, -3, -4, -5.])
+        iv = streaming.StreamingIV()
+        for k in range(0, len(v), 4):
+            iv.update(v[k:k + 4], i[k:k + 4])
+        self.assertEqual(iv.result(), analysis_pqc.analyse_iv(v, i))
+        self.assertEqual(iv.result()._fields, analysis_pqc.analyse_iv(v, i)._fields)
+
+    def test_breakdown(self):
+        bd = streaming.StreamingBreakdown(i_compliance=1e-6)
+        self.assertFalse(bd.update([1, 2], [1e-9, 1e-9]))
+        self.assertEqual(bd.result().v_bd, 2)
+        self.assertTrue(bd.update([3, 4], [2e-6, 1e-9]))
+        self.assertEqual(bd.result().v_bd, 3)
+        bd = streaming.StreamingBreakdown(jump_ratio=100)
+        bd.update(1, 1e-9)
+        self.assertTrue(bd.update(2, 1e-6))
+        bd = streaming.StreamingBreakdown(jump_ratio=100, i_floor=1e-10)
+        self.assertFalse(bd.update([1, 2], [1e-14, 1e-11], i_elm=[1e-14, 1e-14]))
+        self.assertTrue(bd.update([3, 4], [1e-11, 1e-11], i_elm=[1e-14, 1e-9]))
+        self.assertEqual(bd.result().v_bd, 4)
+
+if __name__ == '__main__':
+    unittest.main()
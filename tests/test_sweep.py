@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+
+import analysis_pqc
+from analysis_pqc import sweep
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.i = np.tile(np.linspace(1e-6, 1e-5, 20), (4, 1))
+        self.v = 2e3 * self.i + rng.normal(0, 1e-4, self.i.shape)
+
+    def test_parameter_grid(self):
+        settings = sweep.parameter_grid({'cut_param': [1e-5, 1e-3], 'fit': ['ols']})
+        self.assertEqual(settings, [{'cut_param': 1e-5, 'fit': 'ols'}, {'cut_param': 1e-3, 'fit': 'ols'}])
+
+    def test_reuse_preprocessing(self):
+        y = np.tile(np.linspace(0, 1, 10)**2, (2, 1))
+        ref = analysis_pqc.spline_dev_many(y, [10, 8])
+        with analysis_pqc.reuse_preprocessing():
+            first = analysis_pqc.spline_dev_many(y, [10, 8])
+            self.assertIs(analysis_pqc.spline_dev_many(y.copy(), [10, 8]), first)
+            self.assertIsNot(analysis_pqc.spline_dev_many(y, [10, 10]), first)
+        np.testing.assert_array_equal(first, ref)
+        self.assertIsNot(analysis_pqc.spline_dev_many(y, [10, 8]), first)
+
+    def test_sweep(self):
+        grid = {'cut_param': [1e-5, 1e-3], 'fit': ['ols', 'huber'], 'min_correlation': [.99, 1.]}
+        r = sweep.sweep(analysis_pqc.analyse_van_der_pauw_many, self.i, self.v, grid, fields=['r_sheet'])
+        self.assertEqual(len(r), 8)
+        self.assertEqual(list(r['fit'][:4]), ['ols', 'ols', 'huber', 'huber'])
+        for row in r:
+            ref = analysis_pqc.analyse_van_der_pauw_many(self.i, self.v, cut_param=row['cut_param'], fit=row['fit'])
+            passed = np.abs(ref['r_value']) >= row['min_correlation']
+            self.assertEqual(row['passed'], np.count_nonzero(passed))
+            if passed.any():
+                self.assertAlmostEqual(row['r_sheet_median'], np.median(ref['r_sheet'][passed]))
+        r2 = sweep.sweep(analysis_pqc.analyse_van_der_pauw_many, self.i, self.v, grid, fields=['r_sheet'], workers=2)
+        for name in r.dtype.names:
+            np.testing.assert_array_equal(r2[name], r[name])
+
+    def test_ragged(self):
+        x = np.concatenate([self.i[0], self.i[1, :12]])
+        y = np.concatenate([self.v[0], self.v[1, :12]])
+        r = sweep.sweep(analysis_pqc.analyse_contact_many, x, y, {'cut_param': [1e-5]}, offsets=[0, 20, 32])
+        self.assertEqual(r['count'][0], 2)
+        self.assertIn('r_contact_median', r.dtype.names)
+
+    def test_series(self):
+        v = np.concatenate([np.linspace(0, 100, 11), np.linspace(0, 100, 6)])
+        i = np.full(17, 1e-9)
+        i_elm = i.copy()
+        i_elm[5] = 1e-3  # breakdown at 50 V in the 2nd current of the first ramp only
+        for offsets, part in (([0, 11, 17], slice(None)), (None, slice(0, 11))):
+            x, y, z = (np.atleast_2d(a[part]) if offsets is None else a for a in (v, i, i_elm))
+            r = sweep.evaluate_grid(analysis_pqc.analyse_breakdown_many, x, y, [{'i_compliance': 1e-6}], offsets=offsets, series={'i_elm': z})
+            self.assertEqual(r[0]['v_bd'][0], 50.)
+            r = sweep.evaluate_grid(analysis_pqc.analyse_breakdown_many, x, y, [{'i_compliance': 1e-6}], offsets=offsets)
+            self.assertEqual(r[0]['v_bd'][0], 100.)
+
+if __name__ == '__main__':
+    unittest.main()